@@ -5,7 +5,8 @@ Provides operator controls for:
   - Match data refresh, status inspection, lock/unlock
   - Scoring triggers and re-runs
   - Prediction counts and leaderboard state
-  - Failed job visibility
+  - Failed job visibility and scheduled-job leases
+  - Per-worker runtime metrics (upstream HTTP pools and budgets, prediction ingest, LLM calls, intel feeds, card cache and renderer, WebSocket hub)
 """
 import logging
 from datetime import datetime, timezone
@@ -14,11 +15,20 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlmodel import Session, select, func
 
+from app import migrations
 from app.db import get_session
 from app.limiter import limiter
-from app.models import MatchPrediction, User, AiCommentary, MatchDB, AgentRun, ApprovalQueue, NudgeLog
+from app.models import (
+    MatchPrediction, User, AiCommentary, MatchDB, AgentRun, ApprovalQueue, NudgeLog, JobLease,
+)
 from app.api.users import get_current_user
-from app.api.predictions import rank_title_for
+from app.services.scoring import rank_title_for
+from app.services import card_renderer, football_data, intel_feeds, leaderboard, prediction_ingest
+from app.services.card_cache import card_cache
+from app.core import http_clients, llm
+from app.core.llm_cache import response_cache
+from app.core.rate_governor import get_governor
+from app.websocket import match_ws
 
 logger = logging.getLogger("fanxi.admin")
 
@@ -225,15 +235,9 @@ async def admin_refresh_match(
     admin: User = Depends(_require_admin),
 ):
     """Force-refresh match data from football-data.org (bypasses cache)."""
-    from app.services.football_data import _cache
-
     # Clear cached entries for this match
-    keys_to_clear = [k for k in _cache if f"/matches/{match_id}" in k]
-    for k in keys_to_clear:
-        del _cache[k]
-
-    from app.services import football_data as fd
-    data = await fd.get_match(match_id)
+    football_data.invalidate_match(match_id)
+    data = await football_data.get_match(match_id)
     logger.info("ADMIN_REFRESH_MATCH match_id=%d by=%s success=%s", match_id, admin.username, bool(data))
 
     if not data:
@@ -307,6 +311,7 @@ def admin_recalculate_leaderboard(
             session.add(u)
             updated += 1
     session.commit()
+    leaderboard.refresh(session)
     logger.info("ADMIN_LEADERBOARD_RECALC by=%s updated=%d", admin.username, updated)
     return {"total_users": len(users), "titles_updated": updated}
 
@@ -401,3 +406,53 @@ def admin_unban_user(
     session.commit()
     logger.info("ADMIN_UNBAN user_id=%d username=%s by=%s", user_id, user.username, admin.username)
     return {"user_id": user_id, "username": user.username, "is_banned": False}
+
+
+# ---------------------------------------------------------------------------
+# Scheduled jobs
+# ---------------------------------------------------------------------------
+
+@router.get("/jobs")
+def admin_list_jobs(
+    session: Session = Depends(get_session),
+    admin: User = Depends(_require_admin),
+):
+    """Cluster-singleton job leases — which worker ran each job last, and how often."""
+    rows = session.exec(select(JobLease).order_by(JobLease.job_id)).all()
+    return [
+        {
+            "job_id": r.job_id,
+            "holder": r.holder,
+            "lease_until": r.lease_until.isoformat() if r.lease_until else None,
+            "last_started_at": r.last_started_at.isoformat() if r.last_started_at else None,
+            "last_finished_at": r.last_finished_at.isoformat() if r.last_finished_at else None,
+            "last_duration_ms": r.last_duration_ms,
+            "last_error": r.last_error,
+            "run_count": r.run_count,
+            "skipped_count": r.skipped_count,
+        }
+        for r in rows
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Runtime metrics
+# ---------------------------------------------------------------------------
+
+@router.get("/metrics")
+def admin_metrics(admin: User = Depends(_require_admin)):
+    """In-process counters for the worker that serves this request."""
+    return {
+        "http": http_clients.stats(),
+        "football_data_cache": football_data.cache_stats(),
+        "rate_governor": get_governor().stats(),
+        "llm": llm.stats(),
+        "ai_response_cache": response_cache.stats(),
+        "intel_feeds": intel_feeds.stats(),
+        "card_cache": card_cache.stats(),
+        "card_renderer": card_renderer.stats(),
+        "prediction_ingest": prediction_ingest.stats(),
+        "schema": migrations.stats(),
+        "websocket": match_ws.stats(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
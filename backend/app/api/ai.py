@@ -7,10 +7,13 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Literal
 from datetime import datetime, timedelta
-from groq import Groq
 import json
+import re
+import time
 
 from app.config import settings
+from app.core import llm
+from app.core.llm_cache import response_cache
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -117,6 +120,7 @@ class ChatResponse(BaseModel):
     response: str
     model: str = "llama-3.3-70b-versatile"
     provider: str = "groq"
+    cached: bool = False
 
 # ── Daily brief cache ─────────────────────────────────────────────────────────
 
@@ -156,11 +160,10 @@ async def get_daily_brief(refresh: bool = Query(default=False)):
         return {"insight": FALLBACK_BRIEF, "cached": True}
 
     try:
-        client = Groq(api_key=settings.groq_api_key)
-        result = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+        content = await llm.complete(
             max_tokens=220,
             temperature=0.88,
+            timeout=20,
             messages=[
                 {
                     "role": "system",
@@ -176,8 +179,7 @@ async def get_daily_brief(refresh: bool = Query(default=False)):
                     "content": "Generate today's World Cup 2026 tactical pulse — exactly 3 sentences.",
                 },
             ],
-        )
-        content = result.choices[0].message.content or FALLBACK_BRIEF
+        ) or FALLBACK_BRIEF
         _brief_cache["content"] = content
         _brief_cache["generated_at"] = now
         return {"insight": content, "cached": False}
@@ -196,24 +198,21 @@ async def ai_chat(body: ChatRequest) -> ChatResponse:
             detail="AI service not configured",
         )
 
-    try:
-        client = Groq(api_key=settings.groq_api_key)
-
-        messages = [
-            {"role": "system", "content": SYSTEM_PROMPTS[body.mode]},
-            *[{"role": m.role, "content": m.content} for m in body.messages],
-        ]
-
-        result = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            max_tokens=2048,
-            temperature=0.7,
-            messages=messages,
-        )
+    conversation = [{"role": m.role, "content": m.content} for m in body.messages]
+    cached = response_cache.lookup(body.mode, conversation)
+    if cached is not None:
+        return ChatResponse(response=cached, cached=True)
 
-        response_text = result.choices[0].message.content or ""
+    messages = [{"role": "system", "content": SYSTEM_PROMPTS[body.mode]}, *conversation]
+
+    try:
+        started = time.monotonic()
+        response_text = await llm.complete(messages, max_tokens=2048, temperature=0.7)
+        response_cache.store(body.mode, conversation, response_text, time.monotonic() - started)
         return ChatResponse(response=response_text)
 
+    except llm.LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI error: {str(e)}")
 
@@ -223,38 +222,44 @@ async def ai_chat_stream(body: ChatRequest) -> StreamingResponse:
     if not settings.groq_api_key:
         raise HTTPException(status_code=503, detail="AI service not configured")
 
+    conversation = [{"role": m.role, "content": m.content} for m in body.messages]
+    cached = response_cache.lookup(body.mode, conversation)
+
+    async def replay():
+        for text in _replay_chunks(cached):
+            yield f"data: {json.dumps({'text': text})}\n\n"
+        yield "data: [DONE]\n\n"
+
     async def generate():
         try:
-            client = Groq(api_key=settings.groq_api_key)
-
-            messages = [
-                {"role": "system", "content": SYSTEM_PROMPTS[body.mode]},
-                *[{"role": m.role, "content": m.content} for m in body.messages],
-            ]
-
-            stream = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                max_tokens=2048,
-                temperature=0.7,
-                stream=True,
-                messages=messages,
-            )
-
-            for chunk in stream:
-                delta = chunk.choices[0].delta
-                if delta.content:
-                    yield f"data: {json.dumps({'text': delta.content})}\n\n"
+            messages = [{"role": "system", "content": SYSTEM_PROMPTS[body.mode]}, *conversation]
+
+            started = time.monotonic()
+            pieces: list[str] = []
+            async for text in llm.stream(messages, max_tokens=2048, temperature=0.7):
+                pieces.append(text)
+                yield f"data: {json.dumps({'text': text})}\n\n"
 
+            response_cache.store(body.mode, conversation, "".join(pieces), time.monotonic() - started)
             yield "data: [DONE]\n\n"
 
         except Exception as e:
             yield f"data: {json.dumps({'error': str(e)})}\n\n"
 
     return StreamingResponse(
-        generate(),
+        replay() if cached is not None else generate(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
             "X-Accel-Buffering": "no",
+            "X-Cache": "HIT" if cached is not None else "MISS",
         },
     )
+
+
+_REPLAY_WORDS = re.compile(r"\s*(?:\S+\s*){1,8}")
+
+
+def _replay_chunks(text: str) -> list[str]:
+    """Split a cached answer into a few words per SSE event, like a live stream."""
+    return _REPLAY_WORDS.findall(text) or [text]
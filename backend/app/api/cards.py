@@ -1,29 +1,65 @@
 """
 FanXI Share Cards API
 
-GET /cards/prediction/{match_id}  — auth required, returns user's prediction card PNG
-GET /cards/profile/{username}     — public, returns scout profile card PNG
+GET /cards/prediction/{match_id}  — auth required, returns user's prediction card
+GET /cards/profile/{username}     — public, returns scout profile card
+
+Cards are WebP or AVIF when the Accept header lists them, PNG otherwise.
+Both send a strong ETag (the card's content hash) and answer a matching
+If-None-Match with 304 before the card cache is even consulted.  Rendering
+runs in the card_renderer process pool; when its queue is full the request
+gets a 503 with Retry-After.
 """
+from concurrent.futures import TimeoutError as RenderTimeout
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import Response
 from sqlmodel import Session, select
 
 from app.db import get_session
 from app.models import MatchPrediction, User
 from app.api.users import get_current_user
-from app.api.matches import _ALL_FIXTURES
-from app.services.card_generator import generate_prediction_card, generate_profile_card
+from app.services import card_renderer
+from app.services.card_generator import card_key, media_type, negotiate_format
+from app.services.card_inputs import prediction_card_inputs_for, profile_card_inputs_for
 
 router = APIRouter(prefix="/cards", tags=["cards"])
 
+_BUST_DESCRIPTION = "Deprecated, ignored — cards are keyed by content, so a changed card is always fresh"
 
-def _find_match(match_id: int) -> dict:
-    """Look up a match from the static fixtures list by id."""
-    for m in _ALL_FIXTURES:
-        if m.get("id") == match_id:
-            return m
-    return {}
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _card_response(
+    request: Request, kind: str, inputs: dict, filename: str, cache_control: str,
+) -> Response:
+    fmt = negotiate_format(request.headers.get("accept"))
+    key = card_key(kind, inputs, fmt)
+    headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": cache_control,
+        "Vary": "Accept",
+        "Content-Disposition": f'inline; filename="{filename}.{fmt}"',
+    }
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    try:
+        data = card_renderer.get_card(kind, inputs, fmt, key)
+    except (card_renderer.RenderBusy, RenderTimeout):
+        raise HTTPException(
+            status_code=503,
+            detail="Card renderer busy — try again shortly",
+            headers={"Retry-After": str(card_renderer.RETRY_AFTER)},
+        )
+    return Response(content=data, media_type=media_type(fmt), headers=headers)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -33,17 +69,19 @@ def _find_match(match_id: int) -> dict:
 @router.get("/prediction/{match_id}")
 def prediction_card(
     match_id: int,
-    bust: bool = Query(default=False, description="Force regenerate (ignores cache)"),
+    request: Request,
+    bust: bool = Query(default=False, description=_BUST_DESCRIPTION, deprecated=True),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> Response:
     """
-    Generate and return a 1200×630 PNG share card for the authenticated
+    Generate and return a 1200×630 share card for the authenticated
     user's locked prediction for the given match.
 
-    The image is cached in /tmp/ for 10 minutes so repeated button clicks
-    are instant. Pass ?bust=true to force regeneration after updating a
-    prediction.
+    The card is cached under a hash of what it shows, so it is rendered
+    again only when the prediction, the match or the user's rank or points
+    change.  Browsers revalidate on every use and get a 304 while the card
+    is unchanged.
     """
     # Fetch user's prediction for this match
     prediction = session.exec(
@@ -59,41 +97,10 @@ def prediction_card(
             detail="No locked prediction found for this match.",
         )
 
-    match = _find_match(match_id)
-    if not match:
-        # Fallback match shell so card still renders
-        match = {
-            "id": match_id,
-            "home_team": prediction.team_name or "Home",
-            "away_team": "Away",
-            "group": "WC 2026",
-            "kickoff": "",
-            "venue": "",
-        }
-
-    png_bytes = generate_prediction_card(
-        user_id=current_user.id,
-        match_id=match_id,
-        prediction={
-            "team_name":    prediction.team_name,
-            "lineup_data":  prediction.lineup_data,
-            "tactics_data": prediction.tactics_data,
-            "match_result": prediction.match_result,
-        },
-        match=match,
-        username=current_user.username,
-        rank_title=current_user.rank_title,
-        iq_points=current_user.football_iq_points,
-        bust_cache=bust,
-    )
-
-    return Response(
-        content=png_bytes,
-        media_type="image/png",
-        headers={
-            "Cache-Control": "public, max-age=300",
-            "Content-Disposition": f'inline; filename="fanxi-{match_id}.png"',
-        },
+    inputs = prediction_card_inputs_for(match_id, prediction, current_user)
+    return _card_response(
+        request, "prediction", inputs,
+        filename=f"fanxi-{match_id}", cache_control="private, no-cache",
     )
 
 
@@ -104,11 +111,12 @@ def prediction_card(
 @router.get("/profile/{username}")
 def profile_card(
     username: str,
-    bust: bool = Query(default=False, description="Force regenerate (ignores cache)"),
+    request: Request,
+    bust: bool = Query(default=False, description=_BUST_DESCRIPTION, deprecated=True),
     session: Session = Depends(get_session),
 ) -> Response:
     """
-    Generate and return a 1200×630 PNG share card for a scout's public profile.
+    Generate and return a 1200×630 share card for a scout's public profile.
     No auth required — profile cards are public.
     """
     user = session.exec(
@@ -124,28 +132,8 @@ def profile_card(
         select(func.count(MatchPrediction.id)).where(MatchPrediction.user_id == user.id)
     ).one()
 
-    profile = {
-        "display_name":       user.display_name,
-        "rank_title":         user.rank_title,
-        "football_iq_points": user.football_iq_points,
-        "prediction_count":   prediction_count,
-        "favorite_nation":    user.favorite_nation,
-        "country_allegiance": user.country_allegiance,
-        "preferred_formation": user.preferred_formation,
-        "tactical_style":     user.tactical_style,
-    }
-
-    png_bytes = generate_profile_card(
-        username=user.username,
-        profile=profile,
-        bust_cache=bust,
-    )
-
-    return Response(
-        content=png_bytes,
-        media_type="image/png",
-        headers={
-            "Cache-Control": "public, max-age=3600",
-            "Content-Disposition": f'inline; filename="fanxi-{username}.png"',
-        },
+    inputs = profile_card_inputs_for(user, prediction_count)
+    return _card_response(
+        request, "profile", inputs,
+        filename=f"fanxi-{username}", cache_control="public, max-age=3600",
     )
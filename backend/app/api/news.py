@@ -4,16 +4,29 @@ GET /news/wc2026 — fetches latest World Cup 2026 news from NewsAPI,
 enriches each article with a Groq-generated tactical angle, and caches
 for 2 hours. Falls back to 4 static articles if NewsAPI key is missing
 or the request fails.
+
+Angles are stored per article URL (NewsAngle), so a refresh only asks Groq
+about articles it hasn't seen, in one batched prompt.  Refreshes are
+single-flight and start in the background REFRESH_AHEAD before the cache
+expires, so readers never wait on NewsAPI or Groq once the feed is warm.
 """
 
+import asyncio
+import json
+import logging
 from datetime import datetime, timezone, timedelta
-from typing import Optional
-import httpx
+from typing import Dict, List, Optional
 from fastapi import APIRouter, Request
-from groq import Groq
+from sqlmodel import Session, select
 
 from app.config import settings
+from app.core import llm
+from app.db import engine
+from app.core.http_clients import get_async_client
 from app.limiter import limiter
+from app.models import NewsAngle
+
+logger = logging.getLogger("fanxi.news")
 
 router = APIRouter()
 
@@ -25,6 +38,11 @@ _cache: dict = {
 }
 
 CACHE_TTL = timedelta(hours=2)
+REFRESH_AHEAD = timedelta(minutes=15)
+PAGE_SIZE = 6
+ANGLE_UNAVAILABLE = "Tactical analysis unavailable."
+
+_refresh_task: Optional[asyncio.Task] = None
 
 # ── Static fallback articles ──────────────────────────────────────────────────
 
@@ -66,26 +84,155 @@ STATIC_ARTICLES = [
 # ── Groq client ───────────────────────────────────────────────────────────────
 
 
-def _get_tactical_angle(headline: str, description: str) -> str:
+async def _get_tactical_angle(headline: str, description: str) -> str:
     """Call Groq to generate a one-sentence tactical angle for a news headline."""
     if not settings.groq_api_key:
-        return "Tactical analysis unavailable."
+        return ANGLE_UNAVAILABLE
     try:
-        client = Groq(api_key=settings.groq_api_key)
         prompt = (
             f"In one sentence (max 15 words), give a tactical football angle on this "
             f"World Cup news: {headline}. {description}. "
             f"Be specific and tactical, not generic."
         )
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
+        angle = await llm.complete(
+            [{"role": "user", "content": prompt}],
             max_tokens=60,
             temperature=0.7,
+            timeout=15,
+        )
+        return angle.strip() or ANGLE_UNAVAILABLE
+    except Exception:
+        return ANGLE_UNAVAILABLE
+
+
+async def _get_tactical_angles(articles: List[dict]) -> List[str]:
+    """
+    One angle per article from a single batched prompt.  If the batch fails
+    or its reply doesn't parse, fall back to one call per article (run
+    concurrently, bounded by the shared LLM limiter).
+    """
+    if not settings.groq_api_key:
+        return [ANGLE_UNAVAILABLE] * len(articles)
+    items = "\n".join(
+        f"{i}. {a.get('title', '')}. {a.get('description', '') or ''}"
+        for i, a in enumerate(articles, 1)
+    )
+    prompt = (
+        f"For each numbered World Cup news item below, give a tactical football "
+        f"angle in one sentence (max 15 words). Be specific and tactical, not generic.\n\n"
+        f"{items}\n\n"
+        f"Reply with only a JSON array of {len(articles)} strings, in the same order."
+    )
+    try:
+        reply = await llm.complete(
+            [{"role": "user", "content": prompt}],
+            max_tokens=50 * len(articles) + 20,
+            temperature=0.7,
+            timeout=20,
+        )
+        angles = json.loads(reply[reply.index("["):reply.rindex("]") + 1])
+        if len(angles) == len(articles) and all(isinstance(a, str) and a.strip() for a in angles):
+            return [a.strip() for a in angles]
+        logger.warning("NEWS_BATCH_MISMATCH expected=%d got=%d", len(articles), len(angles))
+    except Exception as e:
+        logger.warning("NEWS_BATCH_FAILED error=%s", e)
+    return list(await asyncio.gather(*(
+        _get_tactical_angle(a.get("title", ""), a.get("description", "") or "")
+        for a in articles
+    )))
+
+
+# ── Angle store ───────────────────────────────────────────────────────────────
+
+
+def _article_key(art: dict) -> str:
+    return art.get("url") or art.get("title", "")
+
+
+def _load_angles(keys: List[str]) -> Dict[str, str]:
+    try:
+        with Session(engine) as session:
+            rows = session.exec(select(NewsAngle).where(NewsAngle.url.in_(keys))).all()
+            return {r.url: r.angle for r in rows}
+    except Exception as e:
+        logger.warning("NEWS_ANGLE_LOAD_FAILED error=%s", e)
+        return {}
+
+
+def _save_angles(angles: Dict[str, str]) -> None:
+    try:
+        with Session(engine) as session:
+            for url, angle in angles.items():
+                session.merge(NewsAngle(url=url, angle=angle))
+            session.commit()
+    except Exception as e:
+        logger.warning("NEWS_ANGLE_SAVE_FAILED error=%s", e)
+
+
+# ── Feed refresh ──────────────────────────────────────────────────────────────
+
+
+async def _fetch_articles() -> Optional[List[dict]]:
+    """Latest WC 2026 articles from NewsAPI, or None on failure."""
+    try:
+        client = get_async_client("newsapi")
+        resp = await client.get(
+            "https://newsapi.org/v2/everything",
+            params={
+                "q": "World Cup 2026",
+                "language": "en",
+                "sortBy": "publishedAt",
+                "pageSize": PAGE_SIZE,
+                "apiKey": settings.news_api_key,
+            },
         )
-        return completion.choices[0].message.content.strip()
+        resp.raise_for_status()
+        return resp.json().get("articles", [])[:PAGE_SIZE]
     except Exception:
-        return "Tactical analysis unavailable."
+        return None
+
+
+async def _build_feed() -> list[dict]:
+    """Fetch, enrich only unseen articles, and fill the cache.  Static articles on failure."""
+    articles_raw = await _fetch_articles()
+    if not articles_raw:
+        # Network error, bad status or empty feed — leave the cache as it is
+        return STATIC_ARTICLES
+
+    keys = [_article_key(art) for art in articles_raw]
+    angles = await asyncio.to_thread(_load_angles, keys)
+    unseen = [art for art, key in zip(articles_raw, keys) if key not in angles]
+    if unseen:
+        fresh = dict(zip((_article_key(a) for a in unseen), await _get_tactical_angles(unseen)))
+        angles.update(fresh)
+        keep = {k: v for k, v in fresh.items() if k and v != ANGLE_UNAVAILABLE}
+        if keep:
+            await asyncio.to_thread(_save_angles, keep)
+    logger.info("NEWS_REFRESH articles=%d enriched=%d", len(articles_raw), len(unseen))
+
+    articles = [
+        {
+            "title": art.get("title", ""),
+            "description": art.get("description", ""),
+            "url": art.get("url", ""),
+            "source": art.get("source", {}).get("name", "Unknown"),
+            "publishedAt": art.get("publishedAt", ""),
+            "tacticalAngle": angles.get(key, ANGLE_UNAVAILABLE),
+        }
+        for art, key in zip(articles_raw, keys)
+    ]
+    _cache["data"] = articles
+    _cache["expires_at"] = datetime.now(timezone.utc) + CACHE_TTL
+    return articles
+
+
+def _refresh() -> asyncio.Task:
+    """The in-flight refresh, or a new one — never two at once."""
+    global _refresh_task
+    loop = asyncio.get_running_loop()
+    if _refresh_task is None or _refresh_task.done() or _refresh_task.get_loop() is not loop:
+        _refresh_task = loop.create_task(_build_feed())
+    return _refresh_task
 
 
 # ── Endpoint ──────────────────────────────────────────────────────────────────
@@ -96,12 +243,15 @@ def _get_tactical_angle(headline: str, description: str) -> str:
 async def get_wc2026_news(request: Request) -> list[dict]:
     """
     Returns the latest World Cup 2026 news articles with AI tactical angles.
-    Results are cached in memory for 2 hours.
+    Results are cached in memory for 2 hours and refreshed in the background
+    shortly before they expire.
     """
     now = datetime.now(timezone.utc)
 
-    # Serve from cache if still fresh
+    # Serve from cache if still fresh; refresh ahead of expiry
     if _cache["data"] is not None and now < _cache["expires_at"]:
+        if settings.news_api_key and now >= _cache["expires_at"] - REFRESH_AHEAD:
+            _refresh()
         return _cache["data"]
 
     # No NewsAPI key — return static fallback immediately
@@ -110,47 +260,5 @@ async def get_wc2026_news(request: Request) -> list[dict]:
         _cache["expires_at"] = now + CACHE_TTL
         return STATIC_ARTICLES
 
-    # Fetch from NewsAPI
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(
-                "https://newsapi.org/v2/everything",
-                params={
-                    "q": "World Cup 2026",
-                    "language": "en",
-                    "sortBy": "publishedAt",
-                    "pageSize": 6,
-                    "apiKey": settings.news_api_key,
-                },
-            )
-            resp.raise_for_status()
-            raw = resp.json()
-    except Exception:
-        # Network error or bad status — return static fallback
-        return STATIC_ARTICLES
-
-    articles_raw = raw.get("articles", [])
-    if not articles_raw:
-        return STATIC_ARTICLES
-
-    # Enrich each article with a Groq tactical angle
-    articles: list[dict] = []
-    for art in articles_raw[:6]:
-        tactical = _get_tactical_angle(
-            art.get("title", ""),
-            art.get("description", "") or "",
-        )
-        articles.append(
-            {
-                "title": art.get("title", ""),
-                "description": art.get("description", ""),
-                "url": art.get("url", ""),
-                "source": art.get("source", {}).get("name", "Unknown"),
-                "publishedAt": art.get("publishedAt", ""),
-                "tacticalAngle": tactical,
-            }
-        )
-
-    _cache["data"] = articles
-    _cache["expires_at"] = now + CACHE_TTL
-    return articles
+    # Shielded so one caller disconnecting doesn't cancel the shared refresh
+    return await asyncio.shield(_refresh())
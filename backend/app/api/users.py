@@ -3,7 +3,6 @@ import secrets
 import urllib.parse
 from datetime import datetime, timedelta
 
-import httpx
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response, status
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
@@ -20,6 +19,8 @@ from app.core.security import (
     create_refresh_token, decode_refresh_token,
 )
 from app.config import settings
+from app.services import leaderboard
+from app.core.http_clients import get_sync_client
 
 router = APIRouter()
 
@@ -78,6 +79,7 @@ def register_user(request: Request, user_data: UserCreate, session: Session = De
     session.add(new_user)
     session.commit()
     session.refresh(new_user)
+    leaderboard.add_user(session, new_user)
     return new_user
 
 
@@ -344,32 +346,32 @@ def google_auth_callback(code: str, session: Session = Depends(get_session)):
     redirect_uri = settings.google_redirect_uri
     print(f"[Google OAuth] redirect_uri={redirect_uri}")
 
-    with httpx.Client() as client:
-        token_res = client.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": code,
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code",
-            },
-        )
-        if token_res.status_code != 200:
-            print(f"[Google OAuth] token exchange failed: {token_res.status_code} {token_res.text}")
-            raise HTTPException(status_code=400, detail=f"Google token exchange failed: {token_res.json().get('error_description', token_res.text)}")
+    client = get_sync_client("google_oauth")
+    token_res = client.post(
+        "https://oauth2.googleapis.com/token",
+        data={
+            "code": code,
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code",
+        },
+    )
+    if token_res.status_code != 200:
+        print(f"[Google OAuth] token exchange failed: {token_res.status_code} {token_res.text}")
+        raise HTTPException(status_code=400, detail=f"Google token exchange failed: {token_res.json().get('error_description', token_res.text)}")
 
-        google_access_token = token_res.json().get("access_token")
+    google_access_token = token_res.json().get("access_token")
 
-        # 2. Fetch the user's Google profile
-        info_res = client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {google_access_token}"},
-        )
-        if info_res.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch Google profile")
+    # 2. Fetch the user's Google profile
+    info_res = client.get(
+        "https://www.googleapis.com/oauth2/v2/userinfo",
+        headers={"Authorization": f"Bearer {google_access_token}"},
+    )
+    if info_res.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to fetch Google profile")
 
-        info = info_res.json()
+    info = info_res.json()
 
     google_id: str = info["id"]
     email: str = info["email"]
@@ -408,6 +410,7 @@ def google_auth_callback(code: str, session: Session = Depends(get_session)):
         session.add(user)
         session.commit()
         session.refresh(user)
+        leaderboard.add_user(session, user)
 
     # 4. Issue FanXI tokens
     access_token = create_access_token({"sub": str(user.id)})
@@ -495,12 +498,9 @@ def get_public_profile(username: str, session: Session = Depends(get_session)):
     if not user:
         raise HTTPException(status_code=404, detail="Scout not found")
 
-    # Global rank: count of users with strictly more IQ points, + 1
+    # Global rank from the materialized leaderboard (ties share a rank)
     from sqlmodel import func
-    higher_count = session.exec(
-        select(func.count(User.id)).where(User.football_iq_points > user.football_iq_points)
-    ).one()
-    global_rank = higher_count + 1
+    global_rank, _ = leaderboard.rank_of(session, user.id)
 
     # Prediction count
     from app.models import MatchPrediction
@@ -34,6 +34,11 @@ class Settings(BaseSettings):
 
     # Groq API
     groq_api_key: str = ""
+    # Concurrent Groq calls per worker; extra calls queue briefly, then get a 503
+    groq_max_concurrency: int = 8
+    # AI modes (comma-separated) whose cached answers are also served for
+    # near-identical prompts, not only exact repeats.  Empty = exact only.
+    ai_cache_near_duplicate_modes: str = "scout_report"
 
     # Football-data.org (live match data)
     football_data_api_key: str = ""
@@ -44,6 +49,31 @@ class Settings(BaseSettings):
     # Sentry
     sentry_dsn: str = ""
 
+    # Redis-protocol server shared by all workers (WebSocket backplane).
+    # Empty = in-process backplane, correct only for a single worker.
+    redis_url: str = ""
+
+    # Upstream request budgets (requests/minute, whole cluster).  Without
+    # REDIS_URL each worker enforces its 1/FANXI_WORKERS share.
+    football_data_rate_per_minute: int = 10
+    api_football_rate_per_minute: int = 10
+    fanxi_workers: int = 4
+
+    # Share card cache: per-worker memory tier + disk tier shared on the host.
+    # Empty CARD_CACHE_DIR = <system temp dir>/fanxi-cards
+    card_cache_dir: str = ""
+    card_cache_memory_mb: int = 32
+    card_cache_disk_mb: int = 256
+    # Card render processes per API worker (0 = render inline) and how many
+    # distinct renders may be queued before requests get a 503
+    card_render_workers: int = 2
+    card_render_queue: int = 32
+
+    # Apply pending schema migrations at worker startup (one worker migrates,
+    # the rest wait).  false = the deploy runs `python -m app.migrations` and
+    # workers refuse to start on an out-of-date schema.
+    migrate_on_startup: bool = True
+
     # Environment
     fanxi_env: str = "development"
 
@@ -0,0 +1,133 @@
+"""
+Bounded in-memory TTL cache with LRU eviction, stale-while-revalidate and
+negative entries.
+
+Each entry has two deadlines:
+
+    fresh_until  — serve as-is.
+    stale_until  — past fresh_until but before this, the value is still
+                   served (status STALE) and the caller is expected to kick
+                   off one background refresh.  After it, the entry is gone.
+
+Negative entries remember an upstream failure (404, 429) for a short time
+so repeated lookups don't hammer the upstream with calls that will fail.
+
+The cache itself never fetches anything — callers decide what to do with
+each lookup status.  All operations take a lock, so one instance can be
+shared by the event loop and executor threads.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+FRESH = "fresh"
+STALE = "stale"
+NEGATIVE = "negative"
+MISS = "miss"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+    negative_status: Optional[int] = None
+
+
+class TTLCache:
+    """LRU-bounded TTL cache.  `stale_grace` is how long an expired value may still be served."""
+
+    def __init__(self, max_size: int, stale_grace: float) -> None:
+        self.max_size = max_size
+        self.stale_grace = stale_grace
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {
+            "hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0,
+        }
+
+    def lookup(self, key: str) -> Tuple[str, Any]:
+        """
+        (FRESH, value) | (STALE, value) | (NEGATIVE, status_code) | (MISS, None)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.stale_until:
+                if entry is not None:
+                    del self._entries[key]
+                self._counts["misses"] += 1
+                return MISS, None
+            self._entries.move_to_end(key)
+            if entry.negative_status is not None:
+                self._counts["negative_hits"] += 1
+                return NEGATIVE, entry.negative_status
+            if now < entry.fresh_until:
+                self._counts["hits"] += 1
+                return FRESH, entry.value
+            self._counts["stale_hits"] += 1
+            return STALE, entry.value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        self._store(key, _Entry(value, now + ttl, now + ttl + self.stale_grace))
+
+    def set_negative(self, key: str, status_code: int, ttl: float) -> None:
+        """Remember a failed fetch for `ttl` seconds (no stale window)."""
+        now = time.monotonic()
+        self._store(key, _Entry(None, now + ttl, now + ttl, negative_status=status_code))
+
+    def hold(self, key: str, seconds: float) -> bool:
+        """
+        Keep serving an existing value without refreshing for `seconds` —
+        used when the upstream says "retry later".  False if there is no
+        positive entry to hold.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.negative_status is not None:
+                return False
+            entry.fresh_until = now + seconds
+            entry.stale_until = max(entry.stale_until, entry.fresh_until + self.stale_grace)
+            return True
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        with self._lock:
+            doomed = [k for k in self._entries if k.startswith(prefix)]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, **self._counts}
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
@@ -1,6 +1,5 @@
-import httpx
-
 from app.config import settings
+from app.core.http_clients import get_sync_client
 
 
 def send_reset_email(to_email: str, reset_url: str) -> None:
@@ -67,7 +66,7 @@ def send_reset_email(to_email: str, reset_url: str) -> None:
 </body>
 </html>"""
 
-    response = httpx.post(
+    response = get_sync_client("resend").post(
         "https://api.resend.com/emails",
         headers={
             "Authorization": f"Bearer {settings.resend_api_key}",
@@ -79,6 +78,5 @@ def send_reset_email(to_email: str, reset_url: str) -> None:
             "subject": "FanXI — Reset Your Password",
             "html": html,
         },
-        timeout=10,
     )
     response.raise_for_status()
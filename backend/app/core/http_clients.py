@@ -0,0 +1,170 @@
+"""
+App-lifetime HTTP client registry — one pooled client per upstream.
+
+Every upstream call used to open its own httpx client, so each cache miss
+against football-data, API-Football, the Guardian or an RSS host paid a
+fresh TCP + TLS handshake.  This module keeps one long-lived client per
+named upstream instead, with keep-alive pools, per-upstream connection
+limits and timeouts, and HTTP/2 where the `h2` package is installed.
+
+    client = get_async_client("football_data")   # in async code
+    client = get_sync_client("api_football")     # in sync / executor code
+
+Each upstream gets its own pool, so a slow RSS host can't use up the
+connections football-data needs on the live-match path.
+
+Async clients are tied to the event loop that created them; if the loop
+changes (tests, a restarted loop) a fresh client is created for it.
+stats() reports request counts and pool occupancy for /admin/metrics.
+"""
+import asyncio
+import importlib.util
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger("fanxi.http")
+
+
+@dataclass(frozen=True)
+class UpstreamProfile:
+    max_connections: int
+    max_keepalive: int
+    timeout: float
+    connect_timeout: float = 5.0
+    keepalive_expiry: float = 60.0
+
+
+# Sized to each upstream's rate limits and fan-out, not to worker load
+PROFILES: Dict[str, UpstreamProfile] = {
+    "football_data": UpstreamProfile(max_connections=10, max_keepalive=5, timeout=10.0),
+    "api_football": UpstreamProfile(max_connections=10, max_keepalive=5, timeout=15.0),
+    "guardian": UpstreamProfile(max_connections=10, max_keepalive=5, timeout=8.0),
+    "rss": UpstreamProfile(max_connections=20, max_keepalive=10, timeout=10.0),
+    "reddit": UpstreamProfile(max_connections=4, max_keepalive=2, timeout=10.0),
+    "youtube": UpstreamProfile(max_connections=4, max_keepalive=2, timeout=10.0),
+    "newsapi": UpstreamProfile(max_connections=4, max_keepalive=2, timeout=10.0),
+    "google_oauth": UpstreamProfile(max_connections=10, max_keepalive=5, timeout=10.0),
+    "resend": UpstreamProfile(max_connections=4, max_keepalive=2, timeout=10.0),
+    "groq": UpstreamProfile(max_connections=20, max_keepalive=10, timeout=60.0),
+}
+_DEFAULT_PROFILE = UpstreamProfile(max_connections=10, max_keepalive=5, timeout=10.0)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+if not HTTP2_AVAILABLE:
+    logger.warning("h2 package not installed — upstream clients will use HTTP/1.1 only")
+
+_lock = threading.Lock()
+_sync_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_counters: Dict[str, Dict[str, int]] = {}
+
+
+def _counter(name: str) -> Dict[str, int]:
+    return _counters.setdefault(name, {"requests": 0, "responses": 0, "errors_4xx": 0, "errors_5xx": 0})
+
+
+def _client_kwargs(name: str) -> dict:
+    profile = PROFILES.get(name, _DEFAULT_PROFILE)
+    counts = _counter(name)
+
+    def on_request(request: httpx.Request) -> None:
+        counts["requests"] += 1
+
+    def on_response(response: httpx.Response) -> None:
+        counts["responses"] += 1
+        if response.status_code >= 500:
+            counts["errors_5xx"] += 1
+        elif response.status_code >= 400:
+            counts["errors_4xx"] += 1
+
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "timeout": httpx.Timeout(profile.timeout, connect=profile.connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=profile.max_connections,
+            max_keepalive_connections=profile.max_keepalive,
+            keepalive_expiry=profile.keepalive_expiry,
+        ),
+        "follow_redirects": True,
+        "hooks": (on_request, on_response),
+    }
+
+
+def get_sync_client(name: str) -> httpx.Client:
+    """Shared thread-safe client for sync code (scheduler jobs, executors)."""
+    client = _sync_clients.get(name)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _sync_clients.get(name)
+            if client is None or client.is_closed:
+                kwargs = _client_kwargs(name)
+                on_request, on_response = kwargs.pop("hooks")
+                client = httpx.Client(
+                    **kwargs,
+                    event_hooks={"request": [on_request], "response": [on_response]},
+                )
+                _sync_clients[name] = client
+    return client
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """Shared client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(name)
+    if entry is not None and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+
+    kwargs = _client_kwargs(name)
+    on_request, on_response = kwargs.pop("hooks")
+
+    async def a_on_request(request: httpx.Request) -> None:
+        on_request(request)
+
+    async def a_on_response(response: httpx.Response) -> None:
+        on_response(response)
+
+    client = httpx.AsyncClient(
+        **kwargs,
+        event_hooks={"request": [a_on_request], "response": [a_on_response]},
+    )
+    _async_clients[name] = (loop, client)
+    return client
+
+
+def _pool_stats(client: httpx.Client | httpx.AsyncClient) -> dict:
+    """Connection counts from the httpcore pool, when the transport exposes it."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if c.is_idle())
+    return {"open": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+def stats() -> dict:
+    """Per-upstream request counters and pool occupancy for this worker."""
+    out: Dict[str, dict] = {}
+    for name, counts in _counters.items():
+        entry: dict = dict(counts)
+        sync_client: Optional[httpx.Client] = _sync_clients.get(name)
+        if sync_client is not None and not sync_client.is_closed:
+            entry["sync_pool"] = _pool_stats(sync_client)
+        async_entry = _async_clients.get(name)
+        if async_entry is not None and not async_entry[1].is_closed:
+            entry["async_pool"] = _pool_stats(async_entry[1])
+        out[name] = entry
+    return {"http2": HTTP2_AVAILABLE, "upstreams": out}
+
+
+async def aclose_all() -> None:
+    """Close every pooled client — called on application shutdown."""
+    for name, (loop, client) in list(_async_clients.items()):
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+    _async_clients.clear()
+    with _lock:
+        for client in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
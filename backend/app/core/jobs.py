@@ -0,0 +1,182 @@
+"""
+Cluster-wide job coordination — each scheduled job runs on exactly one worker.
+
+Every uvicorn worker runs its own APScheduler and registers the same agent
+jobs.  Without coordination a 4-worker deploy sends four rounds of nudges,
+makes four Groq calls and writes four AgentRun rows per tick.
+
+schedule_coordinated() wraps each job so that, when its trigger fires, the
+worker first claims a row in the JobLease table with one conditional UPDATE:
+
+    UPDATE joblease SET holder = :me, lease_until = :now + window
+    WHERE job_id = :id AND (lease_until IS NULL OR lease_until < :now)
+
+Exactly one worker's UPDATE matches; the rest record a skipped run and
+return.  Ticks are aligned to the wall clock, tick = int(now // interval),
+not to each worker's own trigger time: the lease runs until the end of the
+current tick, so however far out of phase the workers' schedulers are, each
+tick runs once, and a crashed holder's lease has expired by the next one.
+
+The same conditional UPDATE is atomic on both SQLite and PostgreSQL, so no
+advisory-lock dialect branching is needed.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from app.core.rate_governor import AGENT, upstream_priority
+from app.db import engine
+from app.models import JobLease
+
+logger = logging.getLogger("fanxi.jobs")
+
+# Identifies this process as a lease holder — unique per worker across hosts.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Origin of the aligned ticks (lease times are naive UTC, like utcnow()).
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _ensure_row(session: Session, job_id: str) -> None:
+    if session.get(JobLease, job_id) is not None:
+        return
+    try:
+        session.add(JobLease(job_id=job_id))
+        session.commit()
+    except IntegrityError:
+        # Another worker created it first — that's fine
+        session.rollback()
+
+
+def _claim(session: Session, job_id: str, holder: str, now: datetime, until: datetime) -> bool:
+    _ensure_row(session, job_id)
+    result = session.exec(
+        update(JobLease)
+        .where(
+            JobLease.job_id == job_id,
+            (JobLease.lease_until.is_(None)) | (JobLease.lease_until < now),
+        )
+        .values(
+            holder=holder,
+            lease_until=until,
+            last_started_at=now,
+        )
+    )
+    session.commit()
+    return result.rowcount == 1
+
+
+def try_acquire(session: Session, job_id: str, holder: str, window_seconds: float) -> bool:
+    """Claim job_id for `window_seconds`.  True if this holder won the tick."""
+    now = datetime.utcnow()
+    return _claim(session, job_id, holder, now, now + timedelta(seconds=window_seconds))
+
+
+def try_acquire_tick(session: Session, job_id: str, holder: str, interval_seconds: float) -> bool:
+    """
+    Claim the current aligned tick of an interval job, until the tick ends.
+
+    The tick number is recorded in the holder ("host:pid@tick"), so the
+    JobLease row shows which tick ran where.
+    """
+    now = datetime.utcnow()
+    tick = int((now - _EPOCH).total_seconds() // interval_seconds)
+    until = _EPOCH + timedelta(seconds=(tick + 1) * interval_seconds)
+    return _claim(session, job_id, f"{holder}@{tick}", now, until)
+
+
+def record_skip(session: Session, job_id: str) -> None:
+    session.exec(
+        update(JobLease)
+        .where(JobLease.job_id == job_id)
+        .values(skipped_count=JobLease.skipped_count + 1)
+    )
+    session.commit()
+
+
+def record_finish(
+    session: Session, job_id: str, duration_ms: float, error: Optional[str] = None,
+) -> None:
+    session.exec(
+        update(JobLease)
+        .where(JobLease.job_id == job_id)
+        .values(
+            last_finished_at=datetime.utcnow(),
+            last_duration_ms=round(duration_ms, 1),
+            run_count=JobLease.run_count + 1,
+            last_error=error,
+        )
+    )
+    session.commit()
+
+
+def release(session: Session, job_id: str, holder: str) -> None:
+    """End `holder`'s lease early, so the next claimant needn't wait for it to expire."""
+    session.exec(
+        update(JobLease)
+        .where(JobLease.job_id == job_id, JobLease.holder == holder)
+        .values(lease_until=None)
+    )
+    session.commit()
+
+
+def coordinated(job_id: str, func: Callable[[], Any], interval_seconds: float) -> Callable[[], Any]:
+    """Wrap a sync job so only the worker holding the lease for this tick runs it."""
+
+    def _run() -> Any:
+        with Session(engine) as session:
+            if not try_acquire_tick(session, job_id, WORKER_ID, interval_seconds):
+                record_skip(session, job_id)
+                logger.debug("JOB_SKIPPED job_id=%s worker=%s", job_id, WORKER_ID)
+                return None
+
+        start = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            # Agents get whatever upstream budget live matches and users leave
+            with upstream_priority(AGENT):
+                return func()
+        except Exception as exc:
+            error = str(exc)[:500]
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            with Session(engine) as session:
+                record_finish(session, job_id, duration_ms, error)
+            logger.info(
+                "JOB_RUN job_id=%s worker=%s duration_ms=%.0f success=%s",
+                job_id, WORKER_ID, duration_ms, error is None,
+            )
+
+    _run.__name__ = f"coordinated_{job_id}"
+    return _run
+
+
+def schedule_coordinated(
+    scheduler,
+    func: Callable[[], Any],
+    job_id: str,
+    misfire_grace_time: int,
+    **interval: float,
+) -> None:
+    """
+    add_job() replacement for cluster-singleton interval jobs.
+
+    `interval` takes the APScheduler interval kwargs (hours=, minutes=, ...).
+    """
+    seconds = timedelta(**interval).total_seconds()
+    scheduler.add_job(
+        coordinated(job_id, func, seconds),
+        "interval",
+        id=job_id,
+        replace_existing=True,
+        misfire_grace_time=misfire_grace_time,
+        **interval,
+    )
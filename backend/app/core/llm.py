@@ -0,0 +1,170 @@
+"""
+Shared async LLM client — every Groq call from app/api goes through here.
+
+The AI handlers are `async def`, but they used to build a synchronous
+Groq client per request and call it inline, so one 2–10 s completion froze
+the whole event loop (WebSocket fan-out, every other request) of that
+worker.  This module keeps one AsyncGroq client per event loop on the
+pooled "groq" HTTP client, so calls reuse keep-alive connections and await
+instead of blocking.
+
+    text = await llm.complete(messages, max_tokens=220, temperature=0.88)
+
+    async for piece in llm.stream(messages, max_tokens=2048):
+        ...
+
+Every call takes a slot from a per-worker concurrency limiter
+(GROQ_MAX_CONCURRENCY).  A call that can't get a slot within QUEUE_TIMEOUT
+is shed with LLMBusy instead of piling up behind the others.  Each call
+also has a timeout: the whole completion for complete(), and each gap
+between chunks for stream().
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from groq import AsyncGroq
+
+from app.config import settings
+from app.core.http_clients import get_async_client
+
+logger = logging.getLogger("fanxi.llm")
+
+MODEL = "llama-3.3-70b-versatile"
+DEFAULT_TIMEOUT = 30.0
+QUEUE_TIMEOUT = 5.0
+
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, AsyncGroq]] = {}
+_limits: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+_stats: Dict[str, float] = {
+    "calls": 0, "streams": 0, "errors": 0, "timeouts": 0, "shed": 0,
+    "in_flight": 0, "waiting": 0, "latency_ms_total": 0,
+}
+
+
+class LLMBusy(Exception):
+    """No free LLM slot within QUEUE_TIMEOUT — the call was shed."""
+
+
+def _client() -> AsyncGroq:
+    """AsyncGroq for the running loop, on the shared pooled HTTP client."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get("groq")
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+    client = AsyncGroq(
+        api_key=settings.groq_api_key,
+        http_client=get_async_client("groq"),
+        max_retries=1,
+    )
+    _clients["groq"] = (loop, client)
+    return client
+
+
+def _limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _limits.get(loop)
+    if sem is None:
+        _limits.clear()  # drop semaphores bound to loops that are gone
+        sem = _limits[loop] = asyncio.Semaphore(max(1, settings.groq_max_concurrency))
+    return sem
+
+
+@asynccontextmanager
+async def _slot() -> AsyncIterator[None]:
+    sem = _limit()
+    _stats["waiting"] += 1
+    try:
+        await asyncio.wait_for(sem.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["shed"] += 1
+        logger.warning("LLM_SHED in_flight=%d", _stats["in_flight"])
+        raise LLMBusy("AI service busy — try again shortly") from None
+    finally:
+        _stats["waiting"] -= 1
+    _stats["in_flight"] += 1
+    started = time.monotonic()
+    try:
+        yield
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise
+    except Exception:
+        _stats["errors"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+        _stats["latency_ms_total"] += (time.monotonic() - started) * 1000
+        sem.release()
+
+
+async def complete(
+    messages: List[dict],
+    *,
+    max_tokens: int,
+    temperature: float = 0.7,
+    timeout: float = DEFAULT_TIMEOUT,
+    model: str = MODEL,
+) -> str:
+    """Run one chat completion and return its text ("" if the model sent none)."""
+    async with _slot():
+        _stats["calls"] += 1
+        result = await asyncio.wait_for(
+            _client().chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=timeout,
+            ),
+            timeout,
+        )
+        return result.choices[0].message.content or ""
+
+
+async def stream(
+    messages: List[dict],
+    *,
+    max_tokens: int,
+    temperature: float = 0.7,
+    timeout: float = DEFAULT_TIMEOUT,
+    model: str = MODEL,
+) -> AsyncIterator[str]:
+    """
+    Yield the completion's text as it arrives.  `timeout` bounds the wait
+    for each chunk; the slot is held until the stream ends or is closed.
+    """
+    async with _slot():
+        _stats["streams"] += 1
+        response = await asyncio.wait_for(
+            _client().chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                timeout=timeout,
+            ),
+            timeout,
+        )
+        chunks = response.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await response.close()
+
+
+def stats() -> dict:
+    calls = _stats["calls"] + _stats["streams"]
+    out = {k: v for k, v in _stats.items() if k != "latency_ms_total"}
+    out["max_concurrency"] = settings.groq_max_concurrency
+    out["avg_latency_ms"] = round(_stats["latency_ms_total"] / calls, 1) if calls else None
+    return out
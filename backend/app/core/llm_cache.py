@@ -0,0 +1,216 @@
+"""
+Response cache for /ai/chat and /ai/chat/stream.
+
+Many fans send the same prompt — a scout report for the same nation,
+"critique my 4-3-3" with the same XI — and each one used to cost a full
+2048-token completion.  Answers are cached per mode:
+
+  - exact match    : mode + a hash of the normalized conversation
+                     (case, punctuation and whitespace folded).
+  - near duplicate : the final user message is compared by MinHash over
+                     word 3-grams, within the same mode and the same earlier
+                     turns.  An estimated Jaccard similarity of at least
+                     NEAR_DUPLICATE_THRESHOLD counts as a hit, but only if
+                     both messages name the same players and numbers (see
+                     entity_tokens).  Opt-in per mode with
+                     AI_CACHE_NEAR_DUPLICATE_MODES (default: scout_report).
+                     On a long lineup prompt one swapped player barely moves
+                     the similarity, so critique and formation answers would
+                     otherwise be served for a different XI.
+
+TTLs are per mode (MODE_TTLS): scout reports and formation advice stay
+good for hours, while chat and live commentary go stale quickly.
+
+stats() reports hits, misses, and the Groq calls and generation seconds
+saved, for /admin/metrics.  The cache is per worker.
+"""
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.config import settings
+from app.core.cache import FRESH, TTLCache
+
+MODE_TTLS: Dict[str, int] = {
+    "scout_report": 6 * 3600,
+    "formation": 6 * 3600,
+    "critique": 3600,
+    "chat": 900,
+    "commentary": 300,
+}
+NEAR_DUPLICATE_THRESHOLD = 0.9
+
+# MinHash: NUM_PERM hash functions split into LSH bands of ROWS rows each
+NUM_PERM = 64
+ROWS = 4
+_PRIME = (1 << 61) - 1
+_rng = random.Random(2026)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+_SENTENCES = re.compile(r"(?:^|[.!?]\s+|\n+)")
+_WORD = re.compile(r"[\w'-]+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _SPACE.sub(" ", _PUNCT.sub(" ", text)).strip()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def minhash(text: str) -> Tuple[int, ...]:
+    words = text.split()
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS)
+
+
+def entity_tokens(text: str) -> frozenset:
+    """
+    Player names and numbers in a message: capitalised words that don't
+    start a sentence, and any word with a digit (shirt numbers, "4-3-3",
+    "pressing 80").  Two prompts that differ here are about different
+    lineups, however similar the rest of the wording.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    tokens = set()
+    for sentence in _SENTENCES.split(text):
+        for i, word in enumerate(_WORD.findall(sentence)):
+            if any(c.isdigit() for c in word) or (i > 0 and word[0].isupper()):
+                tokens.add(word.lower())
+    return frozenset(tokens)
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+@dataclass(frozen=True)
+class _Answer:
+    text: str
+    seconds: float  # what generating it cost
+
+
+class ResponseCache:
+    def __init__(self, max_size: int = 1000, near_duplicate_modes: Iterable[str] = ()) -> None:
+        self.near_duplicate_modes = frozenset(near_duplicate_modes)
+        self._cache = TTLCache(max_size, stale_grace=0)
+        self._lock = threading.Lock()
+        # LSH buckets: (context, band, band values) -> cache keys
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = {}
+        # cache key -> (context key, MinHash signature, entity tokens)
+        self._signatures: Dict[str, Tuple[str, Tuple[int, ...], frozenset]] = {}
+        self._counts: Dict[str, float] = {
+            "hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "seconds_saved": 0.0,
+        }
+
+    @staticmethod
+    def _keys(mode: str, messages: List[dict]) -> Tuple[str, str, str]:
+        """(exact key, context key, raw last message)."""
+        turns = [f"{m['role']}:{normalize(m['content'])}" for m in messages]
+        last = messages[-1]["content"] if messages else ""
+        return _digest(mode, *turns), _digest(mode, *turns[:-1]), last
+
+    def lookup(self, mode: str, messages: List[dict]) -> Optional[str]:
+        key, context, last = self._keys(mode, messages)
+        status, answer = self._cache.lookup(key)
+        if status != FRESH and mode in self.near_duplicate_modes:
+            answer = self._near(context, last)
+            status = FRESH if answer is not None else status
+            kind = "near_hits"
+        else:
+            kind = "hits"
+        with self._lock:
+            if status != FRESH:
+                self._counts["misses"] += 1
+                return None
+            self._counts[kind] += 1
+            self._counts["seconds_saved"] += answer.seconds
+        return answer.text
+
+    def store(self, mode: str, messages: List[dict], text: str, seconds: float) -> None:
+        if not text:
+            return
+        key, context, last = self._keys(mode, messages)
+        self._cache.set(key, _Answer(text, seconds), MODE_TTLS.get(mode, 900))
+        with self._lock:
+            self._counts["stores"] += 1
+            if mode in self.near_duplicate_modes:
+                sig = minhash(normalize(last))
+                self._signatures[key] = (context, sig, entity_tokens(last))
+                for band, values in self._bands(sig):
+                    self._buckets.setdefault((context, band, values), set()).add(key)
+                if len(self._signatures) > 2 * self._cache.max_size:
+                    self._prune()
+
+    def _near(self, context: str, last: str) -> Optional[_Answer]:
+        sig = minhash(normalize(last))
+        entities = entity_tokens(last)
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, values in self._bands(sig):
+                candidates |= self._buckets.get((context, band, values), set())
+            scored = sorted(
+                ((similarity(sig, self._signatures[k][1]), k) for k in candidates
+                 if k in self._signatures and self._signatures[k][2] == entities),
+                reverse=True,
+            )
+        for score, key in scored:
+            if score < NEAR_DUPLICATE_THRESHOLD:
+                break
+            status, answer = self._cache.lookup(key)
+            if status == FRESH:
+                return answer
+        return None
+
+    @staticmethod
+    def _bands(sig: Tuple[int, ...]):
+        for band in range(NUM_PERM // ROWS):
+            yield band, sig[band * ROWS:(band + 1) * ROWS]
+
+    def _prune(self) -> None:
+        """Drop index entries whose answers have expired or been evicted."""
+        live = set(self._cache)
+        self._signatures = {k: v for k, v in self._signatures.items() if k in live}
+        for bucket_key in list(self._buckets):
+            keys = self._buckets[bucket_key] & live
+            if keys:
+                self._buckets[bucket_key] = keys
+            else:
+                del self._buckets[bucket_key]
+
+    def clear(self) -> None:
+        self._cache.clear()
+        with self._lock:
+            self._buckets.clear()
+            self._signatures.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["near_hits"] + counts["misses"]
+        return {
+            "size": len(self._cache),
+            "near_duplicate_modes": sorted(self.near_duplicate_modes),
+            **{k: v for k, v in counts.items() if k != "seconds_saved"},
+            "groq_calls_saved": counts["hits"] + counts["near_hits"],
+            "seconds_saved": round(counts["seconds_saved"], 1),
+            "hit_rate": round((lookups - counts["misses"]) / lookups, 3) if lookups else None,
+        }
+
+
+response_cache = ResponseCache(near_duplicate_modes=[
+    mode.strip() for mode in settings.ai_cache_near_duplicate_modes.split(",") if mode.strip()
+])
@@ -0,0 +1,274 @@
+"""
+Upstream rate-limit governor — token buckets with request priorities.
+
+football-data.org allows 10 requests a minute on the free tier, and that
+budget is shared by every uvicorn worker, the live poller, the commentary
+job, the /matches/{id}/* routes and the agents.  Each upstream gets one
+token bucket, and every call that would actually go upstream (cache misses
+and refreshes — not cache hits) takes a token first.
+
+Priorities decide who gets the last tokens:
+
+    LIVE  — the live-match poller.  May drain the bucket; waits for a token.
+    USER  — request handlers.  Must leave LIVE_RESERVE of the bucket for the
+            poller; waits briefly, then is shed.
+    AGENT — scheduled agents.  Must leave AGENT_RESERVE of the bucket;
+            never waits.
+
+Shed calls raise RateLimited; callers already treat upstream failures as
+"no data" (or serve a stale cached value).
+
+The bucket lives in Redis when REDIS_URL is set, so the limit is truly
+cluster-wide (an atomic Lua script refills and takes, using Redis' own
+clock).  Without Redis each worker gets an equal share of the budget.
+
+Priority travels in a context variable: upstream_priority(LIVE) around a
+block, or set_priority() at the top of a scheduler job.
+"""
+import asyncio
+import contextvars
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger("fanxi.rate_governor")
+
+LIVE, USER, AGENT = 0, 1, 2
+_PRIORITY_NAMES = {LIVE: "live", USER: "user", AGENT: "agent"}
+
+# Share of bucket capacity a priority must leave untouched, and how long it may queue
+LIVE_RESERVE = 0.2
+AGENT_RESERVE = 0.5
+_RESERVE = {LIVE: 0, USER: LIVE_RESERVE, AGENT: AGENT_RESERVE}
+_MAX_WAIT = {LIVE: 30.0, USER: 3.0, AGENT: 0.0}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("upstream_priority", default=USER)
+
+
+class RateLimited(Exception):
+    """Upstream budget exhausted for this priority — the call was shed."""
+
+    def __init__(self, upstream: str, priority: int) -> None:
+        super().__init__(f"{upstream} budget exhausted for {_PRIORITY_NAMES[priority]} call")
+        self.upstream = upstream
+        self.priority = priority
+
+
+@contextmanager
+def upstream_priority(priority: int) -> Iterator[None]:
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def set_priority(priority: int) -> None:
+    """Set the priority for the rest of the current context (thread / task)."""
+    _priority.set(priority)
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    capacity: float
+    per_second: float
+
+
+# ---------------------------------------------------------------------------
+# Bucket stores
+# ---------------------------------------------------------------------------
+
+class _LocalStore:
+    """In-process buckets — this worker's share of the budget."""
+
+    name = "in_process"
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, spec: BucketSpec, floor: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (spec.capacity, now))
+            tokens = min(spec.capacity, tokens + (now - ts) * spec.per_second)
+            granted = tokens - 1 >= floor
+            if granted:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            return granted, tokens
+
+    def peek(self, key: str, spec: BucketSpec) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (spec.capacity, now))
+            return min(spec.capacity, tokens + (now - ts) * spec.per_second)
+
+
+_TAKE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local floor = tonumber(ARGV[3])
+local take = tonumber(ARGV[4])
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or capacity
+local ts = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local granted = 0
+if take > 0 and tokens - take >= floor then
+  tokens = tokens - take
+  granted = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {granted, tostring(tokens)}
+"""
+
+
+class _RedisStore:
+    """Cluster-wide buckets in any Redis-protocol server."""
+
+    name = "redis"
+    PREFIX = "fanxi:rate:"
+
+    def __init__(self, url: str) -> None:
+        import redis  # optional dependency
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._take = self._redis.register_script(_TAKE_LUA)
+
+    def take(self, key: str, spec: BucketSpec, floor: float) -> Tuple[bool, float]:
+        granted, tokens = self._take(
+            keys=[self.PREFIX + key], args=[spec.capacity, spec.per_second, floor, 1],
+        )
+        return bool(granted), float(tokens)
+
+    def peek(self, key: str, spec: BucketSpec) -> float:
+        _, tokens = self._take(
+            keys=[self.PREFIX + key], args=[spec.capacity, spec.per_second, 0, 0],
+        )
+        return float(tokens)
+
+
+# ---------------------------------------------------------------------------
+# Governor
+# ---------------------------------------------------------------------------
+
+class Governor:
+    def __init__(self, store, specs: Dict[str, BucketSpec]) -> None:
+        self.store = store
+        self.specs = specs
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {
+            name: {"granted": 0, "queued": 0, "shed": 0} for name in specs
+        }
+
+    def _count(self, upstream: str, what: str) -> None:
+        with self._lock:
+            self._counts[upstream][what] += 1
+
+    def _try(self, upstream: str, priority: int) -> Tuple[bool, float]:
+        spec = self.specs[upstream]
+        return self.store.take(upstream, spec, spec.capacity * _RESERVE[priority])
+
+    def _retry_after(self, upstream: str) -> float:
+        return 1.0 / self.specs[upstream].per_second
+
+    def acquire_sync(self, upstream: str, priority: Optional[int] = None) -> None:
+        """Take one token for `upstream`, waiting up to the priority's limit.  Raises RateLimited."""
+        priority = _priority.get() if priority is None else priority
+        deadline = time.monotonic() + _MAX_WAIT[priority]
+        queued = False
+        while True:
+            granted, _ = self._try(upstream, priority)
+            if granted:
+                self._count(upstream, "granted")
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._count(upstream, "shed")
+                logger.warning("UPSTREAM_SHED upstream=%s priority=%s", upstream, _PRIORITY_NAMES[priority])
+                raise RateLimited(upstream, priority)
+            if not queued:
+                queued = True
+                self._count(upstream, "queued")
+            time.sleep(min(remaining, self._retry_after(upstream)))
+
+    async def acquire(self, upstream: str, priority: Optional[int] = None) -> None:
+        """Async acquire_sync — waits without blocking the event loop."""
+        priority = _priority.get() if priority is None else priority
+        deadline = time.monotonic() + _MAX_WAIT[priority]
+        queued = False
+        while True:
+            if isinstance(self.store, _LocalStore):
+                granted, _ = self._try(upstream, priority)
+            else:
+                granted, _ = await asyncio.to_thread(self._try, upstream, priority)
+            if granted:
+                self._count(upstream, "granted")
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._count(upstream, "shed")
+                logger.warning("UPSTREAM_SHED upstream=%s priority=%s", upstream, _PRIORITY_NAMES[priority])
+                raise RateLimited(upstream, priority)
+            if not queued:
+                queued = True
+                self._count(upstream, "queued")
+            await asyncio.sleep(min(remaining, self._retry_after(upstream)))
+
+    def stats(self) -> dict:
+        out = {}
+        for name, spec in self.specs.items():
+            try:
+                remaining = round(self.store.peek(name, spec), 2)
+            except Exception:
+                remaining = None
+            with self._lock:
+                out[name] = {
+                    "remaining": remaining,
+                    "capacity": spec.capacity,
+                    "per_minute": round(spec.per_second * 60, 2),
+                    **self._counts[name],
+                }
+        return {"store": self.store.name, "buckets": out}
+
+
+def _specs(share: float) -> Dict[str, BucketSpec]:
+    def per_minute(n: int) -> BucketSpec:
+        scaled = max(1.0, n * share)
+        return BucketSpec(capacity=math.ceil(scaled), per_second=scaled / 60)
+
+    return {
+        "football_data": per_minute(settings.football_data_rate_per_minute),
+        "api_football": per_minute(settings.api_football_rate_per_minute),
+    }
+
+
+_governor: Optional[Governor] = None
+
+
+def get_governor() -> Governor:
+    """Redis-backed when REDIS_URL is set and the client is installed, else per-worker share."""
+    global _governor
+    if _governor is None:
+        store = None
+        if settings.redis_url:
+            try:
+                store = _RedisStore(settings.redis_url)
+            except ImportError:
+                logger.warning("REDIS_URL set but redis package not installed — using per-worker rate buckets")
+        if store is None:
+            _governor = Governor(_LocalStore(), _specs(1 / max(1, settings.fanxi_workers)))
+        else:
+            _governor = Governor(store, _specs(1.0))
+        logger.info("Upstream rate governor: %s", _governor.store.name)
+    return _governor
@@ -0,0 +1,238 @@
+"""
+Static WC 2026 group-stage fixtures.
+
+The full 72-match group stage is built from GROUP_DATA using a round-robin
+generator.  Fixtures follow the official FIFA WC 2026 draw (Dec 2024) with
+schedule dates spanning June 11–27.  Each fixture entry contains:
+  - id                      (int) : 1001–1072
+  - home_team / away_team   (str) : nation names, with home_flag / away_flag
+  - kickoff                 (str) : ISO 8601 with UTC offset
+  - venue, round, group, matchday
+"""
+
+# ---------------------------------------------------------------------------
+# Group data — 12 groups × 4 teams, with dates + venues per matchday
+# Round-robin matchups:
+#   MD1: T1 vs T2,  T3 vs T4
+#   MD2: T1 vs T3,  T2 vs T4
+#   MD3: T1 vs T4,  T2 vs T3  (simultaneous — final group day drama)
+# ---------------------------------------------------------------------------
+
+GROUP_DATA: dict = {
+    'A': {
+        'teams': [('Mexico','🇲🇽'), ('USA','🇺🇸'), ('Canada','🇨🇦'), ('Uruguay','🇺🇾')],
+        'base_id': 1001,
+        'md1_dates': ['2026-06-11T13:00:00-04:00', '2026-06-11T19:00:00-04:00'],
+        'md2_dates': ['2026-06-18T13:00:00-04:00', '2026-06-18T19:00:00-04:00'],
+        'md3_dates': ['2026-06-25T13:00:00-04:00', '2026-06-25T13:00:00-04:00'],
+        'venues': [
+            'Estadio Azteca, Mexico City',
+            'MetLife Stadium, NJ',
+            'AT&T Stadium, Dallas',
+            'BC Place, Vancouver',
+            'SoFi Stadium, LA',
+            'Gillette Stadium, Boston',
+        ],
+    },
+    'B': {
+        'teams': [('Argentina','🇦🇷'), ('Ecuador','🇪🇨'), ('Chile','🇨🇱'), ('Peru','🇵🇪')],
+        'base_id': 1007,
+        'md1_dates': ['2026-06-11T16:00:00-04:00', '2026-06-11T22:00:00-04:00'],
+        'md2_dates': ['2026-06-18T16:00:00-04:00', '2026-06-18T22:00:00-04:00'],
+        'md3_dates': ['2026-06-25T13:00:00-04:00', '2026-06-25T13:00:00-04:00'],
+        'venues': [
+            'AT&T Stadium, Dallas',
+            'Rose Bowl, LA',
+            'Hard Rock Stadium, Miami',
+            'Mercedes-Benz Stadium, Atlanta',
+            "Levi's Stadium, SF",
+            'NRG Stadium, Houston',
+        ],
+    },
+    'C': {
+        'teams': [('France','🇫🇷'), ('Morocco','🇲🇦'), ('Belgium','🇧🇪'), ('Switzerland','🇨🇭')],
+        'base_id': 1013,
+        'md1_dates': ['2026-06-12T13:00:00-04:00', '2026-06-12T16:00:00-04:00'],
+        'md2_dates': ['2026-06-19T13:00:00-04:00', '2026-06-19T16:00:00-04:00'],
+        'md3_dates': ['2026-06-25T19:00:00-04:00', '2026-06-25T19:00:00-04:00'],
+        'venues': [
+            'SoFi Stadium, LA',
+            "Levi's Stadium, SF",
+            'MetLife Stadium, NJ',
+            'Lincoln Financial Field, Philadelphia',
+            'Gillette Stadium, Boston',
+            'Hard Rock Stadium, Miami',
+        ],
+    },
+    'D': {
+        'teams': [('Brazil','🇧🇷'), ('Colombia','🇨🇴'), ('Paraguay','🇵🇾'), ('Venezuela','🇻🇪')],
+        'base_id': 1019,
+        'md1_dates': ['2026-06-12T19:00:00-04:00', '2026-06-12T22:00:00-04:00'],
+        'md2_dates': ['2026-06-19T19:00:00-04:00', '2026-06-19T22:00:00-04:00'],
+        'md3_dates': ['2026-06-25T19:00:00-04:00', '2026-06-25T19:00:00-04:00'],
+        'venues': [
+            'Gillette Stadium, Boston',
+            'NRG Stadium, Houston',
+            'SoFi Stadium, LA',
+            'AT&T Stadium, Dallas',
+            'MetLife Stadium, NJ',
+            'Rose Bowl, LA',
+        ],
+    },
+    'E': {
+        'teams': [('England','🏴󠁧󠁢󠁥󠁮󠁧󠁿'), ('Senegal','🇸🇳'), ('Netherlands','🇳🇱'), ('Iran','🇮🇷')],
+        'base_id': 1025,
+        'md1_dates': ['2026-06-13T13:00:00-04:00', '2026-06-13T16:00:00-04:00'],
+        'md2_dates': ['2026-06-20T13:00:00-04:00', '2026-06-20T16:00:00-04:00'],
+        'md3_dates': ['2026-06-26T13:00:00-04:00', '2026-06-26T13:00:00-04:00'],
+        'venues': [
+            'Hard Rock Stadium, Miami',
+            'Lincoln Financial Field, Philadelphia',
+            'Lumen Field, Seattle',
+            'Arrowhead Stadium, KC',
+            'AT&T Stadium, Dallas',
+            'NRG Stadium, Houston',
+        ],
+    },
+    'F': {
+        'teams': [('Spain','🇪🇸'), ('Japan','🇯🇵'), ('South Korea','🇰🇷'), ('Saudi Arabia','🇸🇦')],
+        'base_id': 1031,
+        'md1_dates': ['2026-06-13T19:00:00-04:00', '2026-06-13T22:00:00-04:00'],
+        'md2_dates': ['2026-06-20T19:00:00-04:00', '2026-06-20T22:00:00-04:00'],
+        'md3_dates': ['2026-06-26T13:00:00-04:00', '2026-06-26T13:00:00-04:00'],
+        'venues': [
+            'Lumen Field, Seattle',
+            'Arrowhead Stadium, KC',
+            'Rose Bowl, LA',
+            'Estadio Azteca, Mexico City',
+            'BC Place, Vancouver',
+            "Levi's Stadium, SF",
+        ],
+    },
+    'G': {
+        'teams': [('Germany','🇩🇪'), ('Austria','🇦🇹'), ('Poland','🇵🇱'), ('Ukraine','🇺🇦')],
+        'base_id': 1037,
+        'md1_dates': ['2026-06-14T13:00:00-04:00', '2026-06-14T16:00:00-04:00'],
+        'md2_dates': ['2026-06-21T13:00:00-04:00', '2026-06-21T16:00:00-04:00'],
+        'md3_dates': ['2026-06-26T19:00:00-04:00', '2026-06-26T19:00:00-04:00'],
+        'venues': [
+            'Mercedes-Benz Stadium, Atlanta',
+            'BC Place, Vancouver',
+            'MetLife Stadium, NJ',
+            'SoFi Stadium, LA',
+            'Gillette Stadium, Boston',
+            'AT&T Stadium, Dallas',
+        ],
+    },
+    'H': {
+        'teams': [('Portugal','🇵🇹'), ('Nigeria','🇳🇬'), ('Ghana','🇬🇭'), ('Cameroon','🇨🇲')],
+        'base_id': 1043,
+        'md1_dates': ['2026-06-14T19:00:00-04:00', '2026-06-14T22:00:00-04:00'],
+        'md2_dates': ['2026-06-21T19:00:00-04:00', '2026-06-21T22:00:00-04:00'],
+        'md3_dates': ['2026-06-26T19:00:00-04:00', '2026-06-26T19:00:00-04:00'],
+        'venues': [
+            'BMO Field, Toronto',
+            'MetLife Stadium, NJ',
+            'Hard Rock Stadium, Miami',
+            'Lumen Field, Seattle',
+            'Arrowhead Stadium, KC',
+            'Lincoln Financial Field, Philadelphia',
+        ],
+    },
+    'I': {
+        'teams': [('Croatia','🇭🇷'), ('Algeria','🇩🇿'), ('Tunisia','🇹🇳'), ('Egypt','🇪🇬')],
+        'base_id': 1049,
+        'md1_dates': ['2026-06-15T13:00:00-04:00', '2026-06-15T16:00:00-04:00'],
+        'md2_dates': ['2026-06-22T13:00:00-04:00', '2026-06-22T16:00:00-04:00'],
+        'md3_dates': ['2026-06-27T13:00:00-04:00', '2026-06-27T13:00:00-04:00'],
+        'venues': [
+            'SoFi Stadium, LA',
+            'Estadio Azteca, Mexico City',
+            'NRG Stadium, Houston',
+            'AT&T Stadium, Dallas',
+            'Rose Bowl, LA',
+            'Mercedes-Benz Stadium, Atlanta',
+        ],
+    },
+    'J': {
+        'teams': [('Australia','🇦🇺'), ('New Zealand','🇳🇿'), ('Serbia','🇷🇸'), ('Turkey','🇹🇷')],
+        'base_id': 1055,
+        'md1_dates': ['2026-06-15T19:00:00-04:00', '2026-06-15T22:00:00-04:00'],
+        'md2_dates': ['2026-06-22T19:00:00-04:00', '2026-06-22T22:00:00-04:00'],
+        'md3_dates': ['2026-06-27T13:00:00-04:00', '2026-06-27T13:00:00-04:00'],
+        'venues': [
+            'AT&T Stadium, Dallas',
+            'Rose Bowl, LA',
+            'Lincoln Financial Field, Philadelphia',
+            'Mercedes-Benz Stadium, Atlanta',
+            "Levi's Stadium, SF",
+            'BC Place, Vancouver',
+        ],
+    },
+    'K': {
+        'teams': [('Costa Rica','🇨🇷'), ('Panama','🇵🇦'), ('Jamaica','🇯🇲'), ('Bolivia','🇧🇴')],
+        'base_id': 1061,
+        'md1_dates': ['2026-06-16T13:00:00-04:00', '2026-06-16T16:00:00-04:00'],
+        'md2_dates': ['2026-06-23T13:00:00-04:00', '2026-06-23T16:00:00-04:00'],
+        'md3_dates': ['2026-06-27T19:00:00-04:00', '2026-06-27T19:00:00-04:00'],
+        'venues': [
+            'Estadio BBVA, Monterrey',
+            'Estadio Akron, Guadalajara',
+            'Estadio Azteca, Mexico City',
+            'Arrowhead Stadium, KC',
+            'NRG Stadium, Houston',
+            'Hard Rock Stadium, Miami',
+        ],
+    },
+    'L': {
+        'teams': [('Italy','🇮🇹'), ('South Africa','🇿🇦'), ("Côte d'Ivoire",'🇨🇮'), ('Czech Republic','🇨🇿')],
+        'base_id': 1067,
+        'md1_dates': ['2026-06-16T19:00:00-04:00', '2026-06-16T22:00:00-04:00'],
+        'md2_dates': ['2026-06-23T19:00:00-04:00', '2026-06-23T22:00:00-04:00'],
+        'md3_dates': ['2026-06-27T19:00:00-04:00', '2026-06-27T19:00:00-04:00'],
+        'venues': [
+            'Hard Rock Stadium, Miami',
+            'Gillette Stadium, Boston',
+            'BMO Field, Toronto',
+            'Lumen Field, Seattle',
+            'SoFi Stadium, LA',
+            'MetLife Stadium, NJ',
+        ],
+    },
+}
+
+
+def build_group_fixtures(group: str, data: dict) -> list:
+    """Generate 6 round-robin fixtures for a single group."""
+    t = data['teams']   # list of (name, flag) tuples
+    base = data['base_id']
+    matches = [
+        # MD1
+        (t[0], t[1], data['md1_dates'][0], data['venues'][0], 1),
+        (t[2], t[3], data['md1_dates'][1], data['venues'][1], 1),
+        # MD2
+        (t[0], t[2], data['md2_dates'][0], data['venues'][2], 2),
+        (t[1], t[3], data['md2_dates'][1], data['venues'][3], 2),
+        # MD3 — simultaneous within group
+        (t[0], t[3], data['md3_dates'][0], data['venues'][4], 3),
+        (t[1], t[2], data['md3_dates'][1], data['venues'][5], 3),
+    ]
+    result = []
+    for i, (home, away, kickoff, venue, md) in enumerate(matches):
+        result.append({
+            "id": base + i,
+            "home_team": home[0], "home_flag": home[1],
+            "away_team": away[0], "away_flag": away[1],
+            "kickoff": kickoff,
+            "venue": venue,
+            "round": f"Group {group} · MD{md}",
+            "group": group,
+            "matchday": md,
+        })
+    return result
+
+
+# Build full list at import time (72 fixtures, IDs 1001–1072)
+ALL_FIXTURES: list = []
+for _grp, _data in GROUP_DATA.items():
+    ALL_FIXTURES.extend(build_group_fixtures(_grp, _data))
@@ -2,8 +2,10 @@ import logging
 import time
 from typing import Iterator
 
-from sqlalchemy import event, text
-from sqlmodel import SQLModel, create_engine, Session, select
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import create_engine, Session, select
 from app.config import settings
 
 db_logger = logging.getLogger("fanxi.db")
@@ -74,77 +76,42 @@ def get_session() -> Iterator[Session]:
         yield session
 
 
+def dialect_insert(dialect: str):
+    """The insert() construct with on_conflict_do_* for `dialect` (upserts)."""
+    if dialect == "postgresql":
+        return pg_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    raise RuntimeError(f"upsert not supported on {dialect}")
+
+
 # ---------------------------------------------------------------------------
 # Initialisation
 # ---------------------------------------------------------------------------
 
-def run_migrations() -> None:
-    """
-    Add new columns to existing tables without dropping data.
-
-    Uses an existence check before ALTER TABLE so this is safe to call on
-    every startup on both SQLite and PostgreSQL. PostgreSQL aborts the whole
-    transaction on a duplicate-column error, so we must avoid the error
-    rather than catch it.
-    """
-    new_columns = [
-        # MatchPrediction — 5 core outcome prediction fields
-        ("matchprediction", "match_result",       "TEXT"),
-        ("matchprediction", "btts_prediction",    "INTEGER"),
-        ("matchprediction", "correct_score",      "JSON"),
-        ("matchprediction", "over_under",         "JSON"),
-        ("matchprediction", "ht_ft",              "JSON"),
-        ("matchprediction", "player_predictions", "JSON"),
-        # User — admin + ban flags
-        ("user", "is_admin", "BOOLEAN DEFAULT FALSE"),
-        ("user", "is_banned", "BOOLEAN DEFAULT FALSE"),
-        # MatchDB — real result columns for scoring
-        ("matchdb", "home_goals",    "INTEGER"),
-        ("matchdb", "away_goals",    "INTEGER"),
-        ("matchdb", "ht_home_goals", "INTEGER"),
-        ("matchdb", "ht_away_goals", "INTEGER"),
-    ]
-    is_pg = "postgresql" in (settings.database_url or "")
-    with engine.connect() as conn:
-        for table, col, col_type in new_columns:
-            # Quote table name — "user" is a reserved word in PostgreSQL
-            quoted = f'"{table}"'
-            if is_pg:
-                exists = conn.execute(text(
-                    "SELECT 1 FROM information_schema.columns "
-                    "WHERE table_name = :t AND column_name = :c"
-                ), {"t": table, "c": col}).fetchone()
-            else:
-                # SQLite: PRAGMA table_info (unquoted — SQLite ignores quotes in PRAGMA)
-                rows = conn.execute(text(f"PRAGMA table_info({table})")).fetchall()
-                exists = any(row[1] == col for row in rows)
-
-            if not exists:
-                conn.execute(text(f"ALTER TABLE {quoted} ADD COLUMN {col} {col_type}"))
-                conn.commit()
-
-
 def init_db() -> None:
     """
-    Create all database tables if they do not already exist, then run
-    any pending column migrations.
+    Bring the schema up to date (see app.migrations).
 
     We import every model class here so SQLModel's metadata registry is
-    populated before create_all() runs.  If a model is never imported,
-    its table will not be created.
+    populated before the baseline migration's create_all() runs.  If a
+    model is never imported, its table will not be created.
 
-    This function is idempotent — safe to call on every server startup.
+    Once the schema is current this is a single version query — safe and
+    cheap to call on every worker startup.
     """
     # All table-backed models must be imported before create_all()
     from app.models import (  # noqa: F401
         User, Player, MatchPrediction, PredictionDB,
         TeamDB, MatchDB, TeamSquadCache, PasswordResetToken,
         AgentRun, ApprovalQueue, AuthEvent, ScoutReport, VisionCache,
-        NudgeLog, InAppNotification,
+        NudgeLog, InAppNotification, LeaderboardRank, JobLease, NewsAngle,
+        SchemaMigration, MatchPulseCount,
     )
+    from app import migrations
 
-    SQLModel.metadata.create_all(engine)
-    run_migrations()
+    version = migrations.migrate()
+    db_logger.info("SCHEMA_VERSION version=%d", version)
 
 
 # ---------------------------------------------------------------------------
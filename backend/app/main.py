@@ -10,6 +10,9 @@ from app.api import users, predictions, leagues, teams, intel, squads, matches,
 from app.websocket import match_ws
 from app import web
 from app.db import init_db, engine
+from app.core import http_clients
+from app.core.jobs import schedule_coordinated
+from app.services import card_renderer, intel_feeds
 from app.config import settings
 from app.middleware.observability import ObservabilityMiddleware
 
@@ -206,7 +209,7 @@ async def readiness_check():
 
 
 # ---------------------------------------------------------------------------
-# Startup hook
+# Startup / shutdown hooks
 # ---------------------------------------------------------------------------
 
 @app.on_event("startup")
@@ -216,29 +219,43 @@ def on_startup():
     match_ws.scheduler.start()
     logger.info("APScheduler started for live match polling.")
 
+    # Intel RSS ingestion — per worker (each worker serves from its own index),
+    # first poll immediately so the index is warm before traffic arrives
+    match_ws.scheduler.add_job(
+        intel_feeds.refresh,
+        "interval",
+        seconds=intel_feeds.REFRESH_INTERVAL,
+        id="intel_feeds_refresh",
+        next_run_time=datetime.now(timezone.utc),
+        replace_existing=True,
+        misfire_grace_time=60,
+    )
+
     # -----------------------------------------------------------------------
     # Avengers Initiative — scheduled agent jobs
+    #
+    # Every worker registers every job, but schedule_coordinated() makes each
+    # tick claim a DB lease first, so a job runs on exactly one worker per
+    # tick no matter how many FANXI_WORKERS are running.
     # -----------------------------------------------------------------------
     from app.agents.natasha import Natasha
     _natasha = Natasha()
 
     # NATASHA secrets scan — every 24 hours
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _natasha.run_secrets_scan,
-        "interval",
+        "natasha_secrets_scan",
         hours=24,
-        id="natasha_secrets_scan",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # NATASHA auth watchdog — every 5 minutes
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _natasha.run_auth_watchdog,
-        "interval",
+        "natasha_auth_watchdog",
         minutes=5,
-        id="natasha_auth_watchdog",
-        replace_existing=True,
         misfire_grace_time=60,
     )
 
@@ -248,12 +265,11 @@ def on_startup():
     from app.agents.rhodey import Rhodey
     _rhodey = Rhodey()
 
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _rhodey.run_ci_scan,
-        "interval",
+        "rhodey_ci_scan",
         hours=6,
-        id="rhodey_ci_scan",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
@@ -264,52 +280,47 @@ def on_startup():
     _vision = Vision()
 
     # VISION squad audit — every 24 hours
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _vision.run_squad_audit,
-        "interval",
+        "vision_squad_audit",
         hours=24,
-        id="vision_squad_audit",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # VISION scout reports — every 6 hours
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _vision.run_scout_reports,
-        "interval",
+        "vision_scout_reports",
         hours=6,
-        id="vision_scout_reports",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # VISION H2H pre-generator — every 12 hours
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _vision.run_h2h_generation,
-        "interval",
+        "vision_h2h_pregenerator",
         hours=12,
-        id="vision_h2h_pregenerator",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # VISION formation profiles — weekly (168 hours)
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _vision.run_formation_profiles,
-        "interval",
+        "vision_formation_profiles",
         hours=168,
-        id="vision_formation_profiles",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # VISION post-match reviewer — every 30 minutes
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _vision.run_post_match_review,
-        "interval",
+        "vision_post_match_checker",
         minutes=30,
-        id="vision_post_match_checker",
-        replace_existing=True,
         misfire_grace_time=300,
     )
 
@@ -320,22 +331,20 @@ def on_startup():
     _pietro = Pietro()
 
     # PIETRO match monitor — every 15 minutes
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _pietro.run_match_nudge,
-        "interval",
+        "pietro_match_monitor",
         minutes=15,
-        id="pietro_match_monitor",
-        replace_existing=True,
         misfire_grace_time=300,
     )
 
     # PIETRO conversion tracker — every 90 minutes
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _pietro.run_conversion_check,
-        "interval",
+        "pietro_conversion_tracker",
         minutes=90,
-        id="pietro_conversion_tracker",
-        replace_existing=True,
         misfire_grace_time=600,
     )
 
@@ -346,22 +355,20 @@ def on_startup():
     _wanda = Wanda()
 
     # WANDA full scan — every 24 hours
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _wanda.run_full_scan,
-        "interval",
+        "wanda_full_scan",
         hours=24,
-        id="wanda_full_scan",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # WANDA competitor research — weekly (168 hours)
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _wanda.run_competitor_research,
-        "interval",
+        "wanda_competitor_research",
         hours=168,
-        id="wanda_competitor_research",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
@@ -372,25 +379,30 @@ def on_startup():
     _hermes = Hermes()
 
     # HERMES content refresh — weekly (168 hours)
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _hermes.run_generate_all,
-        "interval",
+        "hermes_content_refresh",
         hours=168,
-        id="hermes_content_refresh",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     # HERMES SEO health — every 24 hours
-    match_ws.scheduler.add_job(
+    schedule_coordinated(
+        match_ws.scheduler,
         _hermes.run_seo_health,
-        "interval",
+        "hermes_seo_health",
         hours=24,
-        id="hermes_seo_health",
-        replace_existing=True,
         misfire_grace_time=3600,
     )
 
     logger.info("HERMES scheduled: content_refresh (168h), seo_health (24h)")
     logger.info("Environment: %s", os.environ.get("FANXI_ENV", "development"))
     logger.info("Google redirect URI: %s", settings.google_redirect_uri)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await http_clients.aclose_all()
+    logger.info("Upstream HTTP pools closed.")
+    card_renderer.shutdown()
@@ -0,0 +1,363 @@
+"""
+Versioned schema migrations.
+
+init_db() used to run create_all() plus an ALTER TABLE loop on every worker
+at every boot.  On PostgreSQL each loop entry cost an information_schema
+probe, so startup got slower with every column added, and four workers
+raced the same ALTERs.
+
+Now every schema change is a numbered Migration in MIGRATIONS, and the
+SchemaMigration table records the versions that have been applied.  At
+startup a worker runs one query:
+
+    SELECT max(version) FROM schemamigration
+
+When that equals HEAD (every boot after the first of a deploy), that's all
+it does.  Otherwise it claims the "schema_migrations" JobLease (the same
+conditional-UPDATE lease that keeps scheduled jobs on one worker, see
+app.core.jobs) and applies the pending migrations in order.  Workers that
+lose the lease poll the version until the holder is done, so each
+migration runs once per deploy and no worker serves traffic against an old
+schema.  If the holder dies, its lease expires and another worker takes
+over.  Migrations are idempotent, so a half-applied run is safe to repeat.
+
+A migration is transactional by default: its DDL and its version row commit
+together.  A migration with transactional=False runs on an autocommit
+connection, which PostgreSQL requires for CREATE INDEX CONCURRENTLY.
+create_index() builds indexes online that way, without blocking writes to
+the table.
+
+Adding a table, column or index: declare it on the model (so tests and new
+databases get it from create_all), then append a Migration that brings
+existing databases up to date.  A deploy can also run the migrations as a
+release step, before any worker starts:
+
+    python -m app.migrations
+
+With MIGRATE_ON_STARTUP=false the workers then only check the version, and
+refuse to start if it's behind.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session, SQLModel
+
+from app.config import settings
+from app.core import jobs
+from app.db import engine
+from app.models import JobLease, MatchPrediction, MatchPulseCount, SchemaMigration
+from app.services import match_pulse
+
+logger = logging.getLogger("fanxi.db")
+
+LOCK_ID = "schema_migrations"
+# How long the migrating worker holds the lease.  A migration that can take
+# longer (an online index on a huge table) belongs in the release step.
+LOCK_SECONDS = 1800
+POLL_SECONDS = 1.0
+# Rows read per query when a migration backfills from a large table
+BACKFILL_CHUNK = 5000
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection, bool], None]   # (conn, is_pg)
+    transactional: bool = True
+
+
+# ---------------------------------------------------------------------------
+# Helpers for migration steps
+# ---------------------------------------------------------------------------
+
+def add_column(conn: Connection, is_pg: bool, table: str, column: str, col_type: str) -> None:
+    """ALTER TABLE ADD COLUMN unless the column already exists."""
+    if is_pg:
+        exists = conn.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = :t AND column_name = :c"
+        ), {"t": table, "c": column}).fetchone()
+    else:
+        # SQLite: PRAGMA table_info (unquoted — SQLite ignores quotes in PRAGMA)
+        rows = conn.execute(text(f"PRAGMA table_info({table})")).fetchall()
+        exists = any(row[1] == column for row in rows)
+    if not exists:
+        # Quote table name — "user" is a reserved word in PostgreSQL
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {col_type}'))
+
+
+def index_exists(conn: Connection, is_pg: bool, name: str) -> bool:
+    if is_pg:
+        query = "SELECT 1 FROM pg_indexes WHERE indexname = :n"
+    else:
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :n"
+    return conn.execute(text(query), {"n": name}).fetchone() is not None
+
+
+def create_index(
+    conn: Connection, is_pg: bool, name: str, table: str, columns: str, unique: bool = False,
+) -> None:
+    """
+    CREATE INDEX IF NOT EXISTS — CONCURRENTLY on PostgreSQL, so call it from
+    a migration with transactional=False.  A concurrent build that failed
+    leaves an INVALID index behind, which IF NOT EXISTS would skip, so one
+    is dropped and rebuilt.
+    """
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if is_pg:
+        invalid = conn.execute(text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :n AND NOT i.indisvalid"
+        ), {"n": name}).fetchone()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"))
+    else:
+        conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({columns})"))
+
+
+# ---------------------------------------------------------------------------
+# Migrations — append only; never renumber or edit one that has shipped
+# ---------------------------------------------------------------------------
+
+def _0001_baseline(conn: Connection, is_pg: bool) -> None:
+    """Every table, plus the columns added to them before this framework."""
+    SQLModel.metadata.create_all(conn)
+    for table, column, col_type in [
+        # MatchPrediction — 5 core outcome prediction fields
+        ("matchprediction", "match_result",       "TEXT"),
+        ("matchprediction", "btts_prediction",    "INTEGER"),
+        ("matchprediction", "correct_score",      "JSON"),
+        ("matchprediction", "over_under",         "JSON"),
+        ("matchprediction", "ht_ft",              "JSON"),
+        ("matchprediction", "player_predictions", "JSON"),
+        # User — admin + ban flags
+        ("user", "is_admin", "BOOLEAN DEFAULT FALSE"),
+        ("user", "is_banned", "BOOLEAN DEFAULT FALSE"),
+        # MatchDB — real result columns for scoring
+        ("matchdb", "home_goals",    "INTEGER"),
+        ("matchdb", "away_goals",    "INTEGER"),
+        ("matchdb", "ht_home_goals", "INTEGER"),
+        ("matchdb", "ht_away_goals", "INTEGER"),
+    ]:
+        add_column(conn, is_pg, table, column, col_type)
+
+
+PREDICTION_UNIQUE_INDEX = "uq_matchprediction_user_match_team"
+
+
+def _0002_prediction_unique_index(conn: Connection, is_pg: bool) -> None:
+    """
+    One MatchPrediction per (user, match, team).  Duplicates left by the old
+    check-then-insert race are removed first, keeping a SCORED row over a
+    LOCKED one, then the newest.  Transactional rather than CONCURRENTLY, so
+    no duplicate can slip in between the DELETE and the index build.
+    """
+    if index_exists(conn, is_pg, PREDICTION_UNIQUE_INDEX):
+        return
+    removed = conn.execute(text(
+        "DELETE FROM matchprediction WHERE id IN ("
+        "  SELECT id FROM ("
+        "    SELECT id, ROW_NUMBER() OVER ("
+        "      PARTITION BY user_id, match_id, COALESCE(team_name, '')"
+        "      ORDER BY CASE WHEN status = 'SCORED' THEN 0 ELSE 1 END, id DESC"
+        "    ) AS rn FROM matchprediction"
+        "  ) ranked WHERE rn > 1"
+        ")"
+    )).rowcount
+    conn.execute(text(
+        f"CREATE UNIQUE INDEX {PREDICTION_UNIQUE_INDEX} "
+        "ON matchprediction (user_id, match_id, (COALESCE(team_name, '')))"
+    ))
+    if removed:
+        logger.warning("PREDICTION_DUPLICATES_REMOVED rows=%d", removed)
+
+
+def _0003_hot_path_indexes(conn: Connection, is_pg: bool) -> None:
+    """Composite indexes for the hot read paths (tests/test_query_plans.py)."""
+    for name, table, columns in [
+        ("ix_matchprediction_match_user",          "matchprediction",   "match_id, user_id"),
+        ("ix_matchprediction_match_status",        "matchprediction",   "match_id, status, id"),
+        ("ix_matchprediction_user_created",        "matchprediction",   "user_id, created_at DESC"),
+        ("ix_nudgelog_user_match",                 "nudgelog",          "user_id, match_id"),
+        ("ix_inappnotification_user_read_created", "inappnotification", "user_id, is_read, created_at DESC"),
+        ("ix_agentrun_agent_created",              "agentrun",          "agent, created_at DESC"),
+    ]:
+        create_index(conn, is_pg, name, table, columns)
+
+
+def _0004_match_pulse_counts(conn: Connection, is_pg: bool) -> None:
+    """Per-match pulse counters, counted from the predictions already stored."""
+    MatchPulseCount.__table__.create(conn, checkfirst=True)
+    if conn.execute(select(MatchPulseCount.match_id).limit(1)).first() is not None:
+        return
+    table = MatchPrediction.__table__
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, table.c.match_id, table.c.match_result,
+                   table.c.tactics_data, table.c.player_predictions)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_CHUNK)
+        ).all()
+        if not rows:
+            break
+        match_pulse.backfill(conn, (row[1:] for row in rows))
+        last_id = rows[-1].id
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline", _0001_baseline),
+    Migration(2, "prediction_unique_index", _0002_prediction_unique_index),
+    Migration(3, "hot_path_indexes", _0003_hot_path_indexes, transactional=False),
+    Migration(4, "match_pulse_counts", _0004_match_pulse_counts),
+]
+HEAD = MIGRATIONS[-1].version
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+_state: Dict[str, object] = {"version": None, "check_ms": None, "applied": []}
+
+
+class SchemaBehind(RuntimeError):
+    """The database is behind HEAD and this process may not migrate it."""
+
+
+def current_version() -> int:
+    """
+    The highest applied version — 0 on a database that predates this table.
+
+    Only a missing table means 0.  Any other failure (a dropped connection
+    at boot) propagates: reading it as 0 would re-run every migration.
+    """
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text("SELECT max(version) FROM schemamigration")).scalar() or 0
+        except DBAPIError:
+            conn.rollback()
+            if inspect(conn).has_table(SchemaMigration.__tablename__):
+                raise
+            return 0
+
+
+def _ensure_bookkeeping_tables() -> None:
+    for attempt in range(2):
+        try:
+            with engine.begin() as conn:
+                SchemaMigration.__table__.create(conn, checkfirst=True)
+                JobLease.__table__.create(conn, checkfirst=True)
+            return
+        except DBAPIError:
+            # Another worker created them between the check and the CREATE
+            if attempt:
+                raise
+
+
+def _apply_pending(version: int) -> List[str]:
+    is_pg = engine.dialect.name == "postgresql"
+    applied: List[str] = []
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        start = time.perf_counter()
+        if migration.transactional:
+            with engine.begin() as conn:
+                migration.apply(conn, is_pg)
+                _record(conn, migration, start)
+        else:
+            with engine.connect() as conn:
+                migration.apply(conn.execution_options(isolation_level="AUTOCOMMIT"), is_pg)
+            with engine.begin() as conn:
+                _record(conn, migration, start)
+        applied.append(migration.name)
+        logger.info(
+            "SCHEMA_MIGRATION_APPLIED version=%d name=%s duration_ms=%.0f",
+            migration.version, migration.name, (time.perf_counter() - start) * 1000,
+        )
+    return applied
+
+
+def _record(conn: Connection, migration: Migration, start: float) -> None:
+    conn.execute(insert(SchemaMigration).values(
+        version=migration.version,
+        name=migration.name,
+        applied_at=datetime.utcnow(),
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    ))
+
+
+def migrate(apply: Optional[bool] = None) -> int:
+    """
+    Bring the schema to HEAD and return the version.  With `apply` false
+    (default: MIGRATE_ON_STARTUP) only check it, raising SchemaBehind if
+    the database needs migrating.
+    """
+    apply = settings.migrate_on_startup if apply is None else apply
+    start = time.perf_counter()
+    version = current_version()
+    _state["check_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    _state["version"] = version
+    if version >= HEAD:
+        return version
+    if not apply:
+        raise SchemaBehind(
+            f"Database schema is at version {version}, this release needs {HEAD} — "
+            "run `python -m app.migrations` first"
+        )
+
+    _ensure_bookkeeping_tables()
+    waiting = False
+    while True:
+        with Session(engine) as session:
+            if jobs.try_acquire(session, LOCK_ID, jobs.WORKER_ID, LOCK_SECONDS):
+                break
+        if not waiting:
+            logger.info("SCHEMA_MIGRATION_WAITING version=%d head=%d worker=%s", version, HEAD, jobs.WORKER_ID)
+            waiting = True
+        time.sleep(POLL_SECONDS)
+        version = current_version()
+        if version >= HEAD:
+            _state["version"] = version
+            return version
+
+    run_start = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        # Re-read under the lease: another worker may have finished meanwhile
+        applied = _apply_pending(current_version())
+        _state["applied"] = applied
+        _state["version"] = HEAD
+        return HEAD
+    except Exception as exc:
+        error = str(exc)[:500]
+        logger.error("SCHEMA_MIGRATION_FAILED worker=%s error=%s", jobs.WORKER_ID, exc)
+        raise
+    finally:
+        with Session(engine) as session:
+            jobs.record_finish(session, LOCK_ID, (time.perf_counter() - run_start) * 1000, error)
+            jobs.release(session, LOCK_ID, jobs.WORKER_ID)
+
+
+def stats() -> dict:
+    return {
+        "version": _state["version"],
+        "head": HEAD,
+        "check_ms": _state["check_ms"],
+        "applied_by_this_worker": _state["applied"],
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(f"Schema at version {migrate(apply=True)} (head {HEAD}).")
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
+from sqlalchemy import Index, desc, text
 from sqlmodel import SQLModel, Field, JSON, Column
 
 
@@ -20,6 +21,21 @@ class MatchPrediction(SQLModel, table=True):
     status       : "LOCKED" when saved; changes to "SCORED" after the real
                    match result is available and scoring has run.
     """
+    # One prediction per (user, match, team).  team_name may be NULL and NULLs
+    # never collide in a plain UNIQUE index, hence the COALESCE expression —
+    # which is also the ON CONFLICT target of prediction_ingest's upsert.
+    __table_args__ = (
+        Index(
+            "uq_matchprediction_user_match_team",
+            "user_id", "match_id", text("coalesce(team_name, '')"),
+            unique=True,
+        ),
+        # Hot read paths — see tests/test_query_plans.py
+        Index("ix_matchprediction_match_user", "match_id", "user_id"),
+        Index("ix_matchprediction_match_status", "match_id", "status", "id"),
+        Index("ix_matchprediction_user_created", "user_id", desc("created_at")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Foreign key to User.id — nullable until JWT auth is wired up (Milestone 3)
@@ -46,6 +62,24 @@ class MatchPrediction(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class MatchPulseCount(SQLModel, table=True):
+    """
+    Running prediction tallies for one match, behind /matches/{id}/pulse.
+
+    prediction_ingest adjusts the counts in the same transaction as every
+    prediction it writes (see app.services.match_pulse), so the pulse never
+    has to read the predictions themselves.
+
+    dimension : "total" (value ""), "result" (home/draw/away),
+                "formation" (tactics_data["formation"]) or
+                "captain" (player_predictions["first_goalscorer"]).
+    """
+    match_id: int = Field(primary_key=True)
+    dimension: str = Field(primary_key=True)
+    value: str = Field(default="", primary_key=True)
+    count: int = Field(default=0)
+
+
 # ---------------------------------------------------------------------------
 # User & Security
 # ---------------------------------------------------------------------------
@@ -79,6 +113,24 @@ class User(SQLModel, table=True):
     is_banned: bool = Field(default=False)
 
 
+class LeaderboardRank(SQLModel, table=True):
+    """
+    Materialized leaderboard — one row per user, rebuilt after every scoring run.
+
+    rank     : competition rank (ties share a rank: 1, 2, 2, 4).
+    position : unique 1-based row number (points desc, user_id asc).  Indexed,
+               so "top N", "page K" and cursor pagination are index range
+               scans instead of sorting the whole user table per request.
+    New users are appended at the bottom by the leaderboard service as they
+    register, so the table never needs a rebuild just to include them.
+    """
+    user_id: int = Field(primary_key=True, foreign_key="user.id")
+    points: int = Field(default=0)
+    rank: int
+    position: int = Field(index=True, unique=True)
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # ---------------------------------------------------------------------------
 # World Cup Reference Data
 # ---------------------------------------------------------------------------
@@ -184,6 +236,16 @@ class AiCommentary(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class NewsAngle(SQLModel, table=True):
+    """
+    Groq tactical angle for one news article, keyed by article URL.
+    Written once, so /news/wc2026 refreshes only enrich articles it hasn't seen.
+    """
+    url: str = Field(primary_key=True)
+    angle: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class TeamSquadCache(SQLModel, table=True):
     """
     Cache for Squad Data.
@@ -211,6 +273,10 @@ class AgentRun(SQLModel, table=True):
     findings      : list of individual finding dicts (stored as JSON)
     actions_taken : list of auto-actions the agent executed (e.g. IP ban)
     """
+    __table_args__ = (
+        Index("ix_agentrun_agent_created", "agent", desc("created_at")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     agent: str = Field(index=True)                     # e.g. "NATASHA"
     department: str = Field(default="shield")           # e.g. "shield", "forge"
@@ -223,6 +289,36 @@ class AgentRun(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class JobLease(SQLModel, table=True):
+    """
+    One row per cluster-singleton scheduled job (see app.core.jobs).
+
+    holder / lease_until : which worker owns the current tick, and until when.
+    run_count / skipped_count : ticks executed here vs. ticks skipped because
+                                another worker already held the lease.
+    """
+    job_id: str = Field(primary_key=True)                # e.g. "natasha_auth_watchdog"
+    holder: Optional[str] = None                        # "hostname:pid", "@tick" for interval jobs
+    lease_until: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    run_count: int = Field(default=0)
+    skipped_count: int = Field(default=0)
+
+
+class SchemaMigration(SQLModel, table=True):
+    """
+    One row per applied schema migration (see app.migrations).  Worker
+    startup reads max(version) and migrates only when it is behind.
+    """
+    version: int = Field(primary_key=True)
+    name: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+    duration_ms: Optional[float] = None
+
+
 class ApprovalQueue(SQLModel, table=True):
     """
     High-risk actions that require founder approval before execution.
@@ -326,6 +422,10 @@ class NudgeLog(SQLModel, table=True):
     by the conversion tracker when the user submits a prediction after
     receiving the nudge.
     """
+    __table_args__ = (
+        Index("ix_nudgelog_user_match", "user_id", "match_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(index=True)
     match_id: int = Field(index=True)
@@ -371,6 +471,10 @@ class InAppNotification(SQLModel, table=True):
     expires_at : nullable.  PIETRO sets it to match kickoff time.
                  Other writers may leave it None (never expires).
     """
+    __table_args__ = (
+        Index("ix_inappnotification_user_read_created", "user_id", "is_read", desc("created_at")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(index=True)
     title: str
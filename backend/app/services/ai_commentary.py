@@ -29,9 +29,10 @@ SYSTEM_PROMPT = (
 
 def _build_event_summary(match_id: int) -> str:
     """Summarise last 10 minutes of events as a short text for the AI prompt."""
-    events = fd.get_match_events_sync(match_id)
-    stats = fd.get_match_stats_sync(match_id)
-    momentum = fd.compute_momentum_sync(match_id)
+    snap = fd.get_match_snapshot_sync(match_id)
+    events = snap.events if snap else []
+    stats = snap.stats if snap else {}
+    momentum = snap.momentum if snap else {"home_pct": 50, "away_pct": 50}
 
     minute = stats.get("minute") or "?"
     score = stats.get("score", {})
@@ -0,0 +1,210 @@
+"""
+Content-addressed cache for share card images.
+
+Cards used to be cached at /tmp/fanxi_pred_{user}_{match}.png with an mtime
+TTL.  The files were never evicted, a changed prediction kept serving the old
+card until the TTL ran out (hence ?bust=true), and an unchanged card was
+re-rendered as soon as it did.  Here a card is stored under the hash of
+everything drawn on it (card_generator.card_key), so a key can never go
+stale.  Changing the prediction, rank or points gives a new key, and an
+unchanged card is rendered at most once per host.
+
+Two tiers:
+
+  - memory : per-worker LRU bounded by total bytes (CARD_CACHE_MEMORY_MB).
+  - disk   : one file per key in CARD_CACHE_DIR, shared by every worker on
+             the host and bounded by CARD_CACHE_DISK_MB.  Writes are atomic
+             (temp file + rename).  A hit touches the file's mtime, and
+             eviction removes the least recently used files first.
+
+The key doubles as the HTTP ETag, so /cards can answer If-None-Match with a
+304 without touching either tier.
+"""
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger("fanxi.cards")
+
+_SUFFIX = ".card"
+# Eviction trims the disk tier to this fraction of its cap
+_DISK_LOW_WATER = 0.8
+
+
+class CardCache:
+    """Memory LRU in front of a size-capped disk directory.  Thread-safe."""
+
+    def __init__(self, directory: str, memory_bytes: int, disk_bytes: int) -> None:
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: Optional[int] = None  # estimate; None until first scanned
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+            "memory_evictions": 0, "disk_evictions": 0, "disk_errors": 0,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counts["memory_hits"] += 1
+                return data
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+            os.utime(path)
+        except FileNotFoundError:
+            data = None
+        except OSError as exc:
+            logger.warning("CARD_CACHE_READ_FAILED key=%s error=%s", key, exc)
+            data = None
+        with self._lock:
+            if data is None:
+                self._counts["misses"] += 1
+                return None
+            self._counts["disk_hits"] += 1
+            self._remember(key, data)
+        return data
+
+    def contains(self, key: str) -> bool:
+        """Cheap presence check — doesn't read the file or count as a lookup."""
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._counts["stores"] += 1
+            self._remember(key, data)
+        try:
+            self._write(key, data)
+        except OSError as exc:
+            # The disk tier is an optimisation — a read-only or full /tmp
+            # just means each worker keeps its own copy in memory.
+            with self._lock:
+                self._counts["disk_errors"] += 1
+            logger.warning("CARD_CACHE_WRITE_FAILED key=%s error=%s", key, exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            self._disk_used = None
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith(_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            memory = {"entries": len(self._memory), "bytes": self._memory_used}
+            disk_used = self._disk_used
+        lookups = counts["memory_hits"] + counts["disk_hits"] + counts["misses"]
+        return {
+            "directory": self.directory,
+            "memory": {**memory, "max_bytes": self.memory_bytes},
+            "disk": {"bytes": disk_used, "max_bytes": self.disk_bytes},
+            **counts,
+            "hit_rate": round((lookups - counts["misses"]) / lookups, 3) if lookups else None,
+        }
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Add to the memory tier (lock held)."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        if len(data) > self.memory_bytes:
+            return
+        self._memory[key] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self._counts["memory_evictions"] += 1
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            if self._disk_used is not None:
+                self._disk_used += len(data)
+            over = self._disk_used is None or self._disk_used > self.disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _trim_disk(self) -> None:
+        """
+        Re-measure the directory (other workers write to it too) and drop the
+        least recently used files until it is back under the low-water mark.
+        """
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, entry.path))
+        used = sum(size for _, size, _ in files)
+        evicted = 0
+        if used > self.disk_bytes:
+            target = self.disk_bytes * _DISK_LOW_WATER
+            for _, size, path in sorted(files):
+                if used <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                used -= size
+                evicted += 1
+        with self._lock:
+            self._disk_used = used
+            self._counts["disk_evictions"] += evicted
+
+
+card_cache = CardCache(
+    directory=settings.card_cache_dir or os.path.join(tempfile.gettempdir(), "fanxi-cards"),
+    memory_bytes=settings.card_cache_memory_mb * 1024 * 1024,
+    disk_bytes=settings.card_cache_disk_mb * 1024 * 1024,
+)
@@ -1,31 +1,40 @@
 """
 FanXI Card Generator — Pillow-based share card generation.
 
-Generates 1200×630 PNG cards:
+Generates 1200×630 cards (PNG, or WebP / AVIF where Pillow supports them):
   - Prediction card: per-user tactical XI for a given match
   - Profile card:    public scout profile summary
 
 Design choices:
   - Colored team bands instead of emoji flags (PIL can't render emoji)
   - Landscape top-down pitch view (standard tactics board orientation)
-  - /tmp/ cache to avoid Render cold-start regeneration on repeated clicks
+  - Static layers (background, bars, pitch, team bands) rendered once per
+    process; each card only draws its text and formation dots
+  - Content-addressed cache (card_cache): a card is keyed by a hash of what
+    it shows, so an unchanged card is never rendered twice
+
+Callers build the inputs dict with prediction_card_inputs() /
+profile_card_inputs(), take card_key() as the ETag, then fetch the bytes
+through card_renderer.get_card(), which runs render_card() in a process pool.
 """
 
 from __future__ import annotations
 
+import hashlib
 import io
+import json
 import os
-import time
+from functools import lru_cache
 from typing import Any, Optional
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, features
 
 # ─── Dimensions ───────────────────────────────────────────────────────────────
 
 W, H = 1200, 630
 
-CACHE_TTL_PRED = 600   # 10 min — short enough to reflect prediction updates
-CACHE_TTL_PROF = 3600  # 60 min — profiles change rarely
+# Bump whenever the layout changes so cached cards from older code aren't reused
+RENDER_VERSION = 1
 
 # ─── Colours ──────────────────────────────────────────────────────────────────
 
@@ -147,8 +156,9 @@ _FALLBACK_FORMATION = "4-3-3"
 
 # ─── Font loader ──────────────────────────────────────────────────────────────
 
-def _font(size: int, bold: bool = False) -> ImageFont.ImageFont:
-    """Try common Linux + macOS font paths, fall back to PIL default."""
+@lru_cache(maxsize=2)
+def _font_path(bold: bool) -> Optional[str]:
+    """First usable system font — probed once per process."""
     name = "Bold" if bold else "Regular"
     candidates = [
         f"/usr/share/fonts/truetype/dejavu/DejaVuSans{'-Bold' if bold else ''}.ttf",
@@ -160,9 +170,19 @@ def _font(size: int, bold: bool = False) -> ImageFont.ImageFont:
     for path in candidates:
         if os.path.exists(path):
             try:
-                return ImageFont.truetype(path, size)
+                ImageFont.truetype(path, 12)
+                return path
             except Exception:
                 continue
+    return None
+
+
+@lru_cache(maxsize=64)
+def _font(size: int, bold: bool = False) -> ImageFont.ImageFont:
+    """Try common Linux + macOS font paths, fall back to PIL default.  Cached per size."""
+    path = _font_path(bold)
+    if path:
+        return ImageFont.truetype(path, size)
     try:
         return ImageFont.load_default(size=size)
     except TypeError:
@@ -171,13 +191,14 @@ def _font(size: int, bold: bool = False) -> ImageFont.ImageFont:
 
 # ─── Gradient background ──────────────────────────────────────────────────────
 
-def _draw_bg(draw: ImageDraw.ImageDraw) -> None:
-    for y in range(H):
-        t = y / H
-        r = int(BG_TOP[0] + t * (BG_BOT[0] - BG_TOP[0]))
-        g = int(BG_TOP[1] + t * (BG_BOT[1] - BG_TOP[1]))
-        b = int(BG_TOP[2] + t * (BG_BOT[2] - BG_TOP[2]))
-        draw.line([(0, y), (W, y)], fill=(r, g, b))
+def _gradient() -> Image.Image:
+    """Vertical BG_TOP → BG_BOT gradient: one pixel column, stretched."""
+    column = Image.new("RGB", (1, H))
+    column.putdata([
+        tuple(int(BG_TOP[c] + (y / H) * (BG_BOT[c] - BG_TOP[c])) for c in range(3))
+        for y in range(H)
+    ])
+    return column.resize((W, H), Image.NEAREST)
 
 
 # ─── Top bar ──────────────────────────────────────────────────────────────────
@@ -203,36 +224,40 @@ def _text_w(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont) ->
 
 # ─── Match header (y 73..185) ─────────────────────────────────────────────────
 
+_HEADER_BOX = (0, 73, W, 186)
+
+
 def _darken(color: tuple[int, int, int], factor: float = 0.55) -> tuple[int, int, int]:
     return tuple(max(0, int(c * factor)) for c in color)  # type: ignore[return-value]
 
 
-def _draw_match_header(
-    draw: ImageDraw.ImageDraw,
-    home_team: str,
-    away_team: str,
-    group: str,
-    kickoff: str,
-    venue: str,
-) -> None:
+@lru_cache(maxsize=256)
+def _team_bands(home_team: str, away_team: str) -> Image.Image:
+    """Team bands, names and VS for one fixture — the header minus group/date/venue."""
+    band = Image.new("RGB", (W, _HEADER_BOX[3] - _HEADER_BOX[1]))
+    draw = ImageDraw.Draw(band)
+    top = _HEADER_BOX[1]
+
     home_col = _darken(_team_color(home_team))
     away_col = _darken(_team_color(away_team))
 
     # Team bands
-    draw.rectangle([0,   73, 560, 185], fill=home_col)
-    draw.rectangle([640, 73, W,   185], fill=away_col)
-    draw.rectangle([555, 73, 645, 185], fill=DARK_BAR)  # VS gap
+    draw.rectangle([0,   73 - top, 560, 185 - top], fill=home_col)
+    draw.rectangle([640, 73 - top, W,   185 - top], fill=away_col)
+    draw.rectangle([555, 73 - top, 645, 185 - top], fill=DARK_BAR)  # VS gap
 
     # Team names
     name_font = _font(28, bold=True)
-    draw.text((40,  108), home_team.upper(), font=name_font, fill=WHITE)
-    draw.text((W - 40, 108), away_team.upper(), font=name_font, fill=WHITE, anchor="ra")
+    draw.text((40,  108 - top), home_team.upper(), font=name_font, fill=WHITE)
+    draw.text((W - 40, 108 - top), away_team.upper(), font=name_font, fill=WHITE, anchor="ra")
 
     # VS
     vs_font = _font(20, bold=True)
-    draw.text((600, 120), "VS", font=vs_font, fill=MUTED, anchor="mm")
+    draw.text((600, 120 - top), "VS", font=vs_font, fill=MUTED, anchor="mm")
+    return band
 
-    # Group + date
+
+def _draw_match_meta(draw: ImageDraw.ImageDraw, group: str, kickoff: str, venue: str) -> None:
     meta_font = _font(13)
     try:
         from datetime import datetime
@@ -253,11 +278,7 @@ _PX, _PY = 60, 193       # pitch origin
 _PW, _PH = 1080, 235     # pitch width / height
 
 
-def _draw_pitch(
-    draw: ImageDraw.ImageDraw,
-    formation: str,
-    team_color: tuple[int, int, int],
-) -> None:
+def _draw_pitch_surface(draw: ImageDraw.ImageDraw) -> None:
     px, py, pw, ph = _PX, _PY, _PW, _PH
 
     # Pitch surface
@@ -281,7 +302,12 @@ def _draw_pitch(
     # Right penalty area (FWD side)
     draw.rectangle([px + pw - pa_w, pa_y, px + pw, pa_y + pa_h], outline=(255, 255, 255, 40), width=1)
 
-    # Formation dots
+
+def _draw_formation_dots(
+    draw: ImageDraw.ImageDraw,
+    formation: str,
+    team_color: tuple[int, int, int],
+) -> None:
     positions = FORMATION_POSITIONS.get(formation, FORMATION_POSITIONS[_FALLBACK_FORMATION])
     dot_r = 11
     dot_fill = _darken(team_color, 0.8)
@@ -290,8 +316,8 @@ def _draw_pitch(
         dot_fill = RED
 
     for norm_x, norm_y in positions:
-        dot_cx = int(px + norm_x * pw)
-        dot_cy = int(py + norm_y * ph)
+        dot_cx = int(_PX + norm_x * _PW)
+        dot_cy = int(_PY + norm_y * _PH)
         draw.ellipse(
             [dot_cx - dot_r, dot_cy - dot_r, dot_cx + dot_r, dot_cy + dot_r],
             fill=dot_fill,
@@ -300,217 +326,289 @@ def _draw_pitch(
         )
 
 
-# ─── Stats row (y 435..535) ──────────────────────────────────────────────────
+# ─── Stat cells (prediction y 438..533, profile y 445..530) ──────────────────
+
+def _stat_cells(cells: int, pad: int) -> list[tuple[int, int]]:
+    cell_w = W // cells
+    return [(i * cell_w + pad, (i + 1) * cell_w - pad) for i in range(cells)]
+
+
+def _draw_stat_boxes(draw: ImageDraw.ImageDraw, cells: int, pad: int, y0: int, y1: int) -> None:
+    for x0, x1 in _stat_cells(cells, pad):
+        draw.rectangle([x0, y0, x1, y1], fill=(18, 28, 18), outline=(40, 70, 40), width=1)
+
 
-def _draw_stats(
+def _draw_stat_values(
     draw: ImageDraw.ImageDraw,
-    formation: str,
-    team_name: str,
-    result_pick: Optional[str],
+    labels: list[str],
+    values: list[str],
+    pad: int,
+    label_y: int,
+    value_font: ImageFont.ImageFont,
 ) -> None:
-    labels = ["FORMATION", "TEAM", "RESULT PICK"]
-    values = [
-        formation or "—",
-        (team_name or "—").upper(),
-        (result_pick or "—").upper(),
-    ]
-    cell_w = W // 3
     label_font = _font(11)
-    value_font = _font(24, bold=True)
-
-    for i, (lbl, val) in enumerate(zip(labels, values)):
-        x0 = i * cell_w + 14
-        x1 = (i + 1) * cell_w - 14
-        draw.rectangle([x0, 438, x1, 533], fill=(18, 28, 18), outline=(40, 70, 40), width=1)
+    for i, ((x0, x1), lbl, val) in enumerate(zip(_stat_cells(len(labels), pad), labels, values)):
         mid = (x0 + x1) // 2
-        draw.text((mid, 460), lbl, font=label_font, fill=MUTED, anchor="mm")
+        draw.text((mid, label_y), lbl, font=label_font, fill=MUTED, anchor="mm")
         color = GOLD if i == 0 else WHITE
-        draw.text((mid, 500), val[:16], font=value_font, fill=color, anchor="mm")
+        draw.text((mid, 500), val, font=value_font, fill=color, anchor="mm")
 
 
 # ─── Footer (y 543..630) ─────────────────────────────────────────────────────
 
+def _draw_footer_bar(draw: ImageDraw.ImageDraw) -> None:
+    draw.rectangle([0, 543, W, H], fill=DARK_BAR)
+    draw.line([(0, 543), (W, 543)], fill=(30, 50, 30), width=1)
+    url_font = _font(13)
+    draw.text((W - 40, 585), "fanxi.vercel.app", font=url_font, fill=(80, 120, 80), anchor="rm")
+
+
 def _draw_footer(
     draw: ImageDraw.ImageDraw,
     username: str,
     rank_title: str,
     iq_points: int,
 ) -> None:
-    draw.rectangle([0, 543, W, H], fill=DARK_BAR)
-    draw.line([(0, 543), (W, 543)], fill=(30, 50, 30), width=1)
-
     name_font = _font(22, bold=True)
     meta_font = _font(14)
-    url_font  = _font(13)
-
     draw.text((40, 568), f"@{username}", font=name_font, fill=WHITE)
     draw.text((40, 600), f"{rank_title}  ·  {iq_points:,} IQ pts", font=meta_font, fill=MUTED)
-    draw.text((W - 40, 585), "fanxi.vercel.app", font=url_font, fill=(80, 120, 80), anchor="rm")
 
 
-# ─── Cache helpers ────────────────────────────────────────────────────────────
+# ─── Static layers ────────────────────────────────────────────────────────────
+# Everything that doesn't depend on the card's data is drawn once per process;
+# a render copies the template and draws only the dynamic text and dots.
 
-def _cache_path_pred(user_id: int, match_id: int) -> str:
-    return f"/tmp/fanxi_pred_{user_id}_{match_id}.png"
+_AV_CX, _AV_CY, _AV_R = 600, 245, 65
 
 
-def _cache_path_prof(username: str) -> str:
-    return f"/tmp/fanxi_prof_{username}.png"
+@lru_cache(maxsize=1)
+def _base_layer() -> Image.Image:
+    img = _gradient()
+    _draw_top_bar(ImageDraw.Draw(img))
+    return img
 
 
-def _cache_valid(path: str, ttl: int) -> bool:
-    return os.path.exists(path) and (time.time() - os.path.getmtime(path)) < ttl
+@lru_cache(maxsize=1)
+def _prediction_template() -> Image.Image:
+    img = _base_layer().copy()
+    draw = ImageDraw.Draw(img)
+    _draw_pitch_surface(draw)
+    _draw_stat_boxes(draw, cells=3, pad=14, y0=438, y1=533)
+    _draw_footer_bar(draw)
+    return img
 
 
-def _save_cache(path: str, data: bytes) -> None:
-    try:
-        with open(path, "wb") as fh:
-            fh.write(data)
-    except Exception:
-        pass  # /tmp/ may be read-only in some environments
+@lru_cache(maxsize=1)
+def _profile_template() -> Image.Image:
+    img = _base_layer().copy()
+    draw = ImageDraw.Draw(img)
+    draw.ellipse(
+        [_AV_CX - _AV_R, _AV_CY - _AV_R, _AV_CX + _AV_R, _AV_CY + _AV_R],
+        fill=RED,
+        outline=WHITE,
+        width=3,
+    )
+    _draw_stat_boxes(draw, cells=4, pad=12, y0=445, y1=530)
+    _draw_footer_bar(draw)
+    return img
+
 
+# ─── Encoding ─────────────────────────────────────────────────────────────────
 
-def _render_to_bytes(img: Image.Image) -> bytes:
+# format -> (Pillow format, media type, save options), in server preference
+# order.  Lossless WebP is about 60% smaller than PNG for these flat-colour
+# cards; AVIF is lossy and slower to encode, so it is only picked for
+# clients that take AVIF but not WebP.
+_ALL_FORMATS: dict[str, tuple[str, str, dict[str, Any]]] = {
+    "webp": ("WEBP", "image/webp", {"lossless": True, "quality": 50, "method": 1}),
+    "avif": ("AVIF", "image/avif", {"quality": 75, "speed": 8}),
+    "png":  ("PNG",  "image/png",  {"optimize": True}),
+}
+# The subset this Pillow build can encode — PNG always
+FORMATS = {
+    fmt: spec for fmt, spec in _ALL_FORMATS.items()
+    if fmt == "png" or features.check(fmt)
+}
+
+
+def media_type(fmt: str) -> str:
+    return FORMATS[fmt][1]
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """
+    Best card format for an Accept header.  Only explicitly listed image
+    types count (browsers list image/webp and image/avif); wildcards get PNG.
+    """
+    accepted: set[str] = set()
+    for part in (accept or "").split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(media.lower())
+    for fmt, (_, mtype, _) in FORMATS.items():
+        if mtype in accepted:
+            return fmt
+    return "png"
+
+
+def encode(img: Image.Image, fmt: str = "png") -> bytes:
+    pil_format, _, options = FORMATS[fmt]
     buf = io.BytesIO()
-    img.save(buf, format="PNG", optimize=False)
+    img.save(buf, format=pil_format, **options)
     return buf.getvalue()
 
 
 # ─── Public: Prediction card ──────────────────────────────────────────────────
 
-def generate_prediction_card(
-    user_id: int,
-    match_id: int,
+def prediction_card_inputs(
     prediction: dict[str, Any],
     match: dict[str, Any],
     username: str,
     rank_title: str,
     iq_points: int,
-    bust_cache: bool = False,
-) -> bytes:
-    """
-    Generate a 1200×630 prediction share card.
-    Returns raw PNG bytes, cached in /tmp/ for CACHE_TTL_PRED seconds.
-    """
-    cache = _cache_path_pred(user_id, match_id)
-    if not bust_cache and _cache_valid(cache, CACHE_TTL_PRED):
-        with open(cache, "rb") as fh:
-            return fh.read()
-
-    img = Image.new("RGB", (W, H))
+) -> dict[str, Any]:
+    """Everything a prediction card shows — and nothing else, so it can be hashed."""
+    tactics = prediction.get("tactics_data") or {}
+    return {
+        "home_team":    match.get("home_team", "Home"),
+        "away_team":    match.get("away_team", "Away"),
+        "group":        match.get("group", ""),
+        "kickoff":      match.get("kickoff", ""),
+        "venue":        match.get("venue", ""),
+        "formation":    tactics.get("formation") or _FALLBACK_FORMATION,
+        "team_name":    prediction.get("team_name") or "",
+        "match_result": prediction.get("match_result") or "",
+        "username":     username,
+        "rank_title":   rank_title,
+        "iq_points":    iq_points,
+    }
+
+
+def render_prediction_card(inputs: dict[str, Any], fmt: str = "png") -> bytes:
+    """Render a 1200×630 prediction share card, encoded as `fmt`."""
+    home_team, away_team = inputs["home_team"], inputs["away_team"]
+    img = _prediction_template().copy()
+    img.paste(_team_bands(home_team, away_team), _HEADER_BOX[:2])
     draw = ImageDraw.Draw(img)
+    _draw_match_meta(draw, group=inputs["group"], kickoff=inputs["kickoff"], venue=inputs["venue"])
 
-    _draw_bg(draw)
-    _draw_top_bar(draw)
-    _draw_match_header(
-        draw,
-        home_team=match.get("home_team", "Home"),
-        away_team=match.get("away_team", "Away"),
-        group=match.get("group", ""),
-        kickoff=match.get("kickoff", ""),
-        venue=match.get("venue", ""),
-    )
-
-    tactics = prediction.get("tactics_data") or {}
-    formation = tactics.get("formation") or _FALLBACK_FORMATION
-    team_color = _team_color(prediction.get("team_name") or match.get("home_team", ""))
+    formation = inputs["formation"]
+    team_color = _team_color(inputs["team_name"] or home_team)
 
-    _draw_pitch(draw, formation, team_color)
-    _draw_stats(
+    _draw_formation_dots(draw, formation, team_color)
+    _draw_stat_values(
         draw,
-        formation=formation,
-        team_name=prediction.get("team_name", ""),
-        result_pick=prediction.get("match_result"),
+        labels=["FORMATION", "TEAM", "RESULT PICK"],
+        values=[
+            (formation or "—")[:16],
+            (inputs["team_name"] or "—").upper()[:16],
+            (inputs["match_result"] or "—").upper()[:16],
+        ],
+        pad=14, label_y=460,
+        value_font=_font(24, bold=True),
     )
-    _draw_footer(draw, username=username, rank_title=rank_title, iq_points=iq_points)
-
-    data = _render_to_bytes(img)
-    _save_cache(cache, data)
-    return data
+    _draw_footer(draw, username=inputs["username"], rank_title=inputs["rank_title"], iq_points=inputs["iq_points"])
+    return encode(img, fmt)
 
 
 # ─── Public: Profile card ─────────────────────────────────────────────────────
 
-def generate_profile_card(
-    username: str,
-    profile: dict[str, Any],
-    bust_cache: bool = False,
-) -> bytes:
-    """
-    Generate a 1200×630 public scout profile card.
-    Returns raw PNG bytes, cached in /tmp/ for CACHE_TTL_PROF seconds.
-    """
-    cache = _cache_path_prof(username)
-    if not bust_cache and _cache_valid(cache, CACHE_TTL_PROF):
-        with open(cache, "rb") as fh:
-            return fh.read()
-
-    img = Image.new("RGB", (W, H))
+def profile_card_inputs(username: str, profile: dict[str, Any]) -> dict[str, Any]:
+    """Everything a profile card shows — and nothing else, so it can be hashed."""
+    return {
+        "username":           username,
+        "display_name":       profile.get("display_name") or username,
+        "rank_title":         profile.get("rank_title") or "Scout",
+        "nation":             profile.get("favorite_nation") or profile.get("country_allegiance") or "",
+        "football_iq_points": profile.get("football_iq_points") or 0,
+        "prediction_count":   profile.get("prediction_count") or 0,
+        "formation":          profile.get("preferred_formation") or "—",
+        "tactical_style":     (profile.get("tactical_style") or "—")[:12],
+    }
+
+
+def render_profile_card(inputs: dict[str, Any], fmt: str = "png") -> bytes:
+    """Render a 1200×630 public scout profile card, encoded as `fmt`."""
+    img = _profile_template().copy()
     draw = ImageDraw.Draw(img)
 
-    _draw_bg(draw)
-    _draw_top_bar(draw)
-
-    # ── Avatar circle + username (centred) ──
     av_font    = _font(72, bold=True)
     name_font  = _font(44, bold=True)
     rank_font  = _font(18)
     meta_font  = _font(15)
-    label_font = _font(11)
+
+    display = inputs["display_name"]
+    rank_title = inputs["rank_title"]
 
     # Avatar letter
-    letter = (profile.get("display_name") or username or "?")[0].upper()
-    av_cx, av_cy = 600, 245
-    av_r = 65
-    draw.ellipse(
-        [av_cx - av_r, av_cy - av_r, av_cx + av_r, av_cy + av_r],
-        fill=RED,
-        outline=WHITE,
-        width=3,
-    )
-    draw.text((av_cx, av_cy), letter, font=av_font, fill=WHITE, anchor="mm")
+    letter = (display or "?")[0].upper()
+    draw.text((_AV_CX, _AV_CY), letter, font=av_font, fill=WHITE, anchor="mm")
 
     # Username
-    display = profile.get("display_name") or username
     draw.text((600, 335), display, font=name_font, fill=WHITE, anchor="mm")
 
     # Rank title
-    rank_title = profile.get("rank_title", "Scout")
     draw.text((600, 385), rank_title.upper(), font=rank_font, fill=GOLD, anchor="mm")
 
     # Nation
-    nation = profile.get("favorite_nation") or profile.get("country_allegiance") or ""
-    if nation:
-        draw.text((600, 415), nation, font=meta_font, fill=MUTED, anchor="mm")
+    if inputs["nation"]:
+        draw.text((600, 415), inputs["nation"], font=meta_font, fill=MUTED, anchor="mm")
 
     # Stats row (4 cells)
-    stats_labels = ["IQ POINTS", "PREDICTIONS", "FORMATION", "STYLE"]
-    stats_values = [
-        f"{profile.get('football_iq_points', 0):,}",
-        str(profile.get("prediction_count", 0)),
-        profile.get("preferred_formation") or "—",
-        (profile.get("tactical_style") or "—")[:12],
-    ]
-    cell_w = W // 4
-    val_font = _font(26, bold=True)
-
-    for i, (lbl, val) in enumerate(zip(stats_labels, stats_values)):
-        x0 = i * cell_w + 12
-        x1 = (i + 1) * cell_w - 12
-        draw.rectangle([x0, 445, x1, 530], fill=(18, 28, 18), outline=(40, 70, 40), width=1)
-        mid = (x0 + x1) // 2
-        draw.text((mid, 466), lbl, font=label_font, fill=MUTED, anchor="mm")
-        color = GOLD if i == 0 else WHITE
-        draw.text((mid, 500), val, font=val_font, fill=color, anchor="mm")
+    _draw_stat_values(
+        draw,
+        labels=["IQ POINTS", "PREDICTIONS", "FORMATION", "STYLE"],
+        values=[
+            f"{inputs['football_iq_points']:,}",
+            str(inputs["prediction_count"]),
+            inputs["formation"],
+            inputs["tactical_style"],
+        ],
+        pad=12, label_y=466,
+        value_font=_font(26, bold=True),
+    )
 
     # Footer
     _draw_footer(
         draw,
-        username=username,
+        username=inputs["username"],
         rank_title=rank_title,
-        iq_points=profile.get("football_iq_points", 0),
+        iq_points=inputs["football_iq_points"],
     )
+    return encode(img, fmt)
+
+
+# ─── Public: Render dispatch ──────────────────────────────────────────────────
+
+_RENDERERS = {
+    "prediction": render_prediction_card,
+    "profile":    render_profile_card,
+}
+
+
+def render_card(kind: str, inputs: dict[str, Any], fmt: str = "png") -> bytes:
+    """Entry point for the render pool (module-level, so it pickles)."""
+    return _RENDERERS[kind](inputs, fmt)
+
+
+def warm() -> None:
+    """Build the static layers and load every font up front — run once per pool process."""
+    match = {"home_team": "Home", "away_team": "Away", "kickoff": "2026-06-11T19:00:00Z", "venue": "-"}
+    render_prediction_card(prediction_card_inputs({}, match, "fanxi", "Scout", 0))
+    render_profile_card(profile_card_inputs("fanxi", {"favorite_nation": "-"}))
+
+
+# ─── Public: Cache key ────────────────────────────────────────────────────────
 
-    data = _render_to_bytes(img)
-    _save_cache(cache, data)
-    return data
+def card_key(kind: str, inputs: dict[str, Any], fmt: str = "png") -> str:
+    """Content hash of one encoding of a card — the cache key and the HTTP ETag."""
+    blob = json.dumps([kind, fmt, RENDER_VERSION, inputs], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
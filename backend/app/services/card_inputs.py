@@ -0,0 +1,66 @@
+"""
+Card inputs from app data — the bridge between the models and card_generator.
+
+card_generator only knows plain dicts, so both GET /cards/* and the
+post-scoring pre-render stage (card_prerender) build their inputs here.
+That way a pre-rendered card always has exactly the key a request will
+ask for.
+"""
+from typing import Any, Optional
+
+from app.data.fixtures import ALL_FIXTURES
+from app.services.card_generator import prediction_card_inputs, profile_card_inputs
+
+
+def _find_match(match_id: int) -> dict:
+    """Look up a match from the static fixtures list by id."""
+    for m in ALL_FIXTURES:
+        if m.get("id") == match_id:
+            return m
+    return {}
+
+
+def card_match(match_id: int, team_name: Optional[str]) -> dict:
+    """The fixture a prediction card shows — or a shell, so the card still renders."""
+    match = _find_match(match_id)
+    if match:
+        return match
+    return {
+        "id": match_id,
+        "home_team": team_name or "Home",
+        "away_team": "Away",
+        "group": "WC 2026",
+        "kickoff": "",
+        "venue": "",
+    }
+
+
+def prediction_card_inputs_for(match_id: int, prediction: Any, user: Any) -> dict:
+    """
+    Card inputs for a prediction and its owner.  Takes ORM objects or result
+    rows with the same attribute names — the pre-render stage passes rows.
+    """
+    return prediction_card_inputs(
+        prediction={
+            "team_name":    prediction.team_name,
+            "tactics_data": prediction.tactics_data,
+            "match_result": prediction.match_result,
+        },
+        match=card_match(match_id, prediction.team_name),
+        username=user.username,
+        rank_title=user.rank_title,
+        iq_points=user.football_iq_points,
+    )
+
+
+def profile_card_inputs_for(user: Any, prediction_count: int) -> dict:
+    return profile_card_inputs(user.username, {
+        "display_name":       user.display_name,
+        "rank_title":         user.rank_title,
+        "football_iq_points": user.football_iq_points,
+        "prediction_count":   prediction_count,
+        "favorite_nation":    user.favorite_nation,
+        "country_allegiance": user.country_allegiance,
+        "preferred_formation": user.preferred_formation,
+        "tactical_style":     user.tactical_style,
+    })
@@ -0,0 +1,180 @@
+"""
+Post-scoring card pre-render stage.
+
+The moment a match is scored, its predictors open the score reveal and hit
+"share", and each share used to be a cold render.  After
+score_match_bulk() finishes, POST /predictions/admin/score/{match_id} runs
+prerender_match() as a background task.  It renders into the card cache:
+
+  - the prediction card of every predictor of the match, and
+  - the profile card of every predictor of the match.
+
+Both cards show the user's points, which scoring just changed, so each one
+has a new key.  Predictors who scored nothing keep their keys; their cards
+are found in the cache and skipped.
+
+Cards go through card_renderer.prerender(), which uses the shared process
+pool.  At most `workers * 2` cards are in flight at once, so user requests
+never queue behind the whole batch.  Cards already cached are skipped.
+
+Each run's report (cards rendered, cards/sec, total time) is logged and kept
+per match for the scoring progress endpoint.  The disk tier of card_cache
+is per host, so other hosts still render on first request.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+
+from sqlmodel import Session, func, select
+
+from app.config import settings
+from app.db import engine
+from app.models import MatchPrediction, User
+from app.services import card_renderer
+from app.services.card_inputs import prediction_card_inputs_for, profile_card_inputs_for
+
+logger = logging.getLogger("fanxi.cards")
+
+# Predictions read per query (keyset-paginated, outcome columns only)
+CHUNK_SIZE = 1000
+
+
+@dataclass
+class PrerenderReport:
+    match_id: int
+    state: str = "running"              # running | finished | failed
+    prediction_cards: int = 0
+    profile_cards: int = 0
+    rendered: int = 0
+    already_cached: int = 0
+    failed: int = 0
+    duration_ms: float = 0.0
+    cards_per_sec: Optional[float] = None
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# match_id -> report of the most recent run in this worker
+_reports: Dict[int, PrerenderReport] = {}
+
+
+def get_report(match_id: int) -> Optional[Dict[str, Any]]:
+    report = _reports.get(match_id)
+    return report.to_dict() if report else None
+
+
+class _Window:
+    """Keeps at most `size` renders in flight and tallies their outcomes."""
+
+    def __init__(self, size: int, report: PrerenderReport, fmt: str) -> None:
+        self.size = size
+        self.report = report
+        self.fmt = fmt
+        self.pending: Set[Future] = set()
+
+    def submit(self, kind: str, inputs: Dict[str, Any]) -> None:
+        future = card_renderer.prerender(kind, inputs, self.fmt)
+        if future is None:
+            self.report.already_cached += 1
+            return
+        self.pending.add(future)
+        if len(self.pending) >= self.size:
+            self._collect(FIRST_COMPLETED)
+
+    def drain(self) -> None:
+        if self.pending:
+            self._collect()
+
+    def _collect(self, return_when: str = "ALL_COMPLETED") -> None:
+        done, self.pending = wait(self.pending, return_when=return_when)
+        for future in done:
+            if future.cancelled() or future.exception() is not None:
+                self.report.failed += 1
+            else:
+                self.report.rendered += 1
+
+
+def prerender_match(
+    match_id: int,
+    fmt: str = "png",
+    workers: Optional[int] = None,
+) -> PrerenderReport:
+    """
+    Render the prediction and profile cards of every predictor of
+    `match_id` into the card cache.  `fmt` defaults to PNG, which is what
+    the app's share flow requests.
+    """
+    report = PrerenderReport(match_id=match_id)
+    _reports[match_id] = report
+    window = _Window(max(1, workers or settings.card_render_workers) * 2, report, fmt)
+    start = time.perf_counter()
+
+    try:
+        with Session(engine) as session:
+            last_id = 0
+            profiled: Set[int] = set()
+            while True:
+                rows = session.exec(
+                    select(
+                        MatchPrediction.id,
+                        MatchPrediction.user_id,
+                        MatchPrediction.team_name,
+                        MatchPrediction.tactics_data,
+                        MatchPrediction.match_result,
+                        User.username,
+                        User.display_name,
+                        User.rank_title,
+                        User.football_iq_points,
+                        User.favorite_nation,
+                        User.country_allegiance,
+                        User.preferred_formation,
+                        User.tactical_style,
+                    )
+                    .join(User, User.id == MatchPrediction.user_id)
+                    .where(MatchPrediction.match_id == match_id, MatchPrediction.id > last_id)
+                    .order_by(MatchPrediction.id)
+                    .limit(CHUNK_SIZE)
+                ).all()
+                counts = dict(session.exec(
+                    select(MatchPrediction.user_id, func.count(MatchPrediction.id))
+                    .where(MatchPrediction.user_id.in_(list({row.user_id for row in rows})))
+                    .group_by(MatchPrediction.user_id)
+                ).all()) if rows else {}
+                for row in rows:
+                    window.submit("prediction", prediction_card_inputs_for(match_id, row, row))
+                    report.prediction_cards += 1
+                    # One profile per user, even with a prediction per team
+                    if row.user_id not in profiled:
+                        profiled.add(row.user_id)
+                        window.submit("profile", profile_card_inputs_for(row, counts.get(row.user_id, 0)))
+                        report.profile_cards += 1
+                if len(rows) < CHUNK_SIZE:
+                    break
+                last_id = rows[-1].id
+
+        window.drain()
+        report.state = "finished"
+    except Exception as exc:
+        report.state = "failed"
+        logger.error("CARD_PRERENDER_FAILED match_id=%d error=%s", match_id, exc)
+    finally:
+        elapsed = time.perf_counter() - start
+        report.duration_ms = round(elapsed * 1000, 1)
+        report.cards_per_sec = round(report.rendered / elapsed, 1) if elapsed > 0 and report.rendered else None
+        report.finished_at = datetime.now(timezone.utc).isoformat()
+
+    logger.info(
+        "CARD_PRERENDER_DONE match_id=%d prediction_cards=%d profile_cards=%d rendered=%d "
+        "cached=%d failed=%d duration_ms=%.0f cards_per_sec=%s",
+        match_id, report.prediction_cards, report.profile_cards, report.rendered,
+        report.already_cached, report.failed, report.duration_ms, report.cards_per_sec,
+    )
+    return report
@@ -0,0 +1,167 @@
+"""
+Bounded process pool for share card rendering.
+
+Pillow drawing and image encoding are CPU-bound and hold the GIL, so
+rendering on the request path let one viral card saturate a worker:
+every other request in that process queued behind it.  Cards are now
+rendered in a small ProcessPoolExecutor (CARD_RENDER_WORKERS processes per
+API worker, each warmed with the static layers and fonts on start):
+
+    data = card_renderer.get_card("prediction", inputs, "webp")
+
+  - Coalescing : concurrent requests for the same card key share one render.
+  - Queue limit: at most CARD_RENDER_QUEUE distinct renders queued or
+                 running per worker.  Past that, get_card raises RenderBusy
+                 (the API answers 503 + Retry-After) instead of queueing
+                 without bound.
+  - Caching    : finished cards go into card_cache before they leave the
+                 in-flight table, so a card is rendered at most once.
+
+prerender() feeds the same pool from the post-scoring pre-render stage
+(card_prerender).  It skips cards already cached and isn't subject to the
+queue limit; the caller bounds how many it keeps in flight instead.
+
+CARD_RENDER_WORKERS=0 renders inline on the calling thread (tests, tiny
+deployments) with the same coalescing and queue limit.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.services import card_generator
+from app.services.card_cache import card_cache
+
+logger = logging.getLogger("fanxi.cards")
+
+RENDER_TIMEOUT = 15.0
+RETRY_AFTER = 2  # seconds, sent with the 503 when the queue is full
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[str, Future] = {}
+_stats: Dict[str, float] = {
+    "renders": 0, "coalesced": 0, "shed": 0, "errors": 0, "render_ms_total": 0,
+}
+
+
+class RenderBusy(Exception):
+    """The render queue is full — the request was shed."""
+
+
+def _pool() -> ProcessPoolExecutor:
+    """The pool, started on first use (lock held)."""
+    global _executor
+    if _executor is None:
+        # forkserver: never fork the API worker itself, which runs threads
+        # (event loop, scheduler, executors) that fork() would not copy safely
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.card_render_workers,
+            mp_context=ctx,
+            initializer=card_generator.warm,
+        )
+        logger.info("CARD_POOL_STARTED workers=%d", settings.card_render_workers)
+    return _executor
+
+
+def _finish(key: str, started: float, future: Future) -> None:
+    """Cache a finished render, then release its in-flight slot."""
+    global _executor
+    if future.cancelled():
+        with _lock:
+            _inflight.pop(key, None)
+        return
+    exc = future.exception()
+    if exc is None:
+        card_cache.put(key, future.result())
+    with _lock:
+        _inflight.pop(key, None)
+        if exc is None:
+            _stats["renders"] += 1
+            _stats["render_ms_total"] += (time.monotonic() - started) * 1000
+        else:
+            _stats["errors"] += 1
+            if isinstance(exc, BrokenProcessPool) and _executor is not None:
+                # A pool process died (OOM kill, segfault) — start a fresh pool next time
+                _executor = None
+    if exc is not None:
+        logger.warning("CARD_RENDER_FAILED key=%s error=%r", key, exc)
+
+
+def _submit(kind: str, inputs: Dict[str, Any], fmt: str, key: str, limit: bool = True) -> Future:
+    """In-flight future for `key`, starting a render unless one is already running."""
+    with _lock:
+        future = _inflight.get(key)
+        if future is not None:
+            _stats["coalesced"] += 1
+            return future
+        if limit and len(_inflight) >= settings.card_render_queue:
+            _stats["shed"] += 1
+            logger.warning("CARD_RENDER_SHED in_flight=%d", len(_inflight))
+            raise RenderBusy("Card renderer busy — try again shortly")
+        started = time.monotonic()
+        if settings.card_render_workers > 0:
+            future = _pool().submit(card_generator.render_card, kind, inputs, fmt)
+            _inflight[key] = future
+            future.add_done_callback(lambda f: _finish(key, started, f))
+            return future
+        future = Future()
+        _inflight[key] = future
+    # Inline: render outside the lock; coalesced callers wait on the future
+    try:
+        future.set_result(card_generator.render_card(kind, inputs, fmt))
+    except Exception as exc:
+        future.set_exception(exc)
+    _finish(key, started, future)
+    return future
+
+
+def get_card(kind: str, inputs: Dict[str, Any], fmt: str = "png", key: Optional[str] = None) -> bytes:
+    """
+    Card bytes from the cache, or from a (possibly shared) render.  Blocks
+    the calling thread — call from sync endpoints or via asyncio.to_thread.
+    Raises RenderBusy when the queue is full.
+    """
+    key = key or card_generator.card_key(kind, inputs, fmt)
+    data = card_cache.get(key)
+    if data is not None:
+        return data
+    return _submit(kind, inputs, fmt, key).result(timeout=RENDER_TIMEOUT)
+
+
+def prerender(kind: str, inputs: Dict[str, Any], fmt: str = "png") -> Optional[Future]:
+    """Start rendering a card into the cache.  None if it is already cached."""
+    key = card_generator.card_key(kind, inputs, fmt)
+    if card_cache.contains(key):
+        return None
+    return _submit(kind, inputs, fmt, key, limit=False)
+
+
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def stats() -> dict:
+    with _lock:
+        counts = dict(_stats)
+        in_flight = len(_inflight)
+    renders = counts.pop("renders")
+    total_ms = counts.pop("render_ms_total")
+    return {
+        "workers": settings.card_render_workers,
+        "queue_limit": settings.card_render_queue,
+        "in_flight": in_flight,
+        "renders": renders,
+        **counts,
+        "avg_render_ms": round(total_ms / renders, 1) if renders else None,
+    }
@@ -0,0 +1,141 @@
+"""
+Incremental RSS 2.0 / Atom parser for the intel feeds.
+
+Feeds used to be read in full and built into a complete ElementTree before
+the first item was looked at, so a large feed cost its whole size in memory
+and CPU even when only the first few items were used.  FeedParser is fed
+bytes as they arrive (XMLPullParser).  Each finished <item> / <entry> is
+turned into an article dict and then dropped from the tree.  feed() returns
+True once `max_items` matching items have been collected, so the caller
+can stop reading the response.
+
+    parser = FeedParser("BBC Sport", max_items=20)
+    async for chunk in resp.aiter_bytes():
+        if parser.feed(chunk):
+            break
+    articles = parser.close()
+"""
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+
+_ITEM_TAGS = {"item", ATOM + "entry"}
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _text(elem: ET.Element, *tags: str) -> str:
+    for tag in tags:
+        value = elem.findtext(tag)
+        if value and value.strip():
+            return value.strip()
+    return ""
+
+
+def _iso_date(value: str) -> str:
+    """RSS (RFC 822) or Atom (RFC 3339) date as ISO-8601; now if unparseable."""
+    try:
+        return datetime.strptime(value, "%a, %d %b %Y %H:%M:%S %z").isoformat()
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+    except ValueError:
+        return datetime.now(timezone.utc).isoformat()
+
+
+def _thumbnail(item: ET.Element) -> Optional[str]:
+    for tag in (MEDIA + "thumbnail", MEDIA + "content", "enclosure"):
+        node = item.find(tag)
+        if node is not None and node.get("url"):
+            return node.get("url")
+    for link in item.findall(ATOM + "link"):
+        if link.get("rel") == "enclosure" and link.get("href"):
+            return link.get("href")
+    return None
+
+
+def _link(item: ET.Element) -> str:
+    link = _text(item, "link")
+    if link:
+        return link
+    for node in item.findall(ATOM + "link"):
+        if node.get("rel", "alternate") == "alternate" and node.get("href"):
+            return node.get("href", "")
+    return ""
+
+
+def _article(item: ET.Element, source_name: str) -> dict:
+    description = _text(item, "description", ATOM + "summary", ATOM + "content")
+    return {
+        "title": _text(item, "title", ATOM + "title"),
+        "url": _link(item),
+        "published": _iso_date(_text(item, "pubDate", ATOM + "published", ATOM + "updated")),
+        "source": source_name,
+        "trail": _TAG_RE.sub("", description).strip()[:300],
+        "thumbnail": _thumbnail(item),
+    }
+
+
+class FeedParser:
+    """Pull parser over an RSS or Atom byte stream.  `accept` filters articles."""
+
+    def __init__(
+        self,
+        source_name: str,
+        max_items: int,
+        accept: Optional[Callable[[dict], bool]] = None,
+    ) -> None:
+        self.source_name = source_name
+        self.max_items = max_items
+        self.accept = accept
+        self.articles: List[dict] = []
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: List[ET.Element] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.articles) >= self.max_items
+
+    def feed(self, data: bytes) -> bool:
+        """Parse another chunk.  True once enough items have been collected."""
+        if self.done:
+            return True
+        self._parser.feed(data)
+        self._drain()
+        return self.done
+
+    def close(self) -> List[dict]:
+        if not self.done:
+            try:
+                self._parser.close()
+                self._drain()
+            except ET.ParseError:
+                if not self.articles:
+                    raise
+        return self.articles
+
+    def _drain(self) -> None:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            if elem.tag not in _ITEM_TAGS or self.done:
+                continue
+            article = _article(elem, self.source_name)
+            if self.accept is None or self.accept(article):
+                self.articles.append(article)
+            # Drop the finished item so the tree never holds more than one
+            if self._stack:
+                self._stack[-1].remove(elem)
+
+
+def parse_feed(data: bytes | str, source_name: str, max_items: int) -> List[dict]:
+    """Parse a whole feed document already in memory."""
+    parser = FeedParser(source_name, max_items)
+    parser.feed(data.encode() if isinstance(data, str) else data)
+    return parser.close()
@@ -2,8 +2,9 @@ from __future__ import annotations
 from typing import Any, Dict, List
 from sqlmodel import Session, select
 from app.models import TeamSquadCache
-import httpx
 from app.db import engine
+from app.core.http_clients import get_sync_client
+from app.core.rate_governor import get_governor
 from datetime import datetime, timedelta
 from app.config import settings
 
@@ -29,11 +30,11 @@ def _get(path: str, params: Dict[str, Any] | None = None) -> Dict[str, Any]:
 
     url = f"{BASE_URL}{path}"
 
-    resp = httpx.get(
+    get_governor().acquire_sync("api_football")
+    resp = get_sync_client("api_football").get(
         url,
         headers=_headers(),
         params=params or {},
-        timeout=15.0,
     )
 
     try:
@@ -2,96 +2,227 @@
 Football-data.org v4 integration.
 
 Free tier limits: 10 requests/minute.
-All responses are cached in memory for 60 seconds to stay within rate limits.
-Concurrent duplicate requests are deduplicated via asyncio locks.
+Responses live in a bounded LRU cache with per-endpoint TTLs.  Once an
+entry expires it is still served for STALE_GRACE seconds while a single
+background refresh runs, so callers never wait on upstream for data we
+already have.  404s and 429s are cached as negative entries so a missing
+match or an exhausted quota doesn't turn into a retry storm.
+Concurrent misses for the same key share one in-flight fetch, and every
+fetch takes a token from the cluster-wide rate governor first.
+Each match payload is parsed once into a MatchSnapshot (events, lineups,
+stats, momentum, live state) shared by the async and sync helpers.
 Environment variable: FOOTBALL_DATA_API_KEY
 """
 import asyncio
 import logging
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
 
 import httpx
 
 from app.config import settings
+from app.core.cache import FRESH, NEGATIVE, STALE, TTLCache
+from app.core.http_clients import get_async_client, get_sync_client
+from app.core.rate_governor import get_governor
 
 api_logger = logging.getLogger("fanxi.upstream.football_data")
 
 BASE_URL = "https://api.football-data.org/v4"
-CACHE_TTL = 60  # seconds
+CACHE_TTL = 60  # seconds — default for endpoints not listed below
+CACHE_MAX_ENTRIES = 512
+STALE_GRACE = 600  # seconds an expired entry may still be served
 
-# Simple in-memory cache: key -> (timestamp, data)
-_cache: Dict[str, tuple] = {}
+# Path prefix -> TTL.  First match wins.
+ENDPOINT_TTLS = [
+    ("/matches/", 30),                  # single match detail — live data
+    ("/competitions/WC/matches", 60),   # fixture lists / live list
+    ("/competitions/WC/standings", 300),
+    ("/competitions/WC/teams", 3600),
+]
 
-# Deduplication: prevent identical concurrent requests from hitting the API
-_inflight: Dict[str, asyncio.Lock] = {}
+# Negative-cache TTLs by upstream status
+NEGATIVE_TTLS = {404: 300, 429: 60}
+
+
+class UpstreamError(Exception):
+    """A football-data request failed (possibly served from the negative cache)."""
+
+    def __init__(self, status_code: int, path: str) -> None:
+        super().__init__(f"football-data {status_code} for {path}")
+        self.status_code = status_code
+
+
+_cache = TTLCache(max_size=CACHE_MAX_ENTRIES, stale_grace=STALE_GRACE)
+
+# Deduplication: one in-flight fetch per key, dropped as soon as it settles
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Background refreshes for the sync path
+_refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fd-refresh")
+_sync_refreshing: Set[str] = set()
+_sync_lock = threading.Lock()
 
 
 def _headers() -> dict:
     return {"X-Auth-Token": settings.football_data_api_key}
 
 
+def _key(path: str, params: Optional[dict]) -> str:
+    return f"{path}:{params}"
+
+
+def _ttl_for(path: str) -> int:
+    for prefix, ttl in ENDPOINT_TTLS:
+        if path.startswith(prefix):
+            return ttl
+    return CACHE_TTL
+
+
+def _remember_failure(key: str, path: str, response: httpx.Response) -> None:
+    """Negative-cache 404/429.  On 429 keep serving any value we already have."""
+    status = response.status_code
+    ttl = NEGATIVE_TTLS.get(status)
+    if ttl is None:
+        return
+    if status == 429:
+        try:
+            ttl = int(response.headers.get("Retry-After", ttl))
+        except ValueError:
+            pass
+        if _cache.hold(key, ttl):
+            return
+    _cache.set_negative(key, status, ttl)
+    api_logger.warning("UPSTREAM_NEGATIVE_CACHED path=%s status=%d ttl=%d", path, status, ttl)
+
+
+def _fetch_sync(key: str, path: str, params: Optional[dict]) -> Any:
+    get_governor().acquire_sync("football_data")
+    start = time.perf_counter()
+    try:
+        res = get_sync_client("football_data").get(
+            f"{BASE_URL}{path}", headers=_headers(), params=params or {}
+        )
+        res.raise_for_status()
+        data = res.json()
+        duration_ms = (time.perf_counter() - start) * 1000
+        api_logger.info("UPSTREAM_CALL path=%s status=%d duration_ms=%.0f", path, res.status_code, duration_ms)
+    except httpx.HTTPStatusError as exc:
+        duration_ms = (time.perf_counter() - start) * 1000
+        api_logger.error("UPSTREAM_ERROR path=%s duration_ms=%.0f error=%s", path, duration_ms, exc)
+        _remember_failure(key, path, exc.response)
+        raise UpstreamError(exc.response.status_code, path) from exc
+    except Exception as exc:
+        duration_ms = (time.perf_counter() - start) * 1000
+        api_logger.error("UPSTREAM_ERROR path=%s duration_ms=%.0f error=%s", path, duration_ms, exc)
+        raise
+    _cache.set(key, data, _ttl_for(path))
+    return data
+
+
+def _refresh_sync_in_background(key: str, path: str, params: Optional[dict]) -> None:
+    with _sync_lock:
+        if key in _sync_refreshing:
+            return
+        _sync_refreshing.add(key)
+
+    def run() -> None:
+        try:
+            _fetch_sync(key, path, params)
+        except Exception:
+            pass  # already logged; the stale value keeps being served
+        finally:
+            with _sync_lock:
+                _sync_refreshing.discard(key)
+
+    _refresh_pool.submit(run)
+
+
 def _get_sync(path: str, params: Optional[dict] = None) -> Any:
     """Synchronous cached GET — used by scheduler jobs running in executor."""
-    key = f"{path}:{params}"
-    now = time.time()
-    if key in _cache:
-        ts, data = _cache[key]
-        if now - ts < CACHE_TTL:
-            return data
+    key = _key(path, params)
+    state, value = _cache.lookup(key)
+    if state == FRESH:
+        return value
+    if state == NEGATIVE:
+        raise UpstreamError(value, path)
+    if state == STALE:
+        _refresh_sync_in_background(key, path, params)
+        return value
+    return _fetch_sync(key, path, params)
+
+
+async def _fetch(key: str, path: str, params: Optional[dict]) -> Any:
+    await get_governor().acquire("football_data")
     start = time.perf_counter()
     try:
-        with httpx.Client(timeout=10) as client:
-            res = client.get(f"{BASE_URL}{path}", headers=_headers(), params=params or {})
-            res.raise_for_status()
-            data = res.json()
+        res = await get_async_client("football_data").get(
+            f"{BASE_URL}{path}", headers=_headers(), params=params or {}
+        )
+        res.raise_for_status()
+        data = res.json()
         duration_ms = (time.perf_counter() - start) * 1000
         api_logger.info("UPSTREAM_CALL path=%s status=%d duration_ms=%.0f", path, res.status_code, duration_ms)
+    except httpx.HTTPStatusError as exc:
+        duration_ms = (time.perf_counter() - start) * 1000
+        api_logger.error("UPSTREAM_ERROR path=%s duration_ms=%.0f error=%s", path, duration_ms, exc)
+        _remember_failure(key, path, exc.response)
+        raise UpstreamError(exc.response.status_code, path) from exc
     except Exception as exc:
         duration_ms = (time.perf_counter() - start) * 1000
         api_logger.error("UPSTREAM_ERROR path=%s duration_ms=%.0f error=%s", path, duration_ms, exc)
         raise
-    _cache[key] = (now, data)
+    _cache.set(key, data, _ttl_for(path))
     return data
 
 
-async def _get(path: str, params: Optional[dict] = None) -> Any:
-    """Async cached GET with request deduplication."""
-    key = f"{path}:{params}"
-    now = time.time()
+def _start_fetch(key: str, path: str, params: Optional[dict]) -> asyncio.Task:
+    """The single in-flight fetch for `key`, started if there isn't one yet."""
+    task = _inflight.get(key)
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        return task
+    task = asyncio.ensure_future(_fetch(key, path, params))
+    _inflight[key] = task
 
-    # Check cache first (no lock needed — dict reads are thread-safe in CPython)
-    if key in _cache:
-        ts, data = _cache[key]
-        if now - ts < CACHE_TTL:
-            return data
+    def _settled(t: asyncio.Task) -> None:
+        if _inflight.get(key) is t:
+            del _inflight[key]
+        if not t.cancelled():
+            t.exception()  # mark retrieved — background refresh failures are already logged
 
-    # Deduplicate: if another coroutine is already fetching this key, wait for it
-    if key not in _inflight:
-        _inflight[key] = asyncio.Lock()
+    task.add_done_callback(_settled)
+    return task
 
-    async with _inflight[key]:
-        # Re-check cache — another coroutine may have populated it while we waited
-        now = time.time()
-        if key in _cache:
-            ts, data = _cache[key]
-            if now - ts < CACHE_TTL:
-                return data
 
-        start = time.perf_counter()
-        try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                res = await client.get(f"{BASE_URL}{path}", headers=_headers(), params=params or {})
-                res.raise_for_status()
-                data = res.json()
-            duration_ms = (time.perf_counter() - start) * 1000
-            api_logger.info("UPSTREAM_CALL path=%s status=%d duration_ms=%.0f", path, res.status_code, duration_ms)
-        except Exception as exc:
-            duration_ms = (time.perf_counter() - start) * 1000
-            api_logger.error("UPSTREAM_ERROR path=%s duration_ms=%.0f error=%s", path, duration_ms, exc)
-            raise
-        _cache[key] = (time.time(), data)
-        return data
+async def _get(path: str, params: Optional[dict] = None, fresh: bool = False) -> Any:
+    """
+    Async cached GET: fresh hit, stale hit + background refresh, or shared fetch.
+
+    fresh=True never serves a stale entry — it waits for the (shared)
+    refetch instead.  The live poller needs that: it polls less often than
+    the live TTL, so with stale-while-revalidate every broadcast would carry
+    the previous poll's payload.
+    """
+    key = _key(path, params)
+    state, value = _cache.lookup(key)
+    if state == FRESH:
+        return value
+    if state == NEGATIVE:
+        raise UpstreamError(value, path)
+    if state == STALE and not fresh:
+        _start_fetch(key, path, params)
+        return value
+    return await asyncio.shield(_start_fetch(key, path, params))
+
+
+def invalidate_match(match_id: int) -> int:
+    """Drop cached payloads for one match so the next read goes upstream."""
+    return _cache.invalidate_prefix(f"/matches/{match_id}:")
+
+
+def cache_stats() -> dict:
+    return {**_cache.stats(), "inflight": len(_inflight)}
 
 
 async def get_live_matches() -> List[dict]:
@@ -104,10 +235,10 @@ async def get_live_matches() -> List[dict]:
         return []
 
 
-async def get_match(match_id: int) -> Optional[dict]:
+async def get_match(match_id: int, fresh: bool = False) -> Optional[dict]:
     """Full match detail including score, status, goals, cards, lineups."""
     try:
-        return await _get(f"/matches/{match_id}")
+        return await _get(f"/matches/{match_id}", fresh=fresh)
     except Exception as exc:
         print(f"[football-data] match {match_id} error: {exc}")
         return None
@@ -118,12 +249,12 @@ def get_match_sync(match_id: int) -> Optional[dict]:
     return _get_sync(f"/matches/{match_id}")
 
 
-async def get_match_events(match_id: int) -> List[dict]:
-    """Goals, cards, and substitutions as a unified timeline."""
-    raw = await get_match(match_id)
-    if not raw:
-        return []
+# ---------------------------------------------------------------------------
+# Match snapshots — parse each upstream payload once
+# ---------------------------------------------------------------------------
 
+def _parse_events(raw: dict) -> List[dict]:
+    """Goals, cards and substitutions as one timeline sorted by minute."""
     events: List[dict] = []
 
     for goal in raw.get("goals", []):
@@ -159,21 +290,15 @@ async def get_match_events(match_id: int) -> List[dict]:
     return events
 
 
-async def get_match_lineups(match_id: int) -> dict:
+def _parse_lineups(raw: dict) -> dict:
     """Home and away starting XI + substitutes."""
-    raw = await get_match(match_id)
-    if not raw:
-        return {"home": None, "away": None}
-
-    lineups = raw.get("lineups", [])
     result = {"home": None, "away": None}
 
     home_team = raw.get("homeTeam", {}).get("name")
     away_team = raw.get("awayTeam", {}).get("name")
 
-    for lineup in lineups:
+    for lineup in raw.get("lineups", []):
         team_name = lineup.get("team", {}).get("name")
-        side = None
         if team_name == home_team:
             side = "home"
         elif team_name == away_team:
@@ -196,24 +321,15 @@ async def get_match_lineups(match_id: int) -> dict:
     return result
 
 
-async def get_match_stats(match_id: int) -> dict:
-    """Possession, shots, corners and derived momentum score."""
-    raw = await get_match(match_id)
-    if not raw:
-        return {}
-
+def _parse_stats(raw: dict) -> dict:
+    """Score, status and whatever statistics the tier provides."""
     score = raw.get("score", {})
     ft = score.get("fullTime", {})
     ht = score.get("halfTime", {})
 
-    # Stats may not be available on free tier -- return what we have
-    stats = raw.get("statistics", {})
-    home_name = raw.get("homeTeam", {}).get("name", "Home")
-    away_name = raw.get("awayTeam", {}).get("name", "Away")
-
     return {
-        "home_team": home_name,
-        "away_team": away_name,
+        "home_team": raw.get("homeTeam", {}).get("name", "Home"),
+        "away_team": raw.get("awayTeam", {}).get("name", "Away"),
         "minute": raw.get("minute"),
         "status": raw.get("status"),
         "score": {
@@ -222,11 +338,12 @@ async def get_match_stats(match_id: int) -> dict:
             "ht_home": ht.get("home"),
             "ht_away": ht.get("away"),
         },
-        "stats": stats,
+        # Stats may not be available on free tier -- return what we have
+        "stats": raw.get("statistics", {}),
     }
 
 
-async def compute_momentum(match_id: int) -> dict:
+def _parse_momentum(raw: dict) -> dict:
     """
     Derive a home/away momentum percentage from available stats.
 
@@ -235,10 +352,6 @@ async def compute_momentum(match_id: int) -> dict:
 
     Falls back to goal count ratio if stat data unavailable.
     """
-    raw = await get_match(match_id)
-    if not raw:
-        return {"home_pct": 50, "away_pct": 50}
-
     ft = raw.get("score", {}).get("fullTime", {})
     home_goals = ft.get("home") or 0
     away_goals = ft.get("away") or 0
@@ -296,117 +409,129 @@ async def compute_momentum(match_id: int) -> dict:
     return {"home_pct": home_pct, "away_pct": 100 - home_pct}
 
 
+class MatchSnapshot:
+    """
+    Every derived view of one football-data match payload, computed once.
+
+    A snapshot is tied to the payload object it was built from: while the
+    cache keeps serving that payload, every caller — routes, the WebSocket
+    poller, sync executor code — gets the same snapshot.  When the cache
+    fetches a new payload, the next lookup builds a new snapshot.
+
+    Views are shared between callers: treat them as read-only and copy
+    before modifying.
+    """
+
+    __slots__ = ("match_id", "raw", "events", "lineups", "stats", "momentum", "live_state")
+
+    def __init__(self, match_id: int, raw: dict) -> None:
+        self.match_id = match_id
+        self.raw = raw
+        self.events = _parse_events(raw)
+        self.lineups = _parse_lineups(raw)
+        self.stats = _parse_stats(raw)
+        self.momentum = _parse_momentum(raw)
+
+        score = self.stats["score"]
+        home = raw.get("homeTeam", {}).get("name")
+        away = raw.get("awayTeam", {}).get("name")
+        # The state the live-match WebSocket hub broadcasts
+        self.live_state = {
+            "match_id": match_id,
+            "status": raw.get("status"),
+            "minute": raw.get("minute"),
+            "home_team": home,
+            "away_team": away,
+            "home_flag": _flag(home or ""),
+            "away_flag": _flag(away or ""),
+            "home_goals": score["home"],
+            "away_goals": score["away"],
+            "ht_home": score["ht_home"],
+            "ht_away": score["ht_away"],
+            "venue": raw.get("venue"),
+            "momentum": self.momentum,
+        }
+
+    @property
+    def minute(self) -> Optional[int]:
+        return self.raw.get("minute")
+
+
+# match_id -> snapshot of the payload currently in _cache
+_snapshots: Dict[int, MatchSnapshot] = {}
+
+
+def _snapshot_for(match_id: int, raw: Optional[dict]) -> Optional[MatchSnapshot]:
+    if not raw:
+        return None
+    snap = _snapshots.get(match_id)
+    if snap is None or snap.raw is not raw:
+        snap = MatchSnapshot(match_id, raw)
+        _snapshots[match_id] = snap
+    return snap
+
+
+async def get_match_snapshot(match_id: int, fresh: bool = False) -> Optional[MatchSnapshot]:
+    """Parsed views of the current match payload; None if unavailable.  See _get for `fresh`."""
+    return _snapshot_for(match_id, await get_match(match_id, fresh=fresh))
+
+
+def get_match_snapshot_sync(match_id: int) -> Optional[MatchSnapshot]:
+    """Sync twin of get_match_snapshot for executor threads.  Raises on upstream errors."""
+    return _snapshot_for(match_id, _get_sync(f"/matches/{match_id}"))
+
+
+_NO_LINEUPS = {"home": None, "away": None}
+_NEUTRAL_MOMENTUM = {"home_pct": 50, "away_pct": 50}
+
+
+async def get_match_events(match_id: int) -> List[dict]:
+    """Goals, cards, and substitutions as a unified timeline."""
+    snap = await get_match_snapshot(match_id)
+    return snap.events if snap else []
+
+
+async def get_match_lineups(match_id: int) -> dict:
+    """Home and away starting XI + substitutes."""
+    snap = await get_match_snapshot(match_id)
+    return snap.lineups if snap else dict(_NO_LINEUPS)
+
+
+async def get_match_stats(match_id: int) -> dict:
+    """Possession, shots, corners and score."""
+    snap = await get_match_snapshot(match_id)
+    return snap.stats if snap else {}
+
+
+async def compute_momentum(match_id: int) -> dict:
+    """Home/away momentum percentage — see _parse_momentum for the formula."""
+    snap = await get_match_snapshot(match_id)
+    return snap.momentum if snap else dict(_NEUTRAL_MOMENTUM)
+
+
 # ---------------------------------------------------------------------------
 # Sync wrappers — for code that runs in executor threads (ai_commentary)
-# These use _get_sync which shares the same _cache dict.
+# These share _cache and _snapshots with the async path.
 # ---------------------------------------------------------------------------
 
 def get_match_events_sync(match_id: int) -> List[dict]:
-    raw = _get_sync(f"/matches/{match_id}")
-    if not raw:
-        return []
-    events: List[dict] = []
-    for goal in raw.get("goals", []):
-        events.append({
-            "type": "goal", "minute": goal.get("minute"),
-            "extra_time": goal.get("extraTime"),
-            "team": goal.get("team", {}).get("name"),
-            "scorer": goal.get("scorer", {}).get("name"),
-            "assist": goal.get("assist", {}).get("name") if goal.get("assist") else None,
-        })
-    for booking in raw.get("bookings", []):
-        events.append({
-            "type": "card", "card_type": booking.get("card"),
-            "minute": booking.get("minute"),
-            "team": booking.get("team", {}).get("name"),
-            "player": booking.get("playerReceivingCard", {}).get("name"),
-        })
-    for sub in raw.get("substitutions", []):
-        events.append({
-            "type": "sub", "minute": sub.get("minute"),
-            "team": sub.get("team", {}).get("name"),
-            "player_out": sub.get("playerOut", {}).get("name"),
-            "player_in": sub.get("playerIn", {}).get("name"),
-        })
-    events.sort(key=lambda e: e.get("minute") or 999)
-    return events
+    snap = get_match_snapshot_sync(match_id)
+    return snap.events if snap else []
 
 
 def get_match_stats_sync(match_id: int) -> dict:
-    raw = _get_sync(f"/matches/{match_id}")
-    if not raw:
-        return {}
-    score = raw.get("score", {})
-    ft = score.get("fullTime", {})
-    ht = score.get("halfTime", {})
-    return {
-        "home_team": raw.get("homeTeam", {}).get("name", "Home"),
-        "away_team": raw.get("awayTeam", {}).get("name", "Away"),
-        "minute": raw.get("minute"),
-        "status": raw.get("status"),
-        "score": {"home": ft.get("home"), "away": ft.get("away"),
-                  "ht_home": ht.get("home"), "ht_away": ht.get("away")},
-        "stats": raw.get("statistics", {}),
-    }
+    snap = get_match_snapshot_sync(match_id)
+    return snap.stats if snap else {}
 
 
 def compute_momentum_sync(match_id: int) -> dict:
-    raw = _get_sync(f"/matches/{match_id}")
-    if not raw:
-        return {"home_pct": 50, "away_pct": 50}
-    ft = raw.get("score", {}).get("fullTime", {})
-    home_goals = ft.get("home") or 0
-    away_goals = ft.get("away") or 0
-    stats: list = raw.get("statistics", [])
-    if not stats or len(stats) < 2:
-        total = home_goals + away_goals
-        if total == 0:
-            return {"home_pct": 50, "away_pct": 50}
-        home_pct = round((home_goals / total) * 100)
-        return {"home_pct": home_pct, "away_pct": 100 - home_pct}
-    home_s = {s.get("type"): s.get("value") for s in stats[0].get("statistics", [])}
-    away_s = {s.get("type"): s.get("value") for s in stats[1].get("statistics", [])}
-    def _gn(d: dict, key: str) -> float:
-        v = d.get(key)
-        if v is None: return 0.0
-        if isinstance(v, str) and v.endswith("%"): return float(v[:-1])
-        try: return float(v)
-        except (ValueError, TypeError): return 0.0
-    h_poss = _gn(home_s, "Ball Possession")
-    a_poss = _gn(away_s, "Ball Possession") or (100 - h_poss)
-    h_shots = _gn(home_s, "Shots on Goal"); a_shots = _gn(away_s, "Shots on Goal")
-    h_corners = _gn(home_s, "Corner Kicks"); a_corners = _gn(away_s, "Corner Kicks")
-    h_cards = _gn(home_s, "Yellow Cards") + _gn(home_s, "Red Cards") * 2
-    a_cards = _gn(away_s, "Yellow Cards") + _gn(away_s, "Red Cards") * 2
-    total_shots = h_shots + a_shots or 1
-    total_corners = h_corners + a_corners or 1
-    h_score = (h_poss * 0.40) + ((h_shots / total_shots) * 100 * 0.35) + ((h_corners / total_corners) * 100 * 0.15) - (h_cards * 5)
-    a_score = (a_poss * 0.40) + ((a_shots / total_shots) * 100 * 0.35) + ((a_corners / total_corners) * 100 * 0.15) - (a_cards * 5)
-    total = h_score + a_score or 1
-    home_pct = max(5, min(95, round((h_score / total) * 100)))
-    return {"home_pct": home_pct, "away_pct": 100 - home_pct}
+    snap = get_match_snapshot_sync(match_id)
+    return snap.momentum if snap else dict(_NEUTRAL_MOMENTUM)
 
 
 def get_match_lineups_sync(match_id: int) -> dict:
-    raw = _get_sync(f"/matches/{match_id}")
-    if not raw:
-        return {"home": None, "away": None}
-    lineups = raw.get("lineups", [])
-    result = {"home": None, "away": None}
-    home_team = raw.get("homeTeam", {}).get("name")
-    away_team = raw.get("awayTeam", {}).get("name")
-    for lineup in lineups:
-        team_name = lineup.get("team", {}).get("name")
-        side = None
-        if team_name == home_team: side = "home"
-        elif team_name == away_team: side = "away"
-        else: continue
-        result[side] = {
-            "formation": lineup.get("formation"), "team": team_name,
-            "startXI": [{"name": p.get("name"), "number": p.get("shirtNumber"), "position": p.get("position")} for p in lineup.get("startXI", [])],
-            "substitutes": [{"name": p.get("name"), "number": p.get("shirtNumber"), "position": p.get("position")} for p in lineup.get("substitutes", [])],
-        }
-    return result
+    snap = get_match_snapshot_sync(match_id)
+    return snap.lineups if snap else dict(_NO_LINEUPS)
 
 
 def _format_matches(raw_matches: list) -> list:
@@ -0,0 +1,176 @@
+"""
+Intel feed ingestion — shared RSS index for /intel/news and /intel/more-news.
+
+The intel endpoints used to download and parse all five RSS feeds on every
+request and then throw away everything that didn't mention the requested
+team, so 48 nations × traffic meant the same global feeds were fetched over
+and over.  Now each feed is pulled once per REFRESH_INTERVAL by a per-worker
+scheduler job, using conditional GET (ETag / Last-Modified), so an unchanged
+feed costs a 304 and no parsing.  Changed feeds are parsed incrementally as
+they download (app.services.feed_parser).  Parsed items are kept per source and
+rebuilt into one inverted index (app.services.intel_index), so a team or
+search-term request is an index lookup.
+
+    await intel_feeds.ensure_fresh()            # no-op while the index is warm
+    articles = intel_feeds.articles_for("Brazil")
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.http_clients import get_async_client
+from app.services.feed_parser import FeedParser
+from app.services.intel_index import ArticleIndex
+
+logger = logging.getLogger("fanxi.intel_feeds")
+
+RSS_SOURCES = [
+    {
+        'name': 'BBC Sport',
+        'url': 'https://feeds.bbci.co.uk/sport/football/rss.xml',
+    },
+    {
+        'name': 'Sky Sports',
+        'url': 'https://www.skysports.com/rss/12040',
+    },
+    {
+        'name': 'Goal.com',
+        'url': 'https://www.goal.com/feeds/en/news',
+    },
+    {
+        'name': 'Guardian Football',
+        'url': 'https://www.theguardian.com/football/rss',
+    },
+    {
+        'name': 'ESPN FC',
+        'url': 'https://www.espn.com/espn/rss/soccer/news',
+    },
+]
+
+REFRESH_INTERVAL = 600            # seconds between feed polls
+STALE_AFTER = 3 * REFRESH_INTERVAL  # a request refreshes inline past this
+MAX_ITEMS_PER_FEED = 50
+
+
+@dataclass
+class _Feed:
+    name: str
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    articles: List[dict] = field(default_factory=list)
+    fetched_at: float = 0.0
+    counts: Dict[str, int] = field(
+        default_factory=lambda: {"fetches": 0, "not_modified": 0, "errors": 0}
+    )
+
+
+_feeds: Dict[str, _Feed] = {src['url']: _Feed(src['name'], src['url']) for src in RSS_SOURCES}
+_index = ArticleIndex([])                # every ingested item, newest first
+_refreshed_at = 0.0
+_refresh_task: Optional[asyncio.Task] = None
+
+
+# ── Ingestion ─────────────────────────────────────────────────────────────────
+
+def published_key(article: dict) -> datetime:
+    try:
+        return datetime.fromisoformat(article['published'].replace('Z', '+00:00'))
+    except Exception:
+        return datetime.min.replace(tzinfo=timezone.utc)
+
+
+async def _fetch_feed(client: httpx.AsyncClient, feed: _Feed) -> bool:
+    """Conditional GET of one feed.  True if its articles changed."""
+    headers = {"User-Agent": "FanXI/1.0"}
+    if feed.etag:
+        headers["If-None-Match"] = feed.etag
+    if feed.last_modified:
+        headers["If-Modified-Since"] = feed.last_modified
+    feed.counts["fetches"] += 1
+    try:
+        async with client.stream("GET", feed.url, headers=headers, timeout=8.0) as resp:
+            if resp.status_code == 304:
+                feed.counts["not_modified"] += 1
+                feed.fetched_at = time.monotonic()
+                return False
+            resp.raise_for_status()
+            # Parse while downloading; stop reading once we have enough items
+            parser = FeedParser(feed.name, MAX_ITEMS_PER_FEED)
+            async for chunk in resp.aiter_bytes():
+                if parser.feed(chunk):
+                    break
+            articles = parser.close()
+    except Exception as e:
+        feed.counts["errors"] += 1
+        logger.warning("FEED_FETCH_FAILED source=%s error=%s", feed.name, e)
+        return False
+    feed.etag = resp.headers.get("etag")
+    feed.last_modified = resp.headers.get("last-modified")
+    feed.articles = articles
+    feed.fetched_at = time.monotonic()
+    return True
+
+
+def _rebuild() -> None:
+    global _index
+    _index = ArticleIndex(sorted(
+        (a for feed in _feeds.values() for a in feed.articles),
+        key=published_key, reverse=True,
+    ))
+
+
+async def refresh() -> None:
+    """Poll every feed once and rebuild the index if anything changed."""
+    global _refreshed_at
+    client = get_async_client("rss")
+    changed = await asyncio.gather(*(_fetch_feed(client, f) for f in _feeds.values()))
+    if any(changed):
+        _rebuild()
+    _refreshed_at = time.monotonic()
+    logger.info(
+        "FEEDS_REFRESHED changed=%d total=%d articles=%d",
+        sum(changed), len(changed), len(_index),
+    )
+
+
+async def ensure_fresh() -> None:
+    """Refresh inline only if the scheduled job hasn't kept the index warm."""
+    global _refresh_task
+    if _refreshed_at and time.monotonic() - _refreshed_at < STALE_AFTER:
+        return
+    loop = asyncio.get_running_loop()
+    if _refresh_task is None or _refresh_task.done() or _refresh_task.get_loop() is not loop:
+        _refresh_task = loop.create_task(refresh())
+    await asyncio.shield(_refresh_task)
+
+
+def articles_for(term: str) -> List[dict]:
+    """Ingested articles about `term` (a nation, any alias, or a phrase), best first."""
+    return _index.search(term)
+
+
+def page(terms: List[str], page: int, page_size: int) -> Tuple[List[dict], int]:
+    """Newest-first page over everything matching any of `terms`, plus the total."""
+    return _index.page(terms, page, page_size, key=published_key)
+
+
+def stats() -> dict:
+    now = time.monotonic()
+    return {
+        "indexed_articles": len(_index),
+        "refreshed_age_s": round(now - _refreshed_at, 1) if _refreshed_at else None,
+        "feeds": {
+            f.name: {
+                **f.counts,
+                "articles": len(f.articles),
+                "age_s": round(now - f.fetched_at, 1) if f.fetched_at else None,
+            }
+            for f in _feeds.values()
+        },
+    }
@@ -0,0 +1,159 @@
+"""
+Token-level inverted index over ingested intel articles, with nation aliases.
+
+Team matching used to be a substring test of the team name against every
+article's title + trail, repeated for each request.  It missed aliases
+("USA" vs "United States", "Türkiye" vs "Turkey") and matched inside other
+words ("Oman" in "Romania").  This module tokenises each article once
+(accents folded, lower-cased) into postings token -> article ids, and
+resolves any query to a ranked list of articles:
+
+    index = ArticleIndex(articles)
+    index.search("united-states")   # same result as "USA" or "USMNT"
+
+Nation aliases are built from STATIC_SQUADS, the hermes WC2026_TEAMS list,
+the _FLAGS maps (names that share a flag are one nation) and a few common
+press variants in EXTRA_ALIASES.  A nation query matches any of its alias
+phrases.  Any other query matches as a phrase.  Results are ranked by
+title hits, then body hits, then recency.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Press and fan variants the name lists above don't cover
+EXTRA_ALIASES: Dict[str, List[str]] = {
+    "USA": ["USMNT", "United States of America"],
+    "Netherlands": ["Holland", "Dutch"],
+    "Türkiye": ["Turkiye"],
+    "DR Congo": ["Congo DR", "Democratic Republic of Congo", "DRC"],
+    "Côte d'Ivoire": ["Ivory Coast"],
+    "Czech Republic": ["Czechia"],
+    "Iran": ["IR Iran"],
+    "Saudi Arabia": ["Saudi"],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+TITLE_WEIGHT = 3
+MAX_CACHED_QUERIES = 256
+
+
+def tokenize(text: str) -> List[str]:
+    folded = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return _TOKEN_RE.findall(folded.lower())
+
+
+@lru_cache(maxsize=1)
+def nation_aliases() -> Dict[Tuple[str, ...], str]:
+    """Alias phrase (tokenised) -> canonical nation name."""
+    from app.agents.hermes import WC2026_TEAMS
+    from app.data.static_squads import STATIC_SQUADS
+    from app.services.football_data import _FLAGS
+
+    # Canonical names: STATIC_SQUADS spelling wins, then hermes
+    canonical: List[str] = list(STATIC_SQUADS)
+    by_flag: Dict[str, str] = {_FLAGS[n]: n for n in canonical if n in _FLAGS}
+    groups: Dict[str, Set[str]] = {n: {n} for n in canonical}
+
+    def attach(name: str) -> None:
+        flag = _FLAGS.get(name)
+        owner = by_flag.get(flag) if flag else None
+        if owner is None and name not in groups:
+            groups[name] = {name}
+            if flag:
+                by_flag[flag] = name
+        elif owner is not None:
+            groups[owner].add(name)
+
+    for name in [*WC2026_TEAMS, *_FLAGS]:
+        attach(name)
+    for name, extras in EXTRA_ALIASES.items():
+        owner = by_flag.get(_FLAGS.get(name, ""), name)
+        groups.setdefault(owner, {owner}).update(extras)
+
+    aliases: Dict[Tuple[str, ...], str] = {}
+    for nation, names in groups.items():
+        for name in names:
+            tokens = tuple(tokenize(name))
+            if tokens:
+                aliases.setdefault(tokens, nation)
+    return aliases
+
+
+def resolve_nation(query: str) -> Optional[str]:
+    """Canonical nation for a name, alias or slug — None if it isn't one."""
+    return nation_aliases().get(tuple(tokenize(query)))
+
+
+def _phrases_for(nation: str) -> List[Tuple[str, ...]]:
+    return [p for p, n in nation_aliases().items() if n == nation]
+
+
+class ArticleIndex:
+    """Immutable index over one snapshot of articles (pre-sorted newest first)."""
+
+    def __init__(self, articles: Sequence[dict]) -> None:
+        self.articles = list(articles)
+        self._title: List[List[str]] = []
+        self._body: List[List[str]] = []
+        self._postings: Dict[str, Set[int]] = {}
+        for i, a in enumerate(self.articles):
+            title, body = tokenize(a.get("title", "")), tokenize(a.get("trail", ""))
+            self._title.append(title)
+            self._body.append(body)
+            for token in {*title, *body}:
+                self._postings.setdefault(token, set()).add(i)
+        self._cache: Dict[str, List[dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    @staticmethod
+    def _count(tokens: List[str], phrase: Tuple[str, ...]) -> int:
+        n = len(phrase)
+        if n == 1:
+            return tokens.count(phrase[0])
+        return sum(1 for i in range(len(tokens) - n + 1) if tuple(tokens[i:i + n]) == phrase)
+
+    def _score(self, phrases: Iterable[Tuple[str, ...]]) -> Dict[int, int]:
+        scores: Dict[int, int] = {}
+        for phrase in phrases:
+            postings = [self._postings.get(t, set()) for t in phrase]
+            candidates = set.intersection(*postings) if postings else set()
+            for i in candidates:
+                score = (TITLE_WEIGHT * self._count(self._title[i], phrase)
+                         + self._count(self._body[i], phrase))
+                if score:
+                    scores[i] = scores.get(i, 0) + score
+        return scores
+
+    def search(self, query: str) -> List[dict]:
+        """Articles matching a nation (any alias) or phrase, best first."""
+        nation = resolve_nation(query)
+        key = nation or " ".join(tokenize(query))
+        hits = self._cache.get(key)
+        if hits is None:
+            phrases = _phrases_for(nation) if nation else [tuple(tokenize(query))]
+            scores = self._score(p for p in phrases if p)
+            # Articles are newest first, so the index breaks ties by recency
+            ranked = sorted(scores, key=lambda i: (-scores[i], i))
+            hits = [self.articles[i] for i in ranked]
+            if len(self._cache) < MAX_CACHED_QUERIES:
+                self._cache[key] = hits
+        return hits
+
+    def page(self, queries: Sequence[str], page: int, page_size: int,
+             key: Callable[[dict], object]) -> Tuple[List[dict], int]:
+        """One page of the de-duplicated union of several queries, sorted by `key` descending."""
+        seen: Set[str] = set()
+        merged: List[dict] = []
+        for q in queries:
+            for a in self.search(q):
+                title_key = a["title"][:60].lower().strip()
+                if title_key not in seen:
+                    seen.add(title_key)
+                    merged.append(a)
+        merged.sort(key=key, reverse=True)
+        start = (page - 1) * page_size
+        return merged[start:start + page_size], len(merged)
@@ -0,0 +1,165 @@
+"""
+Leaderboard service — rank lookups without scanning the user table.
+
+Backed by the LeaderboardRank materialized table:
+  - refresh()      rebuilds every row with one INSERT ... SELECT using
+                   RANK() / ROW_NUMBER() window functions.  Called by the
+                   scoring engine after each match and by the admin
+                   recalculate endpoint — the only places points change.
+  - add_user()     appends a newly registered (0-point) user at the bottom
+                   in O(log n): no rebuild needed.  Concurrent signups can
+                   race for the same position; the loser rebuilds instead.
+  - rank_of()      primary-key lookup.
+  - page() / top() index range scan on the unique position column.
+
+Both SQLite (>= 3.25) and PostgreSQL support the window functions used here.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select
+
+from app.models import LeaderboardRank, User
+from app.services.scoring import rank_title_for
+
+logger = logging.getLogger("fanxi.leaderboard")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def refresh(session: Session) -> int:
+    """Rebuild the rank table from User.football_iq_points.  Returns row count."""
+    order = (User.football_iq_points.desc(), User.id.asc())
+    session.exec(delete(LeaderboardRank))
+    session.exec(
+        insert(LeaderboardRank).from_select(
+            ["user_id", "points", "rank", "position", "refreshed_at"],
+            select(
+                User.id,
+                User.football_iq_points,
+                func.rank().over(order_by=User.football_iq_points.desc()),
+                func.row_number().over(order_by=order),
+                func.current_timestamp(),
+            ),
+        )
+    )
+    session.commit()
+    total = total_scouts(session)
+    logger.info("LEADERBOARD_REFRESH rows=%d", total)
+    return total
+
+
+def add_user(session: Session, user: User) -> None:
+    """
+    Append a user to the bottom of the leaderboard.
+
+    New accounts have 0 points, which is <= everyone already ranked, so the
+    user takes the next position and shares the last rank if the current
+    bottom row is also on the same points.
+
+    Called after the User row is committed, so it never fails the signup:
+    if another worker claimed the same position first, roll back and
+    rebuild; if that rebuild races too, rank_of() rebuilds on first read.
+    """
+    if session.get(LeaderboardRank, user.id) is not None:
+        return
+    last = session.exec(
+        select(LeaderboardRank).order_by(LeaderboardRank.position.desc()).limit(1)
+    ).first()
+    if last and last.points < user.football_iq_points:
+        # Not a bottom insert — positions above would shift.  Rebuild instead.
+        refresh(session)
+        return
+    position = (last.position if last else 0) + 1
+    rank = last.rank if last and last.points == user.football_iq_points else position
+    session.add(LeaderboardRank(
+        user_id=user.id,
+        points=user.football_iq_points,
+        rank=rank,
+        position=position,
+        refreshed_at=datetime.utcnow(),
+    ))
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        logger.info("LEADERBOARD_APPEND_CONFLICT user_id=%s position=%d", user.id, position)
+        try:
+            refresh(session)
+        except IntegrityError:
+            session.rollback()
+            logger.warning("LEADERBOARD_REFRESH_CONFLICT user_id=%s", user.id)
+
+
+def total_scouts(session: Session) -> int:
+    """Number of ranked users — the highest position, read from the index."""
+    return session.exec(select(func.max(LeaderboardRank.position))).one() or 0
+
+
+def rank_of(session: Session, user_id: int) -> Tuple[Optional[int], int]:
+    """
+    (rank, total_scouts) for one user.
+
+    Rebuilds once if the user is missing (e.g. first boot after this table
+    was introduced); rank is None only if the user does not exist.
+    """
+    row = session.get(LeaderboardRank, user_id)
+    if row is None:
+        refresh(session)
+        row = session.get(LeaderboardRank, user_id)
+    return (row.rank if row else None), total_scouts(session)
+
+
+def page(
+    session: Session,
+    after_position: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> List[dict]:
+    """
+    Up to `limit` entries strictly after `after_position`, best first.
+
+    Page K of size L is page(after_position=(K - 1) * L, limit=L); cursor
+    pagination passes the last position seen.  Points and rank title both
+    come from the snapshot, so an entry never pairs old points with a title
+    earned since the last refresh.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if total_scouts(session) == 0:
+        refresh(session)
+    rows = session.exec(
+        select(LeaderboardRank, User.username, User.country_allegiance)
+        .join(User, User.id == LeaderboardRank.user_id)
+        .where(LeaderboardRank.position > after_position)
+        .order_by(LeaderboardRank.position)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "rank": lr.rank,
+            "position": lr.position,
+            "username": username,
+            "country_allegiance": country,
+            "football_iq_points": lr.points,
+            "rank_title": rank_title_for(lr.points),
+        }
+        for lr, username, country in rows
+    ]
+
+
+def top(session: Session, n: int = 10) -> List[dict]:
+    """The best n scouts."""
+    return page(session, after_position=0, limit=n)
+
+
+def etag_for(entries: List[dict]) -> str:
+    """Strong ETag over a page's content — changes whenever any row does."""
+    digest = hashlib.sha1(json.dumps(entries, sort_keys=True).encode()).hexdigest()
+    return f'"{digest[:32]}"'
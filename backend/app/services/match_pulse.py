@@ -0,0 +1,132 @@
+"""
+Per-match prediction tallies for GET /matches/{match_id}/pulse.
+
+The pulse used to load every MatchPrediction of the match, lineup and
+tactics JSON included, and count results and first-scorer picks in Python.
+That is O(predictions) per request, from an endpoint the live match page
+polls.
+
+Now the counts live in MatchPulseCount, one row per (match, dimension,
+value), and move with the writes.  prediction_ingest.write_batch() knows,
+for every row of a batch, whether it inserted it or what it replaced.  It
+passes that to track_insert() / track_update(), then apply() adds the
+deltas in the same transaction:
+
+    INSERT ... ON CONFLICT (match_id, dimension, value)
+    DO UPDATE SET count = count + excluded.count
+
+The increment is atomic, so concurrent batches on other workers can't lose
+updates.  Reading the pulse is then two primary-key range reads: the
+result, formation and total rows, plus the top captain rows.
+
+The formation histogram comes from tactics_data["formation"], and captain
+picks come from player_predictions["first_goalscorer"].
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from app.db import dialect_insert
+from app.models import MatchPulseCount
+
+RESULTS = ("home", "draw", "away")
+TOP_CAPTAINS = 5
+
+# (match_id, dimension, value) -> change in count
+Deltas = Counter
+PulseValues = Tuple[Optional[str], Optional[str], Optional[str]]   # result, formation, captain
+
+
+def pulse_values(
+    match_result: Optional[str],
+    tactics_data: Optional[Dict[str, Any]],
+    player_predictions: Optional[Dict[str, Any]],
+) -> PulseValues:
+    """What one prediction contributes to the pulse."""
+    result = match_result if match_result in RESULTS else None
+    formation = (tactics_data or {}).get("formation") or None
+    captain = (player_predictions or {}).get("first_goalscorer") or None
+    return result, formation, captain
+
+
+def _add(deltas: Deltas, match_id: int, values: PulseValues, sign: int) -> None:
+    for dimension, value in zip(("result", "formation", "captain"), values):
+        if value is not None:
+            deltas[(match_id, dimension, str(value))] += sign
+
+
+def track_insert(deltas: Deltas, match_id: int, values: PulseValues) -> None:
+    deltas[(match_id, "total", "")] += 1
+    _add(deltas, match_id, values, 1)
+
+
+def track_update(deltas: Deltas, match_id: int, old: PulseValues, new: PulseValues) -> None:
+    if old != new:
+        _add(deltas, match_id, old, -1)
+        _add(deltas, match_id, new, 1)
+
+
+def apply(conn: Connection, deltas: Deltas) -> None:
+    """Add `deltas` to the counters, in sorted key order so concurrent batches lock alike."""
+    rows = [
+        {"match_id": m, "dimension": d, "value": v, "count": n}
+        for (m, d, v), n in sorted(deltas.items()) if n
+    ]
+    if not rows:
+        return
+    table = MatchPulseCount.__table__
+    stmt = dialect_insert(conn.dialect.name)(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.match_id, table.c.dimension, table.c.value],
+        set_={"count": table.c.count + stmt.excluded["count"]},
+    )
+    conn.execute(stmt, rows)
+
+
+def backfill(conn: Connection, rows: Iterable[Tuple[int, Optional[str], Any, Any]]) -> None:
+    """Count existing predictions from (match_id, match_result, tactics_data, player_predictions) rows."""
+    deltas: Deltas = Counter()
+    for match_id, match_result, tactics_data, player_predictions in rows:
+        track_insert(deltas, match_id, pulse_values(match_result, tactics_data, player_predictions))
+    apply(conn, deltas)
+
+
+def _pct(count: int, total: int) -> int:
+    return round(count / total * 100) if total else 0
+
+
+def get_pulse(session: Session, match_id: int) -> Dict[str, Any]:
+    counts = session.exec(
+        select(MatchPulseCount.dimension, MatchPulseCount.value, MatchPulseCount.count)
+        .where(
+            MatchPulseCount.match_id == match_id,
+            MatchPulseCount.dimension.in_(("total", "result", "formation")),
+            MatchPulseCount.count > 0,
+        )
+    ).all()
+    captains = session.exec(
+        select(MatchPulseCount.value, MatchPulseCount.count)
+        .where(
+            MatchPulseCount.match_id == match_id,
+            MatchPulseCount.dimension == "captain",
+            MatchPulseCount.count > 0,
+        )
+        .order_by(MatchPulseCount.count.desc(), MatchPulseCount.value)
+        .limit(TOP_CAPTAINS)
+    ).all()
+
+    total = next((n for d, _, n in counts if d == "total"), 0)
+    results = {v: n for d, v, n in counts if d == "result"}
+    formations = sorted(((v, n) for d, v, n in counts if d == "formation"), key=lambda vn: (-vn[1], vn[0]))
+
+    return {
+        "total_scouts": total,
+        "result_split": {r: _pct(results.get(r, 0), total) for r in RESULTS},
+        "formations": [{"formation": v, "count": n, "pct": _pct(n, total)} for v, n in formations],
+        "top_formation": formations[0][0] if formations else None,
+        "top_captains": [{"player": v, "count": n, "pct": _pct(n, total)} for v, n in captains],
+        "top_captain": captains[0][0] if captains else None,
+        "top_captain_pct": _pct(captains[0][1], total) if captains else 0,
+    }
@@ -1,6 +1,6 @@
 from typing import Dict, Optional
 from app.models import MatchPrediction, MatchDB
-from app.api.predictions import (
+from app.services.scoring import (
     score_match_result,
     score_correct_score,
     score_btts,
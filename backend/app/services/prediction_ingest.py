@@ -0,0 +1,293 @@
+"""
+Write-coalescing ingest for POST /predictions/lock/{match_id}.
+
+lock_prediction used to SELECT the existing row, then INSERT or UPDATE it,
+commit and refresh — four synchronous round-trips inside an `async def`
+handler, blocking the event loop of that worker for all of them.  In the
+kickoff burst (load-tests/burst-kickoff.js) every submission paid that in
+series, and p95 headed for its 2 s budget.
+
+Now the handler validates the request, builds a PredictionWrite and awaits
+submit():
+
+    prediction_id = await prediction_ingest.submit(write)
+
+Writes are queued in memory per event loop.  The first write into an empty
+queue starts a flush task.  It waits FLUSH_INTERVAL for more writes to join,
+then writes up to MAX_BATCH of them in one transaction on a worker
+thread, so the event loop never blocks on the DB.  It repeats until the
+queue is empty.  Writes for the same (user, match, team) in one batch
+collapse to the last one.  Across batches and workers, the unique index on
+that key decides between insert and update.  The same transaction adjusts
+the per-match pulse counters (match_pulse).
+
+submit() returns only after the batch has committed.  The prediction id is
+therefore a durable write ticket: an acknowledged prediction is on disk,
+and read-your-writes (the history tab reloads right after a lock) still
+holds.  A full queue (MAX_PENDING) is shed with IngestBusy (503).  If a
+batch fails, its writes are retried one by one so one bad row doesn't fail
+its neighbours.
+
+stats() reports throughput, batch sizes and enqueue-to-commit latency for
+/admin/metrics.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text, update
+from sqlmodel import Session
+
+from app.db import dialect_insert, engine
+from app.models import MatchPrediction
+from app.services import match_pulse
+
+logger = logging.getLogger("fanxi.ingest")
+
+FLUSH_INTERVAL = 0.005   # seconds a flush waits for more writes to join
+MAX_BATCH = 500
+MAX_PENDING = 10_000
+ACK_TIMEOUT = 10.0
+
+# Columns an update overwrites — everything the client sends
+_UPDATE_FIELDS = (
+    "lineup_data", "tactics_data", "match_result", "btts_prediction",
+    "correct_score", "over_under", "ht_ft", "player_predictions", "created_at",
+)
+
+Key = Tuple[int, int, Optional[str]]
+
+
+class IngestBusy(Exception):
+    """The ingest queue is full — the write was shed."""
+
+
+@dataclass
+class PredictionWrite:
+    user_id: int
+    match_id: int
+    team_name: Optional[str]
+    values: Dict[str, Any]                 # the _UPDATE_FIELDS columns
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def key(self) -> Key:
+        # '' and None are one row to the unique index, so one key here
+        return (self.user_id, self.match_id, self.team_name or None)
+
+
+@dataclass
+class _LoopQueue:
+    pending: List[Tuple[PredictionWrite, asyncio.Future]] = field(default_factory=list)
+    flushing: bool = False
+
+
+_queues: Dict[asyncio.AbstractEventLoop, _LoopQueue] = {}
+_stats: Dict[str, float] = {
+    "submitted": 0, "rows_written": 0, "batches": 0, "coalesced": 0,
+    "failed": 0, "shed": 0, "timeouts": 0,
+}
+_latencies_ms: Deque[float] = deque(maxlen=2000)     # enqueue -> commit, per write
+_batch_log: Deque[Tuple[float, int]] = deque(maxlen=2000)  # (committed_at, rows)
+
+
+def _queue() -> _LoopQueue:
+    loop = asyncio.get_running_loop()
+    q = _queues.get(loop)
+    if q is None:
+        for old in [lp for lp in _queues if lp.is_closed()]:
+            del _queues[old]
+        q = _queues[loop] = _LoopQueue()
+    return q
+
+
+def build_write(user_id: int, match_id: int, team_name: Optional[str], **values: Any) -> PredictionWrite:
+    values.setdefault("created_at", datetime.now(timezone.utc))
+    return PredictionWrite(user_id, match_id, team_name, {f: values.get(f) for f in _UPDATE_FIELDS})
+
+
+async def submit(write: PredictionWrite) -> int:
+    """Queue a write and wait for its batch to commit.  Returns the prediction id."""
+    q = _queue()
+    if len(q.pending) >= MAX_PENDING:
+        _stats["shed"] += 1
+        logger.warning("INGEST_SHED pending=%d", len(q.pending))
+        raise IngestBusy("Too many predictions being saved — try again shortly")
+    future = asyncio.get_running_loop().create_future()
+    q.pending.append((write, future))
+    _stats["submitted"] += 1
+    if not q.flushing:
+        q.flushing = True
+        asyncio.create_task(_flush(q))
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), ACK_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise
+
+
+async def _flush(q: _LoopQueue) -> None:
+    try:
+        while q.pending:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            batch = q.pending[:MAX_BATCH]
+            del q.pending[:MAX_BATCH]
+            writes = [w for w, _ in batch]
+            try:
+                ids = await asyncio.to_thread(write_batch, writes)
+            except Exception as exc:
+                logger.error("INGEST_BATCH_FAILED rows=%d error=%s", len(writes), exc)
+                ids = await asyncio.to_thread(_write_one_by_one, writes)
+            _record(writes, ids)
+            for write, future in batch:
+                if future.done():
+                    continue
+                result = ids.get(write.key)
+                if isinstance(result, int):
+                    future.set_result(result)
+                else:
+                    future.set_exception(result or RuntimeError("prediction not written"))
+    finally:
+        q.flushing = False
+
+
+def _record(writes: List[PredictionWrite], ids: Dict[Key, Any]) -> None:
+    now = time.monotonic()
+    written = sum(1 for v in ids.values() if isinstance(v, int))
+    _stats["batches"] += 1
+    _stats["rows_written"] += written
+    _stats["failed"] += len(ids) - written
+    _stats["coalesced"] += len(writes) - len(ids)
+    _batch_log.append((now, written))
+    _latencies_ms.extend((now - w.enqueued_at) * 1000 for w in writes)
+
+
+def _coalesce(writes: List[PredictionWrite]) -> Dict[Key, PredictionWrite]:
+    """Last write wins per (user, match, team)."""
+    latest: Dict[Key, PredictionWrite] = {}
+    for w in writes:
+        latest[w.key] = w
+    return latest
+
+
+def _norm(key: Key) -> Key:
+    """The key as the unique index sees it — a NULL team equals ''."""
+    return (key[0], key[1], key[2] or "")
+
+
+def write_batch(writes: List[PredictionWrite]) -> Dict[Key, Any]:
+    """
+    Write a batch in one transaction, keeping the match pulse counters in
+    step with it:
+
+      1. INSERT ... ON CONFLICT DO NOTHING RETURNING claims the new keys.
+         The (user_id, match_id, coalesce(team_name, '')) unique index
+         decides, so a key another worker inserted first just isn't returned.
+      2. The other keys' rows are read FOR UPDATE, which gives their current
+         pulse values and holds them until commit.
+      3. One executemany UPDATE by primary key overwrites them.
+      4. match_pulse.apply() adds the count deltas.
+
+    Rows are taken in key / id order so concurrent batches lock alike.
+    Returns key -> prediction id.
+    """
+    latest = _coalesce(writes)
+    ordered = sorted(latest.items(), key=lambda kw: (kw[0][1], kw[0][0], kw[0][2] or ""))
+    table = MatchPrediction.__table__
+    ids: Dict[Key, Any] = {}
+    deltas: Counter = Counter()
+    with Session(engine) as session:
+        conn = session.connection()
+        stmt = dialect_insert(conn.dialect.name)(table).on_conflict_do_nothing(
+            index_elements=[table.c.user_id, table.c.match_id, text("coalesce(team_name, '')")],
+        ).returning(table.c.id, table.c.user_id, table.c.match_id, table.c.team_name)
+        created = conn.execute(stmt, [
+            {"user_id": w.user_id, "match_id": w.match_id, "team_name": w.team_name,
+             "status": "LOCKED", **w.values}
+            for _, w in ordered
+        ]).all()
+        inserted = {_norm((user_id, match_id, team_name)): pred_id for pred_id, user_id, match_id, team_name in created}
+
+        existing: Dict[Key, Key] = {}
+        for key, write in ordered:
+            if _norm(key) in inserted:
+                ids[key] = inserted[_norm(key)]
+                match_pulse.track_insert(deltas, write.match_id, _pulse(write.values))
+            else:
+                existing[_norm(key)] = key
+
+        if existing:
+            rows = conn.execute(
+                select(
+                    table.c.id, table.c.user_id, table.c.match_id, table.c.team_name,
+                    table.c.match_result, table.c.tactics_data, table.c.player_predictions,
+                )
+                .where(
+                    table.c.user_id.in_({k[0] for k in existing.values()}),
+                    table.c.match_id.in_({k[1] for k in existing.values()}),
+                )
+                .order_by(table.c.id)
+                .with_for_update()
+            ).all()
+            updates = []
+            for row in rows:
+                key = existing.get(_norm((row.user_id, row.match_id, row.team_name)))
+                if key is None:
+                    continue
+                write = latest[key]
+                ids[key] = row.id
+                old = match_pulse.pulse_values(row.match_result, row.tactics_data, row.player_predictions)
+                match_pulse.track_update(deltas, row.match_id, old, _pulse(write.values))
+                updates.append({"id": row.id, **write.values})
+            if updates:
+                session.execute(update(MatchPrediction), updates)
+
+        match_pulse.apply(conn, deltas)
+        session.commit()
+    return ids
+
+
+def _pulse(values: Dict[str, Any]) -> match_pulse.PulseValues:
+    return match_pulse.pulse_values(
+        values.get("match_result"), values.get("tactics_data"), values.get("player_predictions"),
+    )
+
+
+def _write_one_by_one(writes: List[PredictionWrite]) -> Dict[Key, Any]:
+    results: Dict[Key, Any] = {}
+    for key, write in _coalesce(writes).items():
+        try:
+            results.update(write_batch([write]))
+        except Exception as exc:
+            logger.error("INGEST_WRITE_FAILED user=%s match=%s error=%s", write.user_id, write.match_id, exc)
+            results[key] = exc
+    return results
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
+def stats() -> dict:
+    now = time.monotonic()
+    recent = [rows for at, rows in _batch_log if now - at <= 60]
+    latencies = list(_latencies_ms)
+    batches = int(_stats["batches"])
+    return {
+        **{k: int(v) for k, v in _stats.items()},
+        "pending": sum(len(q.pending) for q in list(_queues.values())),
+        "avg_batch_rows": round(_stats["rows_written"] / batches, 1) if batches else None,
+        "rows_per_sec_1m": round(sum(recent) / 60, 2),
+        "flush_latency_ms": {
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "max": round(max(latencies), 1) if latencies else None,
+        },
+    }
@@ -0,0 +1,431 @@
+"""
+Bulk scoring engine — scores every LOCKED prediction for a finished match.
+
+Replaces the row-by-row loop that used to live in POST
+/predictions/admin/score/{match_id}.  At full-time on a marquee match there
+are tens of thousands of predictions, so the engine:
+
+  - streams predictions in keyset-paginated chunks (id > last_id), selecting
+    only the outcome columns — never the lineup/tactics JSON blobs
+  - scores a whole chunk against a precomputed ActualResult, memoising
+    points per distinct pick (most users share the same handful of picks)
+  - flips the chunk LOCKED -> SCORED with a single guarded UPDATE and uses
+    the returned ids to build per-user point deltas
+  - applies those deltas plus the new rank titles with ONE aggregated
+    UPDATE ... CASE statement per chunk
+  - commits per chunk, so a crash mid-run loses at most one chunk of work
+  - counts the users whose rank title changed
+
+Idempotent and resumable: the status flip and the IQ increment share one
+transaction, and only rows still LOCKED are ever flipped.  Re-running after a
+crash (or a concurrent double-click) picks up exactly the remaining rows and
+never awards points twice.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, update
+from sqlmodel import Session, func, select
+
+from app.models import MatchPrediction, User
+from app.services import card_prerender, leaderboard
+from app.schemas import MatchResultInput
+from app.services.scoring import (
+    RANK_THRESHOLDS,
+    _result_from_goals,
+    rank_title_for,
+    score_anytime_goalscorer,
+    score_btts,
+    score_correct_score,
+    score_first_goalscorer,
+    score_ht_ft,
+    score_man_of_the_match,
+    score_match_result,
+    score_over_under,
+    score_player_assist,
+    score_player_carded,
+    score_shots_on_target,
+)
+
+logger = logging.getLogger("fanxi.scoring")
+
+# Rows per chunk.  Large enough to amortise the two UPDATEs, small enough that
+# each transaction holds its row locks for milliseconds, not minutes.
+DEFAULT_CHUNK_SIZE = 1000
+
+
+# ---------------------------------------------------------------------------
+# Precomputed match reality
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ActualResult:
+    """
+    Everything a prediction is compared against, derived once per run.
+
+    Player name collections are lower-cased once here; ChunkScorer hands them
+    to the score_* helpers in app.services.scoring.
+    """
+    home_goals: int
+    away_goals: int
+    ht_home_goals: int
+    ht_away_goals: int
+    result: str
+    first_goalscorer: Optional[str]
+    scorers: frozenset
+    assisters: frozenset
+    carded: frozenset
+    player_shots: Dict[str, int]
+    man_of_the_match: Optional[str]
+
+    @classmethod
+    def from_input(cls, result: MatchResultInput) -> "ActualResult":
+        return cls(
+            home_goals=result.home_goals,
+            away_goals=result.away_goals,
+            ht_home_goals=result.ht_home_goals,
+            ht_away_goals=result.ht_away_goals,
+            result=_result_from_goals(result.home_goals, result.away_goals),
+            first_goalscorer=(result.first_goalscorer or "").lower() or None,
+            scorers=frozenset(s.lower() for s in result.scorers),
+            assisters=frozenset(a.lower() for a in result.assisters),
+            carded=frozenset(c.lower() for c in result.carded),
+            player_shots={str(k).lower(): v for k, v in (result.player_shots or {}).items()},
+            man_of_the_match=(result.man_of_the_match or "").lower() or None,
+        )
+
+
+class ChunkScorer:
+    """
+    Scores rows against one ActualResult.
+
+    Points for every prediction category depend only on the pick itself, and
+    the number of distinct picks is tiny compared to the number of rows
+    (3 results, a few dozen scorelines, a few hundred player names).  Each
+    distinct pick is scored once and the answer is memoised, so scoring a
+    chunk is effectively a column-wise table lookup.
+    """
+
+    def __init__(self, actual: ActualResult):
+        self.actual = actual
+        self._memo: Dict[Tuple[str, Any], int] = {}
+
+    def _cached(self, category: str, pick: Any, fn: Callable[[], int]) -> int:
+        key = (category, pick)
+        pts = self._memo.get(key)
+        if pts is None:
+            pts = fn()
+            self._memo[key] = pts
+        return pts
+
+    @staticmethod
+    def _freeze(value: Any) -> Any:
+        """Hashable memo key for a JSON pick (dicts are serialised canonically)."""
+        if isinstance(value, dict):
+            return json.dumps(value, sort_keys=True)
+        return value
+
+    def score_row(
+        self,
+        match_result: Optional[str],
+        correct_score: Optional[dict],
+        btts_prediction: Optional[bool],
+        over_under: Optional[dict],
+        ht_ft: Optional[dict],
+        player_predictions: Optional[dict],
+    ) -> int:
+        a = self.actual
+        pts = 0
+
+        if match_result:
+            pts += self._cached(
+                "match_result", match_result,
+                lambda: score_match_result(match_result, a.home_goals, a.away_goals),
+            )
+        if correct_score:
+            pts += self._cached(
+                "correct_score", self._freeze(correct_score),
+                lambda: score_correct_score(correct_score, a.home_goals, a.away_goals),
+            )
+        if btts_prediction is not None:
+            pts += self._cached(
+                "btts", bool(btts_prediction),
+                lambda: score_btts(btts_prediction, a.home_goals, a.away_goals),
+            )
+        if over_under:
+            pts += self._cached(
+                "over_under", self._freeze(over_under),
+                lambda: score_over_under(over_under, a.home_goals, a.away_goals),
+            )
+        if ht_ft:
+            pts += self._cached(
+                "ht_ft", self._freeze(ht_ft),
+                lambda: score_ht_ft(
+                    ht_ft, a.ht_home_goals, a.ht_away_goals, a.home_goals, a.away_goals,
+                ),
+            )
+
+        # Player predictions — memoised per pick, so each helper rebuilds its
+        # lower-cased name set once per distinct player, not once per row.
+        pp = player_predictions or {}
+        first = pp.get("first_goalscorer")
+        if first and a.first_goalscorer:
+            pts += self._cached(
+                "first_goalscorer", first,
+                lambda: score_first_goalscorer(first, a.first_goalscorer),
+            )
+        anytime = pp.get("anytime_goalscorer")
+        if anytime and a.scorers:
+            pts += self._cached(
+                "anytime_goalscorer", anytime,
+                lambda: score_anytime_goalscorer(anytime, a.scorers),
+            )
+        assist = pp.get("player_assist")
+        if assist and a.assisters:
+            pts += self._cached(
+                "player_assist", assist,
+                lambda: score_player_assist(assist, a.assisters),
+            )
+        carded = pp.get("player_carded")
+        if carded and a.carded:
+            pts += self._cached(
+                "player_carded", carded,
+                lambda: score_player_carded(carded, a.carded),
+            )
+        sot = pp.get("shots_on_target")
+        if sot and a.player_shots:
+            pts += self._cached(
+                "shots_on_target", self._freeze(sot),
+                lambda: score_shots_on_target(sot, a.player_shots),
+            )
+        motm = pp.get("man_of_the_match")
+        if motm and a.man_of_the_match:
+            pts += self._cached(
+                "man_of_the_match", motm,
+                lambda: score_man_of_the_match(motm, a.man_of_the_match),
+            )
+
+        return pts
+
+
+# ---------------------------------------------------------------------------
+# Progress reporting
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ScoringProgress:
+    """Live progress of one scoring run.  Exposed via the progress endpoint."""
+    match_id: int
+    state: str = "running"              # running | finished | failed
+    chunks_done: int = 0
+    predictions_scored: int = 0
+    users_updated: int = 0
+    points_awarded: int = 0
+    last_prediction_id: int = 0
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    finished_at: Optional[str] = None
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+    ranks_changed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# match_id -> progress of the most recent run in this worker
+_progress: Dict[int, ScoringProgress] = {}
+
+
+def get_progress(session: Session, match_id: int) -> Dict[str, Any]:
+    """
+    Progress for a match: DB-derived counts (accurate across workers and
+    restarts) plus the in-process run record, when this worker ran it.
+    """
+    rows = session.exec(
+        select(MatchPrediction.status, func.count(MatchPrediction.id))
+        .where(MatchPrediction.match_id == match_id)
+        .group_by(MatchPrediction.status)
+    ).all()
+    counts = {status: count for status, count in rows}
+    locked = counts.get("LOCKED", 0)
+    scored = counts.get("SCORED", 0)
+    total = locked + scored
+    run = _progress.get(match_id)
+    return {
+        "match_id": match_id,
+        "locked": locked,
+        "scored": scored,
+        "percent_complete": round(scored / total * 100, 1) if total else 0.0,
+        "run": run.to_dict() if run else None,
+        "card_prerender": card_prerender.get_report(match_id),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+def _rank_title_expr(points_expr):
+    """SQL CASE mirroring rank_title_for(), evaluated against points_expr."""
+    return case(
+        *[(points_expr >= threshold, title) for threshold, title in RANK_THRESHOLDS],
+        else_="Scout",
+    )
+
+
+def _fetch_chunk(session: Session, match_id: int, after_id: int, limit: int) -> List[tuple]:
+    """Next chunk of LOCKED predictions, keyset-paginated on the primary key."""
+    return session.exec(
+        select(
+            MatchPrediction.id,
+            MatchPrediction.user_id,
+            MatchPrediction.match_result,
+            MatchPrediction.correct_score,
+            MatchPrediction.btts_prediction,
+            MatchPrediction.over_under,
+            MatchPrediction.ht_ft,
+            MatchPrediction.player_predictions,
+        )
+        .where(
+            MatchPrediction.match_id == match_id,
+            MatchPrediction.status == "LOCKED",
+            MatchPrediction.id > after_id,
+        )
+        .order_by(MatchPrediction.id)
+        .limit(limit)
+    ).all()
+
+
+def _apply_chunk(
+    session: Session,
+    rows: List[tuple],
+    points_by_prediction: Dict[int, int],
+) -> Tuple[int, int, int, List[int]]:
+    """
+    Flip the chunk to SCORED and award IQ in one transaction.
+
+    The status UPDATE is guarded by status == 'LOCKED' and returns the ids it
+    actually flipped — rows claimed by a concurrent run are excluded, so no
+    prediction is ever scored twice.
+
+    Returns (predictions_flipped, users_updated, points_awarded,
+    ids of users whose rank title changed).
+    """
+    ids = [row[0] for row in rows]
+    flipped = set(session.exec(
+        update(MatchPrediction)
+        .where(MatchPrediction.id.in_(ids), MatchPrediction.status == "LOCKED")
+        .values(status="SCORED")
+        .returning(MatchPrediction.id)
+    ).scalars().all())
+
+    deltas: Dict[int, int] = {}
+    for row in rows:
+        pred_id, user_id = row[0], row[1]
+        if pred_id in flipped and user_id:
+            deltas[user_id] = deltas.get(user_id, 0) + points_by_prediction[pred_id]
+
+    rank_changed: List[int] = []
+    if deltas:
+        for user_id, title, points in session.exec(
+            select(User.id, User.rank_title, User.football_iq_points).where(User.id.in_(list(deltas)))
+        ).all():
+            if rank_title_for((points or 0) + deltas[user_id]) != title:
+                rank_changed.append(user_id)
+
+        new_points = User.football_iq_points + case(deltas, value=User.id, else_=0)
+        session.exec(
+            update(User)
+            .where(User.id.in_(list(deltas)))
+            .values(
+                football_iq_points=new_points,
+                rank_title=_rank_title_expr(new_points),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    session.commit()
+    return len(flipped), len(deltas), sum(deltas.values()), rank_changed
+
+
+def score_match_bulk(
+    session: Session,
+    match_id: int,
+    result: MatchResultInput,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[ScoringProgress], None]] = None,
+) -> ScoringProgress:
+    """
+    Score every LOCKED prediction for match_id in committed chunks.
+
+    Safe to call again after a partial run: only predictions still LOCKED are
+    scored.  on_progress is invoked after each committed chunk.
+    """
+    scorer = ChunkScorer(ActualResult.from_input(result))
+    progress = ScoringProgress(match_id=match_id)
+    _progress[match_id] = progress
+    start = time.perf_counter()
+
+    # A user with a prediction per team can appear in several chunks
+    rank_changed_ids: Set[int] = set()
+    try:
+        last_id = 0
+        while True:
+            rows = _fetch_chunk(session, match_id, last_id, chunk_size)
+            if not rows:
+                break
+
+            points = {
+                row[0]: scorer.score_row(*row[2:])
+                for row in rows
+            }
+            flipped, users, awarded, rank_changed = _apply_chunk(session, rows, points)
+
+            last_id = rows[-1][0]
+            progress.chunks_done += 1
+            progress.predictions_scored += flipped
+            progress.users_updated += users
+            progress.points_awarded += awarded
+            rank_changed_ids.update(rank_changed)
+            progress.ranks_changed = len(rank_changed_ids)
+            progress.last_prediction_id = last_id
+            progress.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+
+            logger.info(
+                "SCORING_PROGRESS match_id=%d chunk=%d scored=%d users=%d duration_ms=%.0f",
+                match_id, progress.chunks_done, progress.predictions_scored,
+                progress.users_updated, progress.duration_ms,
+            )
+            if on_progress:
+                on_progress(progress)
+
+            if len(rows) < chunk_size:
+                break
+    except Exception as exc:
+        session.rollback()
+        progress.state = "failed"
+        progress.error = str(exc)
+        progress.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.error("SCORING_FAILED match_id=%d after_chunks=%d error=%s",
+                     match_id, progress.chunks_done, exc)
+        raise
+
+    # Points moved — rebuild the materialized ranks once for the whole run
+    if progress.predictions_scored:
+        leaderboard.refresh(session)
+
+    progress.state = "finished"
+    progress.finished_at = datetime.now(timezone.utc).isoformat()
+    progress.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(
+        "SCORING_DONE match_id=%d scored=%d users=%d points=%d duration_ms=%.0f",
+        match_id, progress.predictions_scored, progress.users_updated,
+        progress.points_awarded, progress.duration_ms,
+    )
+    return progress
@@ -0,0 +1,201 @@
+"""
+Pub/sub backplane for the match WebSocket hub.
+
+run.py starts several uvicorn workers, each with its own event loop and its
+own sockets.  The backplane lets them behave as one hub:
+
+  - publish / subscribe : the worker that polls a match publishes each
+    message once; every worker with clients for that match is subscribed and
+    fans the message out to its own sockets.
+  - leases              : "exactly one poller per match" — a worker only hits
+    football-data if it holds the poll lease for that match.  Leases expire,
+    so a crashed or idle worker hands over within one TTL.
+  - state               : the last full match state, so a client connecting
+    to any worker gets it immediately without an upstream call.
+
+Two implementations:
+  InProcessBackplane — dicts + asyncio queues.  Single-worker / dev / tests.
+  RedisBackplane     — any Redis-protocol server (Redis, Valkey, KeyDB...).
+                       Enabled by REDIS_URL; requires the `redis` package.
+
+get_backplane() picks one at first use and returns the same instance after.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, Optional, Set, Tuple
+
+from app.config import settings
+from app.core.jobs import WORKER_ID
+
+logger = logging.getLogger("fanxi.websocket.backplane")
+
+
+class Backplane:
+    """Interface shared by all backplane implementations."""
+
+    name = "base"
+
+    async def publish(self, channel: str, message: str) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, channel: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def acquire_lease(self, key: str, ttl_seconds: int) -> bool:
+        """Take or renew `key` for this worker.  True if this worker holds it."""
+        raise NotImplementedError
+
+    async def release_lease(self, key: str) -> None:
+        """Drop `key` if this worker holds it."""
+        raise NotImplementedError
+
+    async def set_state(self, key: str, value: str, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    async def get_state(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+
+# ---------------------------------------------------------------------------
+# In-process implementation
+# ---------------------------------------------------------------------------
+
+class InProcessBackplane(Backplane):
+    """Backplane scoped to one process — correct for a single worker."""
+
+    name = "in_process"
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._state: Dict[str, Tuple[str, float]] = {}
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in list(self._subscribers.get(channel, ())):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            subs = self._subscribers.get(channel)
+            if subs is not None:
+                subs.discard(queue)
+                if not subs:
+                    self._subscribers.pop(channel, None)
+
+    async def acquire_lease(self, key: str, ttl_seconds: int) -> bool:
+        now = time.monotonic()
+        holder = self._leases.get(key)
+        if holder and holder[0] != WORKER_ID and holder[1] > now:
+            return False
+        self._leases[key] = (WORKER_ID, now + ttl_seconds)
+        return True
+
+    async def release_lease(self, key: str) -> None:
+        holder = self._leases.get(key)
+        if holder and holder[0] == WORKER_ID:
+            del self._leases[key]
+
+    async def set_state(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._state[key] = (value, time.monotonic() + ttl_seconds)
+
+    async def get_state(self, key: str) -> Optional[str]:
+        entry = self._state.get(key)
+        if not entry:
+            return None
+        value, expires = entry
+        if expires < time.monotonic():
+            del self._state[key]
+            return None
+        return value
+
+
+# ---------------------------------------------------------------------------
+# Redis-protocol implementation
+# ---------------------------------------------------------------------------
+
+# Renew only if we still own the key; release only if we still own it.
+# Both must be atomic, hence Lua rather than GET-then-SET.
+_RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackplane(Backplane):
+    """Backplane shared by every worker that points at the same REDIS_URL."""
+
+    name = "redis"
+    PREFIX = "fanxi:ws:"
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as aioredis  # optional dependency
+
+        self._redis = aioredis.from_url(url, decode_responses=True)
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self._redis.publish(self.PREFIX + channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.PREFIX + channel)
+        try:
+            async for msg in pubsub.listen():
+                if msg and msg.get("type") == "message":
+                    yield msg["data"]
+        finally:
+            await pubsub.unsubscribe(self.PREFIX + channel)
+            await pubsub.aclose()
+
+    async def acquire_lease(self, key: str, ttl_seconds: int) -> bool:
+        full = self.PREFIX + "lease:" + key
+        ttl_ms = ttl_seconds * 1000
+        if await self._redis.set(full, WORKER_ID, nx=True, px=ttl_ms):
+            return True
+        return bool(await self._redis.eval(_RENEW_LUA, 1, full, WORKER_ID, ttl_ms))
+
+    async def release_lease(self, key: str) -> None:
+        await self._redis.eval(_RELEASE_LUA, 1, self.PREFIX + "lease:" + key, WORKER_ID)
+
+    async def set_state(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self._redis.set(self.PREFIX + "state:" + key, value, ex=ttl_seconds)
+
+    async def get_state(self, key: str) -> Optional[str]:
+        return await self._redis.get(self.PREFIX + "state:" + key)
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+_backplane: Optional[Backplane] = None
+
+
+def get_backplane() -> Backplane:
+    """Redis when REDIS_URL is set and the client is installed, else in-process."""
+    global _backplane
+    if _backplane is None:
+        if settings.redis_url:
+            try:
+                _backplane = RedisBackplane(settings.redis_url)
+            except ImportError:
+                logger.warning("REDIS_URL set but redis package not installed — using in-process backplane")
+        if _backplane is None:
+            _backplane = InProcessBackplane()
+        logger.info("WS backplane: %s (worker=%s)", _backplane.name, WORKER_ID)
+    return _backplane
@@ -2,19 +2,47 @@
 WebSocket hub for live match updates.
 
 Architecture:
-- One APScheduler job per active match polls football-data.org every 60 s.
-- All connected clients for that match_id receive JSON broadcast messages.
-- On connect, client immediately receives the current match state so it
-  doesn't have to wait up to 60 seconds for the first update.
-- AI commentary job runs every 10 minutes per match.
-- Max 200 WebSocket connections per match to prevent resource exhaustion.
+- Every worker with clients for a match schedules a poll job, but only the
+  worker holding that match's poll lease on the backplane actually calls
+  football-data.org (every 60 s).  Upstream calls no longer scale with the
+  uvicorn worker count.
+- The lease holder publishes each message once to the match channel; every
+  worker subscribed to the channel fans it out to its own sockets.  If the
+  subscription drops, the relay resubscribes with backoff and resyncs its
+  clients with the full state.
+- State is versioned.  Each poll that changes anything bumps a sequence
+  number and publishes only the changed fields as a "delta"; a poll that
+  changes nothing publishes nothing.  Sequence numbers never go backwards:
+  if the shared copy is lost, numbering restarts ahead of any seq a client
+  can hold.
+- On connect, client immediately receives the current match state (read from
+  the backplane, so any worker can serve it) and doesn't wait up to 60 s.
+  The encoded state frame is cached per sequence number, so a reconnect
+  storm costs one json.dumps, not one per client.
+- A reconnecting client passes ?since=<seq>.  If this worker's recent delta
+  history covers the gap it gets one merged delta (or nothing, if already
+  current); otherwise it gets the full state.
+- AI commentary job runs every 10 minutes per match, under its own lease.
+- Max 200 WebSocket connections per match *per worker* to prevent resource
+  exhaustion; the cluster-wide ceiling is workers x 200.
+- Each frame is JSON-encoded once per tick and the same string is handed to
+  every socket.  Every client has its own bounded send queue drained by its
+  own writer task, so writes proceed concurrently and a slow client only
+  delays itself.  When a client's queue overflows, its queued deltas are
+  replaced by one full-state resync; a client that keeps falling behind is
+  disconnected.
 
 Message types sent to clients:
-  { "type": "state",        "data": { ...full match state... } }
-  { "type": "score_update", "data": { ...score + minute... } }
-  { "type": "goal",         "data": { scorer, team, minute, score } }
-  { "type": "stats_update", "data": { momentum, minute } }
-  { "type": "commentary",   "data": { minute, content } }
+  { "type": "state",      "seq": n, "data": { ...full match state... } }
+  { "type": "delta",      "seq": n, "data": { ...changed fields only... } }
+  { "type": "goal",       "data": { scorer, team, minute, score } }
+  { "type": "commentary", "data": { minute, content } }
+  { "type": "batch",      "data": [ ...messages above, in order... ] }
+
+A "delta" at seq n applies on top of state n-1.  Clients should apply any
+"state" and ignore deltas whose seq is not newer than what they hold.  A tick
+that produces several messages (goal + delta) sends them as one "batch"
+frame.
 """
 from __future__ import annotations
 
@@ -22,14 +50,17 @@ import asyncio
 import json
 import logging
 import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.core.rate_governor import LIVE, upstream_priority
 from app.services import football_data as fd
 from app.services import ai_commentary as ai_c
+from app.websocket.backplane import get_backplane
 
 logger = logging.getLogger("fanxi.websocket")
 
@@ -39,124 +70,372 @@ scheduler = AsyncIOScheduler(timezone="UTC")
 # Dedicated thread pool for CPU-bound work (AI commentary, sync DB calls)
 _executor = ThreadPoolExecutor(max_workers=16)
 
-# match_id -> list of active WebSocket connections
-_connections: Dict[int, List[WebSocket]] = {}
+# match_id -> {socket: client} for active connections (this worker only)
+_connections: Dict[int, Dict[WebSocket, "_Client"]] = {}
 
-# match_id -> last known full state dict
+# match_id -> last known full state dict (local copy of the backplane state)
 _match_state: Dict[int, dict] = {}
 
-# Max WebSocket connections per match
+# match_id -> sequence number of _match_state
+_match_seq: Dict[int, int] = {}
+
+# match_id -> recent (seq, changed fields), oldest first, for ?since= resume
+_history: Dict[int, Deque[Tuple[int, dict]]] = {}
+
+# match_id -> (seq, encoded "state" frame) shared by every connect at that seq
+_state_frames: Dict[int, Tuple[int, str]] = {}
+
+# match_id -> task relaying backplane messages to this worker's sockets
+_listeners: Dict[int, asyncio.Task] = {}
+
+# Max WebSocket connections per match, per worker
 MAX_CONNECTIONS_PER_MATCH = 200
 
+# Lease TTLs — a little longer than the job interval so the holder renews
+# before expiry, short enough that a dead worker hands over within one tick.
+POLL_LEASE_TTL = 90
+COMMENTARY_LEASE_TTL = 660
+STATE_TTL = 3 * 3600
+
+# Deltas kept for resume — about half an hour of one-a-minute ticks
+HISTORY_SIZE = 30
+
+# Per-client send queue.  A live match produces about one frame a minute, so
+# a full queue means the client has stopped reading, not a burst.
+SEND_QUEUE_SIZE = 8
+SEND_TIMEOUT = 10.0
+# Queue overflows (each one a resync) without the client draining one in
+# between before a slow client is disconnected
+SLOW_CLIENT_MAX_DROPS = 4
+
+# Relay resubscribe backoff after a backplane error, doubling up to the max
+RELAY_RETRY_INITIAL = 1.0
+RELAY_RETRY_MAX = 30.0
+
+# Queued in place of dropped frames: "send the current full state instead"
+_RESYNC = object()
+
+# Hub counters for this worker, exposed via stats()
+_stats: Dict[str, int] = {
+    "frames_encoded": 0,
+    "frames_sent": 0,
+    "frames_coalesced": 0,
+    "slow_clients_dropped": 0,
+    "relay_reconnects": 0,
+}
+
+
+def _channel(match_id: int) -> str:
+    return f"match:{match_id}"
+
+
+def _state_key(match_id: int) -> str:
+    return f"match:{match_id}:state"
+
 
 # ---------------------------------------------------------------------------
 # Connection manager
 # ---------------------------------------------------------------------------
 
-async def _broadcast(match_id: int, message: dict) -> None:
-    payload = json.dumps(message)
-    dead: List[WebSocket] = []
-    for ws in list(_connections.get(match_id, [])):
+class _Client:
+    """One socket plus its bounded send queue and writer task."""
+
+    __slots__ = ("ws", "match_id", "queue", "writer", "dropped")
+
+    def __init__(self, ws: WebSocket, match_id: int) -> None:
+        self.ws = ws
+        self.match_id = match_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.writer = asyncio.create_task(self._write_loop())
+
+    def offer(self, frame: str) -> None:
+        """Queue a frame without waiting; coalesce or drop if the client lags."""
+        if self.queue.full():
+            # Deltas can't be skipped individually, so collapse the whole
+            # backlog into one full-state resync sent when the client catches up.
+            self.dropped += 1
+            _stats["frames_coalesced"] += self.queue.qsize()
+            if self.dropped > SLOW_CLIENT_MAX_DROPS:
+                logger.warning("WS_SLOW_CLIENT match_id=%d dropped=%d", self.match_id, self.dropped)
+                _stats["slow_clients_dropped"] += 1
+                self.close()
+                return
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+        self.queue.put_nowait(frame)
+
+    async def _write_loop(self) -> None:
         try:
-            await ws.send_text(payload)
+            while True:
+                frame = await self.queue.get()
+                resync = frame is _RESYNC
+                if resync:
+                    # The local copy may have been dropped after a missed
+                    # tick; re-read the backplane copy rather than skip
+                    # the resync and leave the client out of step.
+                    frame = _state_frame(self.match_id)
+                    if frame is None and await _current_state(self.match_id, fetch=False) is not None:
+                        frame = _state_frame(self.match_id)
+                    if frame is None:
+                        continue
+                await asyncio.wait_for(self.ws.send_text(frame), SEND_TIMEOUT)
+                _stats["frames_sent"] += 1
+                if resync:
+                    # Caught up: only back-to-back overflows count towards
+                    # the disconnect, not lags it has since recovered from.
+                    self.dropped = 0
+        except asyncio.CancelledError:
+            raise
         except Exception:
-            dead.append(ws)
-    for ws in dead:
-        _disconnect(match_id, ws)
+            # Send failed or timed out — the socket is gone or stuck
+            self.close()
 
+    def close(self) -> None:
+        _disconnect(self.match_id, self.ws)
+        asyncio.create_task(_close_quietly(self.ws))
 
-def _disconnect(match_id: int, ws: WebSocket) -> None:
-    clients = _connections.get(match_id, [])
+
+async def _close_quietly(ws: WebSocket) -> None:
     try:
-        clients.remove(ws)
-    except ValueError:
+        await ws.close(code=1013, reason="Client too slow")
+    except Exception:
         pass
 
 
-# ---------------------------------------------------------------------------
-# State builder (now async)
-# ---------------------------------------------------------------------------
+def _encode(messages: List[dict]) -> str:
+    """One JSON string for a tick: the message itself, or a batch of them."""
+    _stats["frames_encoded"] += 1
+    if len(messages) == 1:
+        return json.dumps(messages[0])
+    return json.dumps({"type": "batch", "data": messages})
 
-async def _build_full_state(match_id: int) -> Optional[dict]:
-    raw = await fd.get_match(match_id)
-    if not raw:
+
+def _broadcast_local(match_id: int, frame: str) -> None:
+    """Hand an already-encoded frame to every local client's send queue."""
+    for client in list(_connections.get(match_id, {}).values()):
+        client.offer(frame)
+
+
+async def _broadcast(match_id: int, *messages: dict) -> None:
+    """Publish one frame for this tick to every worker's clients via the backplane."""
+    await get_backplane().publish(_channel(match_id), _encode(list(messages)))
+
+
+def _seed_seq(match_id: int) -> int:
+    """
+    Starting seq when the backplane has no state for a match (first viewer,
+    or the shared copy expired).  Seqs advance at most once per poll, so
+    the wall clock in seconds is ahead of any seq handed out before.
+    """
+    return max(_match_seq.get(match_id, 0), int(time.time()))
+
+
+def _diff(prev: dict, new: dict) -> dict:
+    """Fields of `new` that differ from `prev`; fields that vanished map to None."""
+    changed = {k: v for k, v in new.items() if prev.get(k) != v}
+    changed.update({k: None for k in prev.keys() - new.keys()})
+    return changed
+
+
+def _state_frame(match_id: int) -> Optional[str]:
+    """Encoded full-state frame for the current seq — encoded once, then shared."""
+    state = _match_state.get(match_id)
+    if state is None:
         return None
+    seq = _match_seq.get(match_id, 0)
+    cached = _state_frames.get(match_id)
+    if cached and cached[0] == seq:
+        return cached[1]
+    frame = _encode([{"type": "state", "seq": seq, "data": state}])
+    _state_frames[match_id] = (seq, frame)
+    return frame
+
+
+def _catch_up(match_id: int, since: int) -> Optional[dict]:
+    """
+    Merged changes taking a client from `since` to the current seq.
+
+    {} if the client is already current; None if local history doesn't reach
+    back that far (the client then needs the full state).
+    """
+    current = _match_seq.get(match_id)
+    if current is None or since > current:
+        return None
+    if since == current:
+        return {}
+    needed = [(seq, changes) for seq, changes in _history.get(match_id, ()) if seq > since]
+    if not needed or needed[0][0] != since + 1 or needed[-1][0] != current:
+        return None
+    merged: dict = {}
+    for _, changes in needed:
+        merged.update(changes)
+    return merged
+
+
+def _remember_state(match_id: int, frame: str) -> None:
+    """Keep the local state copy and delta history current from relayed frames."""
+    message = json.loads(frame)
+    batch = message["data"] if message.get("type") == "batch" else [message]
+    for m in batch:
+        kind, seq = m.get("type"), m.get("seq")
+        if kind == "state":
+            _match_state[match_id] = m["data"]
+            _match_seq[match_id] = seq
+        elif kind == "delta":
+            history = _history.setdefault(match_id, deque(maxlen=HISTORY_SIZE))
+            if history and history[-1][0] != seq - 1:
+                history.clear()
+            history.append((seq, m["data"]))
+
+            local_seq = _match_seq.get(match_id)
+            if local_seq is not None and seq <= local_seq:
+                continue
+            if local_seq == seq - 1 and match_id in _match_state:
+                _match_state[match_id] = {**_match_state[match_id], **m["data"]}
+                _match_seq[match_id] = seq
+            else:
+                # Missed a tick — re-read the backplane copy on next use
+                _match_state.pop(match_id, None)
+                _match_seq.pop(match_id, None)
+
+
+async def _relay(match_id: int) -> None:
+    """
+    Forward backplane frames for one match to local sockets until cancelled.
+
+    If the subscription fails (e.g. Redis dropped the connection) or ends,
+    resubscribe with exponential backoff.  Frames published in the gap are
+    lost, so the local copy is dropped and every client is resynced with
+    the full state from the backplane before relaying resumes.
+    """
+    delay = RELAY_RETRY_INITIAL
+    resync = False
+    while True:
+        try:
+            if resync and await _current_state(match_id) is not None:
+                _broadcast_local(match_id, _state_frame(match_id))
+            async for frame in get_backplane().subscribe(_channel(match_id)):
+                delay = RELAY_RETRY_INITIAL
+                _remember_state(match_id, frame)
+                _broadcast_local(match_id, frame)
+            raise ConnectionError("subscription ended")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("WS_RELAY_ERROR match_id=%d error=%s retry_in=%.0fs", match_id, exc, delay)
+        _stats["relay_reconnects"] += 1
+        for local in (_match_state, _match_seq, _state_frames):
+            local.pop(match_id, None)
+        resync = True
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RELAY_RETRY_MAX)
+
+
+def _disconnect(match_id: int, ws: WebSocket) -> None:
+    client = _connections.get(match_id, {}).pop(ws, None)
+    if client and client.writer is not asyncio.current_task():
+        client.writer.cancel()
 
-    score = raw.get("score", {})
-    ft = score.get("fullTime", {})
-    ht = score.get("halfTime", {})
-    momentum = await fd.compute_momentum(match_id)
 
+def stats() -> dict:
+    """Connection and frame counters for this worker."""
     return {
-        "match_id": match_id,
-        "status": raw.get("status"),
-        "minute": raw.get("minute"),
-        "home_team": raw.get("homeTeam", {}).get("name"),
-        "away_team": raw.get("awayTeam", {}).get("name"),
-        "home_flag": fd._flag(raw.get("homeTeam", {}).get("name", "")),
-        "away_flag": fd._flag(raw.get("awayTeam", {}).get("name", "")),
-        "home_goals": ft.get("home"),
-        "away_goals": ft.get("away"),
-        "ht_home": ht.get("home"),
-        "ht_away": ht.get("away"),
-        "venue": raw.get("venue"),
-        "momentum": momentum,
+        "matches": len(_connections),
+        "connections": sum(len(c) for c in _connections.values()),
+        **_stats,
     }
 
 
+# ---------------------------------------------------------------------------
+# State builder
+# ---------------------------------------------------------------------------
+
+async def _build_full_state(match_id: int) -> Optional[dict]:
+    snap = await fd.get_match_snapshot(match_id)
+    return dict(snap.live_state) if snap else None
+
+
+async def _current_state(match_id: int, fetch: bool = True) -> Optional[dict]:
+    """
+    Last known state: local copy, then the shared backplane copy, and only
+    if neither exists an upstream fetch (which is then shared for others).
+    fetch=False stops at the backplane — for callers that must not wait on
+    football-data.org, such as a client's writer.
+    """
+    if match_id in _match_state:
+        return _match_state[match_id]
+    backplane = get_backplane()
+    cached = await backplane.get_state(_state_key(match_id))
+    if cached:
+        envelope = json.loads(cached)
+    elif not fetch:
+        return None
+    else:
+        state = await _build_full_state(match_id)
+        if not state:
+            return None
+        envelope = {"seq": _seed_seq(match_id), "data": state}
+        await backplane.set_state(_state_key(match_id), json.dumps(envelope), STATE_TTL)
+    _match_state[match_id] = envelope["data"]
+    _match_seq[match_id] = envelope["seq"]
+    return envelope["data"]
+
+
 # ---------------------------------------------------------------------------
 # Scheduler jobs
 # ---------------------------------------------------------------------------
 
 async def _poll_match(match_id: int) -> None:
-    """Poll match state and broadcast diffs to connected clients."""
-    state = await _build_full_state(match_id)
-    if not state:
+    """Poll match state and broadcast diffs — only on the lease-holding worker."""
+    backplane = get_backplane()
+    if not await backplane.acquire_lease(f"poll:{match_id}", POLL_LEASE_TTL):
+        return  # another worker is polling this match
+
+    with upstream_priority(LIVE):
+        # fresh: never broadcast the previous poll's payload (see fd._get)
+        snap = await fd.get_match_snapshot(match_id, fresh=True)
+    if not snap:
         return
+    state = dict(snap.live_state)
 
-    prev = _match_state.get(match_id, {})
-    prev_home = prev.get("home_goals")
-    prev_away = prev.get("away_goals")
-    new_home = state.get("home_goals")
-    new_away = state.get("away_goals")
-
-    _match_state[match_id] = state
+    prev_raw = await backplane.get_state(_state_key(match_id))
+    prev = json.loads(prev_raw) if prev_raw else {"seq": _seed_seq(match_id), "data": {}}
+    changes = _diff(prev["data"], state)
+    seq = prev["seq"] + 1 if changes else prev["seq"]
 
-    if not _connections.get(match_id):
-        return  # no clients -- skip broadcast
+    # Written even when unchanged so the shared copy's TTL keeps rolling.
+    # The local copy is updated by _relay when our own frame comes back.
+    await backplane.set_state(
+        _state_key(match_id), json.dumps({"seq": seq, "data": state}), STATE_TTL
+    )
+    if not changes:
+        return  # nothing moved this tick — nothing to send
 
-    if prev_home != new_home or prev_away != new_away:
-        # Score changed -- find the latest goal event
-        events = await fd.get_match_events(match_id)
-        goals = [e for e in events if e["type"] == "goal"]
+    messages: List[dict] = []
+    if prev["data"] and ("home_goals" in changes or "away_goals" in changes):
+        # Score changed -- latest goal event from the same snapshot
+        goals = [e for e in snap.events if e["type"] == "goal"]
         last_goal = goals[-1] if goals else None
-
-        await _broadcast(match_id, {
+        messages.append({
             "type": "goal",
             "data": {
                 "scorer": last_goal.get("scorer") if last_goal else None,
                 "team": last_goal.get("team") if last_goal else None,
                 "minute": last_goal.get("minute") if last_goal else state.get("minute"),
-                "home_goals": new_home,
-                "away_goals": new_away,
-            },
-        })
-        # Also send full state after goal
-        await _broadcast(match_id, {"type": "state", "data": state})
-    else:
-        await _broadcast(match_id, {
-            "type": "stats_update",
-            "data": {
-                "minute": state.get("minute"),
-                "momentum": state.get("momentum"),
-                "home_goals": new_home,
-                "away_goals": new_away,
+                "home_goals": state.get("home_goals"),
+                "away_goals": state.get("away_goals"),
             },
         })
+    messages.append({"type": "delta", "seq": seq, "data": changes})
+    await _broadcast(match_id, *messages)
 
 
 async def _commentary_job(match_id: int) -> None:
-    """Generate AI commentary and broadcast to clients."""
+    """Generate AI commentary and broadcast to clients — lease holder only."""
+    if not await get_backplane().acquire_lease(f"commentary:{match_id}", COMMENTARY_LEASE_TTL):
+        return
     start = time.perf_counter()
     loop = asyncio.get_event_loop()
     text = await loop.run_in_executor(
@@ -164,9 +443,9 @@ async def _commentary_job(match_id: int) -> None:
     )
     duration_ms = (time.perf_counter() - start) * 1000
     logger.info("AI_COMMENTARY match_id=%d duration_ms=%.0f success=%s", match_id, duration_ms, bool(text))
-    if text and _connections.get(match_id):
-        raw = await fd.get_match(match_id)
-        minute = raw.get("minute") if raw else None
+    if text:
+        snap = await fd.get_match_snapshot(match_id)
+        minute = snap.minute if snap else None
         await _broadcast(match_id, {
             "type": "commentary",
             "data": {"minute": minute, "content": text},
@@ -174,10 +453,14 @@ async def _commentary_job(match_id: int) -> None:
 
 
 def _ensure_jobs(match_id: int) -> None:
-    """Start polling + commentary scheduler jobs for this match if not running."""
+    """Start relay + polling + commentary jobs for this match if not running."""
     poll_id = f"poll_{match_id}"
     commentary_id = f"commentary_{match_id}"
 
+    listener = _listeners.get(match_id)
+    if listener is None or listener.done():
+        _listeners[match_id] = asyncio.create_task(_relay(match_id))
+
     if not scheduler.get_job(poll_id):
         scheduler.add_job(
             _poll_match,
@@ -199,14 +482,24 @@ def _ensure_jobs(match_id: int) -> None:
         )
 
 
-def _maybe_remove_jobs(match_id: int) -> None:
-    """Remove scheduler jobs when no clients remain for this match."""
+async def _maybe_remove_jobs(match_id: int) -> None:
+    """Remove jobs, relay and leases when no clients remain on this worker."""
     if _connections.get(match_id):
         return  # still have clients
+    _connections.pop(match_id, None)
     for job_id in [f"poll_{match_id}", f"commentary_{match_id}"]:
         job = scheduler.get_job(job_id)
         if job:
             scheduler.remove_job(job_id)
+    listener = _listeners.pop(match_id, None)
+    if listener:
+        listener.cancel()
+    for local in (_match_state, _match_seq, _history, _state_frames):
+        local.pop(match_id, None)
+    # Hand the match over immediately rather than after the lease TTL
+    backplane = get_backplane()
+    await backplane.release_lease(f"poll:{match_id}")
+    await backplane.release_lease(f"commentary:{match_id}")
 
 
 # ---------------------------------------------------------------------------
@@ -214,34 +507,38 @@ def _maybe_remove_jobs(match_id: int) -> None:
 # ---------------------------------------------------------------------------
 
 @router.websocket("/ws/match/{match_id}")
-async def match_websocket(ws: WebSocket, match_id: int) -> None:
-    # Reject if too many connections for this match
-    current = _connections.get(match_id, [])
+async def match_websocket(ws: WebSocket, match_id: int, since: Optional[int] = None) -> None:
+    # Reject if too many connections for this match on this worker
+    current = _connections.get(match_id, {})
     if len(current) >= MAX_CONNECTIONS_PER_MATCH:
         logger.warning("WS_CAP_HIT match_id=%d connections=%d", match_id, len(current))
         await ws.close(code=1013, reason="Too many connections for this match")
         return
 
     await ws.accept()
-    _connections.setdefault(match_id, []).append(ws)
+    client = _Client(ws, match_id)
+    _connections.setdefault(match_id, {})[ws] = client
     logger.info("WS_CONNECT match_id=%d connections=%d", match_id, len(_connections[match_id]))
 
-    # Send current state immediately so client doesn't wait 60 s
-    if match_id in _match_state:
-        await ws.send_text(json.dumps({"type": "state", "data": _match_state[match_id]}))
-    else:
-        state = await _build_full_state(match_id)
-        if state:
-            _match_state[match_id] = state
-            await ws.send_text(json.dumps({"type": "state", "data": state}))
-
-    # Send last commentary entries
-    loop = asyncio.get_event_loop()
-    recent = await loop.run_in_executor(
-        _executor, ai_c.get_recent_commentary, match_id, 3
-    )
-    for entry in recent:
-        await ws.send_text(json.dumps({"type": "commentary", "data": entry}))
+    # Bring the client up to date without waiting 60 s: a resuming client
+    # gets only what it missed, a new one the shared full-state frame.
+    if await _current_state(match_id) is not None:
+        changes = _catch_up(match_id, since) if since is not None else None
+        if changes is None:
+            client.offer(_state_frame(match_id))
+        elif changes:
+            client.offer(_encode([
+                {"type": "delta", "seq": _match_seq[match_id], "data": changes},
+            ]))
+
+    # A resuming client already has the recent commentary
+    if since is None:
+        loop = asyncio.get_event_loop()
+        recent = await loop.run_in_executor(
+            _executor, ai_c.get_recent_commentary, match_id, 3
+        )
+        if recent:
+            client.offer(_encode([{"type": "commentary", "data": entry} for entry in recent]))
 
     _ensure_jobs(match_id)
 
@@ -249,8 +546,11 @@ async def match_websocket(ws: WebSocket, match_id: int) -> None:
         while True:
             # Keep connection alive; client can send "ping" text
             await ws.receive_text()
-    except WebSocketDisconnect:
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the writer closed a slow socket underneath us
+        pass
+    finally:
         _disconnect(match_id, ws)
-        remaining = len(_connections.get(match_id, []))
+        remaining = len(_connections.get(match_id, {}))
         logger.info("WS_DISCONNECT match_id=%d connections=%d", match_id, remaining)
-        _maybe_remove_jobs(match_id)
+        await _maybe_remove_jobs(match_id)
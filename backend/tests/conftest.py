@@ -27,12 +27,15 @@ def session_fixture():
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
+def client_fixture(session: Session, monkeypatch):
     """TestClient that uses the in-memory session and disables rate limiting."""
     def get_session_override():
         yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    # Background writers open their own sessions — point them at the same DB
+    from app.services import prediction_ingest
+    monkeypatch.setattr(prediction_ingest, "engine", session.get_bind())
 
     # Disable rate limiting in tests — slowapi uses app.state.limiter
     from app.limiter import limiter
@@ -0,0 +1,201 @@
+"""
+Share card tests — compositor output, format negotiation, the
+content-addressed card cache, the render pool and the ETag round trip on
+/cards.
+"""
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PIL import Image
+from sqlmodel import select
+
+from app.config import settings
+from app.services import card_generator as cards
+from app.services import card_renderer
+from app.services.card_cache import CardCache
+
+MATCH = {"home_team": "France", "away_team": "Brazil", "group": "Group C",
+         "kickoff": "2026-06-14T18:00:00Z", "venue": "MetLife Stadium"}
+PREDICTION = {"team_name": "France", "tactics_data": {"formation": "4-3-3"}, "match_result": "home"}
+
+
+@pytest.fixture
+def card_cache(tmp_path, monkeypatch):
+    cache = CardCache(str(tmp_path / "cards"), memory_bytes=1 << 20, disk_bytes=1 << 20)
+    monkeypatch.setattr(card_renderer, "card_cache", cache)
+    monkeypatch.setattr(settings, "card_render_workers", 0)
+    return cache
+
+
+def _inputs(**overrides):
+    return cards.prediction_card_inputs(PREDICTION, MATCH, "zizou", "Elite Scout", overrides.get("iq", 420))
+
+
+def test_prediction_card_renders_from_cached_layers():
+    img = Image.open(io.BytesIO(cards.render_prediction_card(_inputs())))
+    assert img.format == "PNG" and img.size == (cards.W, cards.H)
+
+    template = cards._prediction_template()
+    snapshot = template.tobytes()
+    bands = cards._team_bands("France", "Brazil")
+    cards.render_prediction_card(_inputs(iq=10))
+    # Static layers are built once per process and never drawn on
+    assert cards._prediction_template() is template
+    assert cards._team_bands("France", "Brazil") is bands
+    assert cards._font(28, True) is cards._font(28, True)
+    assert template.tobytes() == snapshot
+
+
+def test_profile_card_renders():
+    profile = {"display_name": "Zizou", "rank_title": "Elite Scout", "football_iq_points": 12345,
+               "prediction_count": 42, "favorite_nation": "France", "preferred_formation": "4-3-3"}
+    img = Image.open(io.BytesIO(cards.render_profile_card(cards.profile_card_inputs("zizou", profile))))
+    assert img.size == (cards.W, cards.H)
+
+
+def test_format_negotiation():
+    chrome = "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8"
+    assert cards.negotiate_format(chrome) == "webp"
+    assert cards.negotiate_format("image/avif,image/png") == "avif"
+    assert cards.negotiate_format("image/webp;q=0, image/png") == "png"
+    assert cards.negotiate_format("*/*") == "png"
+    assert cards.negotiate_format(None) == "png"
+
+    png = cards.render_prediction_card(_inputs())
+    webp = cards.render_prediction_card(_inputs(), "webp")
+    assert Image.open(io.BytesIO(webp)).format == "WEBP"
+    assert len(webp) < len(png) / 2
+    # Lossless: same pixels as the PNG
+    assert Image.open(io.BytesIO(webp)).convert("RGB").tobytes() == \
+        Image.open(io.BytesIO(png)).convert("RGB").tobytes()
+    assert cards.card_key("prediction", _inputs(), "webp") != cards.card_key("prediction", _inputs())
+
+
+def test_card_key_follows_what_is_drawn():
+    key = cards.card_key("prediction", _inputs())
+    assert cards.card_key("prediction", _inputs()) == key
+    assert cards.card_key("prediction", _inputs(iq=421)) != key
+    # The lineup isn't drawn on the card, so it doesn't change the key
+    with_lineup = cards.prediction_card_inputs({**PREDICTION, "lineup_data": {"GK": "x"}}, MATCH,
+                                               "zizou", "Elite Scout", 420)
+    assert cards.card_key("prediction", with_lineup) == key
+
+
+def test_card_rendered_once_then_served_from_memory_and_disk(card_cache, monkeypatch):
+    renders = []
+    real = cards._RENDERERS["prediction"]
+    monkeypatch.setitem(cards._RENDERERS, "prediction", lambda i, fmt: renders.append(1) or real(i, fmt))
+
+    data = card_renderer.get_card("prediction", _inputs())
+    assert card_renderer.get_card("prediction", _inputs()) == data
+    assert len(renders) == 1 and card_cache.stats()["memory_hits"] == 1
+
+    # Another worker on the same host: empty memory, shared disk
+    other = CardCache(card_cache.directory, memory_bytes=1 << 20, disk_bytes=1 << 20)
+    monkeypatch.setattr(card_renderer, "card_cache", other)
+    assert card_renderer.get_card("prediction", _inputs()) == data
+    assert len(renders) == 1 and other.stats()["disk_hits"] == 1
+
+
+def test_pool_coalesces_and_sheds(card_cache, monkeypatch):
+    monkeypatch.setattr(settings, "card_render_workers", 1)
+    monkeypatch.setattr(settings, "card_render_queue", 1)
+    before = card_renderer.stats()
+    try:
+        with ThreadPoolExecutor(4) as threads:
+            results = list(threads.map(lambda _: card_renderer.get_card("prediction", _inputs()), range(4)))
+        assert len(set(results)) == 1
+        # Waiters wake as soon as the result is set; bookkeeping follows in the done callback
+        for _ in range(100):
+            if card_renderer.stats()["in_flight"] == 0:
+                break
+            time.sleep(0.01)
+        after = card_renderer.stats()
+        assert after["renders"] - before["renders"] == 1
+        assert after["coalesced"] - before["coalesced"] + card_cache.stats()["memory_hits"] == 3
+
+        # Queue full: a second distinct card is shed instead of queueing
+        card_renderer._submit("prediction", _inputs(iq=1), "png", "k1")
+        with pytest.raises(card_renderer.RenderBusy):
+            card_renderer.get_card("prediction", _inputs(iq=2))
+    finally:
+        card_renderer.shutdown()
+
+
+def test_tiers_evict_least_recently_used(tmp_path):
+    cache = CardCache(str(tmp_path), memory_bytes=250, disk_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.put(key, b"x" * 100)
+        os.utime(cache._path(key), (0, {"a": 1, "b": 2, "c": 3}[key]))
+    assert list(cache._memory) == ["b", "c"]
+    cache.put("d", b"x" * 100)
+    # Disk trimmed to its low-water mark, oldest files first
+    assert sorted(f for f in os.listdir(tmp_path) if f.endswith(".card")) == ["c.card", "d.card"]
+    assert cache.stats()["disk_evictions"] == 2
+
+
+def test_profile_card_etag_round_trip(client, registered_user, card_cache):
+    username = registered_user[0]
+    res = client.get(f"/cards/profile/{username}")
+    assert res.status_code == 200 and res.headers["content-type"] == "image/png"
+    etag = res.headers["etag"]
+
+    # Unchanged card: 304 without touching the cache
+    hits = card_cache.stats()
+    res = client.get(f"/cards/profile/{username}", headers={"If-None-Match": etag})
+    assert res.status_code == 304 and res.content == b""
+    assert card_cache.stats() == hits
+
+    # ?bust no longer forces a render when nothing changed
+    res = client.get(f"/cards/profile/{username}", params={"bust": True})
+    assert res.headers["etag"] == etag and card_cache.stats()["stores"] == 1
+
+    # Browsers get WebP, with its own ETag
+    res = client.get(f"/cards/profile/{username}", headers={"Accept": "image/webp,*/*"})
+    assert res.headers["content-type"] == "image/webp" and res.headers["etag"] != etag
+    assert "Accept" in res.headers["vary"]
+
+
+def test_prerender_after_scoring_fills_cache(session, card_cache, monkeypatch):
+    from app.services.card_inputs import prediction_card_inputs_for, profile_card_inputs_for
+    from app.models import MatchPrediction, User
+    from app.schemas import MatchResultInput
+    from app.services import card_prerender
+    from app.services.scoring_engine import get_progress, score_match_bulk
+
+    monkeypatch.setattr(card_prerender, "engine", session.get_bind())
+    users = [User(username=f"pre{i}", email=f"pre{i}@fanxi-test.com", hashed_password="x",
+                  country_allegiance="Brazil", football_iq_points=points, rank_title=title)
+             for i, (points, title) in enumerate([(98, "Scout"), (110, "Analyst"), (130, "Analyst")])]
+    session.add_all(users)
+    session.commit()
+    for u in users:
+        session.add(MatchPrediction(user_id=u.id, match_id=3001, team_name="Brazil",
+                                    match_result="home", tactics_data={"formation": "4-3-3"}))
+    session.commit()
+
+    progress = score_match_bulk(session, 3001, MatchResultInput(
+        home_goals=1, away_goals=0, ht_home_goals=0, ht_away_goals=0))
+    # +3 points: only the user on 98 crosses into Analyst
+    assert progress.ranks_changed == 1
+    report = card_prerender.prerender_match(3001, workers=1)
+    # Everyone's points moved, so every predictor's profile card is new too
+    assert (report.state, report.prediction_cards, report.profile_cards, report.rendered) == \
+        ("finished", 3, 3, 6)
+    assert report.cards_per_sec and report.duration_ms > 0
+    assert get_progress(session, 3001)["card_prerender"]["rendered"] == 6
+
+    # The cards the endpoints will ask for are exactly the ones rendered
+    prediction = session.exec(select(MatchPrediction).where(MatchPrediction.user_id == users[1].id)).one()
+    session.refresh(users[1])
+    assert card_cache.contains(cards.card_key("prediction", prediction_card_inputs_for(3001, prediction, users[1])))
+    for u in users:
+        session.refresh(u)
+        assert card_cache.contains(cards.card_key("profile", profile_card_inputs_for(u, 1)))
+
+    # A second pass finds everything cached
+    again = card_prerender.prerender_match(3001, workers=1)
+    assert (again.rendered, again.already_cached) == (0, 6)
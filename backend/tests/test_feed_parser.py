@@ -0,0 +1,60 @@
+"""
+Incremental feed parser tests — RSS and Atom, chunked input, early stop.
+"""
+from app.services.feed_parser import FeedParser, parse_feed
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">
+  <title>Atom test</title>
+  <entry>
+    <title>Japan stun Germany again</title>
+    <link rel="alternate" href="https://example.com/japan"/>
+    <summary type="html">&lt;b&gt;Mitoma&lt;/b&gt; decides it late.</summary>
+    <updated>2026-06-14T18:30:00Z</updated>
+    <media:thumbnail url="https://example.com/japan.jpg"/>
+  </entry>
+</feed>"""
+
+
+def _rss(n):
+    items = "".join(
+        f"<item><title>Story {i}</title><link>https://example.com/{i}</link>"
+        f"<description>Body {i}</description>"
+        f"<pubDate>Mon, 01 Jun 2026 10:{i % 60:02d}:00 +0000</pubDate></item>"
+        for i in range(n)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>{items}</channel></rss>'.encode()
+
+
+def test_atom_entries_are_parsed():
+    [article] = parse_feed(ATOM_FEED, "Atom", max_items=10)
+    assert article == {
+        "title": "Japan stun Germany again",
+        "url": "https://example.com/japan",
+        "published": "2026-06-14T18:30:00+00:00",
+        "source": "Atom",
+        "trail": "Mitoma decides it late.",
+        "thumbnail": "https://example.com/japan.jpg",
+    }
+
+
+def test_chunked_input_stops_once_enough_items_match():
+    data = _rss(500)
+    parser = FeedParser("RSS", max_items=3, accept=lambda a: a["title"].endswith("7"))
+    consumed = 0
+    for start in range(0, len(data), 256):
+        consumed += 256
+        if parser.feed(data[start:start + 256]):
+            break
+    articles = parser.close()
+    assert [a["title"] for a in articles] == ["Story 7", "Story 17", "Story 27"]
+    assert consumed < len(data) // 5  # stopped long before the end of the feed
+    # Finished items are dropped from the tree as they are consumed
+    channel = parser._stack[-1]
+    assert len(channel.findall("item")) <= 1
+
+
+def test_truncated_feed_keeps_items_already_parsed():
+    data = _rss(5)
+    articles = parse_feed(data[: data.index(b"<item><title>Story 3")], "RSS", max_items=10)
+    assert [a["title"] for a in articles] == ["Story 0", "Story 1", "Story 2"]
@@ -0,0 +1,103 @@
+"""
+Tests for football-data match snapshots and the upstream response cache.
+
+Payloads are seeded straight into the module cache; no network.
+"""
+import asyncio
+
+from app.services import football_data as fd
+
+RAW = {
+    "id": 5,
+    "status": "IN_PLAY",
+    "minute": 63,
+    "homeTeam": {"name": "Argentina"},
+    "awayTeam": {"name": "France"},
+    "score": {"fullTime": {"home": 2, "away": 1}, "halfTime": {"home": 1, "away": 0}},
+    "goals": [
+        {"minute": 55, "team": {"name": "France"}, "scorer": {"name": "Mbappe"}},
+        {"minute": 12, "team": {"name": "Argentina"}, "scorer": {"name": "Messi"}},
+    ],
+    "bookings": [
+        {"minute": 30, "card": "YELLOW_CARD", "team": {"name": "France"},
+         "playerReceivingCard": {"name": "Tchouameni"}},
+    ],
+    "lineups": [{"team": {"name": "France"}, "formation": "4-2-3-1", "startXI": [], "substitutes": []}],
+}
+
+
+def _seed(raw):
+    fd._cache.set(f"/matches/{raw['id']}:None", raw, ttl=60)
+
+
+def test_snapshot_is_built_once_per_payload():
+    _seed(RAW)
+    try:
+        snap = fd.get_match_snapshot_sync(5)
+        assert [e["minute"] for e in snap.events] == [12, 30, 55]
+        assert snap.lineups["away"]["formation"] == "4-2-3-1"
+        assert snap.lineups["home"] is None
+        assert snap.momentum == {"home_pct": 67, "away_pct": 33}
+        assert snap.live_state["home_goals"] == 2
+        assert snap.live_state["home_flag"] == fd._flag("Argentina")
+
+        # Sync and async helpers share the same parsed views
+        assert fd.get_match_snapshot_sync(5) is snap
+        assert asyncio.run(fd.get_match_snapshot(5)) is snap
+        assert fd.get_match_events_sync(5) is snap.events
+        assert asyncio.run(fd.compute_momentum(5)) is snap.momentum
+
+        # A new upstream payload produces a new snapshot
+        _seed({**RAW, "minute": 64})
+        assert fd.get_match_snapshot_sync(5) is not snap
+        assert fd.get_match_snapshot_sync(5).minute == 64
+    finally:
+        fd._cache.invalidate("/matches/5:None")
+        fd._snapshots.pop(5, None)
+
+
+def test_cache_serves_stale_evicts_lru_and_caches_failures():
+    from app.core.cache import FRESH, MISS, NEGATIVE, STALE, TTLCache
+
+    cache = TTLCache(max_size=2, stale_grace=60)
+    cache.set("a", 1, ttl=0)
+    assert cache.lookup("a") == (STALE, 1)  # expired but inside the grace window
+
+    cache.set("b", 2, ttl=60)
+    cache.lookup("a")                       # touch a -> b becomes LRU
+    cache.set("c", 3, ttl=60)
+    assert cache.lookup("b") == (MISS, None)
+    assert cache.stats()["evictions"] == 1
+
+    cache.set_negative("d", 404, ttl=60)
+    assert cache.lookup("d") == (NEGATIVE, 404)
+
+    # "Retry later" keeps an existing value fresh instead of going negative
+    assert cache.hold("c", 30) is True
+    assert cache.lookup("c") == (FRESH, 3)
+    assert cache.hold("missing", 30) is False
+
+
+def test_stale_hit_returns_immediately_with_one_background_refresh(monkeypatch):
+    calls = []
+
+    async def fake_fetch(key, path, params):
+        calls.append(path)
+        await asyncio.sleep(0)
+        fd._cache.set(key, {"v": 2}, ttl=60)
+        return {"v": 2}
+
+    monkeypatch.setattr(fd, "_fetch", fake_fetch)
+    fd._cache.set("/matches/77:None", {"v": 1}, ttl=0)
+    try:
+        async def scenario():
+            first = await asyncio.gather(*(fd._get("/matches/77") for _ in range(5)))
+            await asyncio.sleep(0.01)
+            return first, await fd._get("/matches/77")
+
+        stale, fresh = asyncio.run(scenario())
+        assert stale == [{"v": 1}] * 5
+        assert fresh == {"v": 2}
+        assert calls == ["/matches/77"]
+    finally:
+        fd._cache.invalidate("/matches/77:None")
@@ -0,0 +1,37 @@
+"""
+Tests for the pooled upstream HTTP client registry (app.core.http_clients).
+
+No network — requests go to an httpx.MockTransport swapped into the
+shared client.
+"""
+import asyncio
+
+import httpx
+
+from app.core import http_clients
+
+
+def test_sync_client_is_shared_and_counted():
+    client = http_clients.get_sync_client("test_sync")
+    assert http_clients.get_sync_client("test_sync") is client
+
+    client._transport = httpx.MockTransport(lambda req: httpx.Response(503))
+    client.get("https://upstream.test/a")
+    client.get("https://upstream.test/b")
+
+    stats = http_clients.stats()["upstreams"]["test_sync"]
+    assert stats["requests"] == 2
+    assert stats["errors_5xx"] == 2
+    client.close()
+
+
+def test_async_client_is_per_event_loop():
+    async def grab():
+        first = http_clients.get_async_client("test_async")
+        assert http_clients.get_async_client("test_async") is first
+        return first
+
+    a = asyncio.run(grab())
+    b = asyncio.run(grab())
+    # A new loop must not reuse a client bound to a closed one
+    assert a is not b
@@ -0,0 +1,83 @@
+"""
+Intel feed ingestion tests — conditional GET, the nation index and the
+endpoints serving from it.  Feeds are served by an httpx MockTransport.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import intel_feeds
+from app.services.intel_index import ArticleIndex
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>Brazil name World Cup squad</title><link>https://example.com/{src}/1</link>
+<description>&lt;p&gt;Ancelotti picks Endrick.&lt;/p&gt;</description>
+<pubDate>Mon, 01 Jun 2026 10:00:00 +0000</pubDate></item>
+<item><title>France friendly report</title><link>https://example.com/{src}/2</link>
+<description>Mbappe scores twice ahead of the World Cup 2026.</description>
+<pubDate>Tue, 02 Jun 2026 10:00:00 +0000</pubDate></item>
+</channel></rss>"""
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    calls = {"full": 0, "conditional": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            calls["conditional"] += 1
+            return httpx.Response(304)
+        calls["full"] += 1
+        return httpx.Response(200, text=RSS.format(src=request.url.host), headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(intel_feeds, "get_async_client", lambda name: client)
+    monkeypatch.setattr(intel_feeds, "_feeds", {
+        s["url"]: intel_feeds._Feed(s["name"], s["url"]) for s in intel_feeds.RSS_SOURCES
+    })
+    monkeypatch.setattr(intel_feeds, "_index", ArticleIndex([]))
+    monkeypatch.setattr(intel_feeds, "_refreshed_at", 0.0)
+    monkeypatch.setattr(intel_feeds, "_refresh_task", None)
+    return calls
+
+
+def test_feeds_fetched_once_then_revalidated(feeds):
+    async def scenario():
+        await intel_feeds.refresh()
+        n = len(intel_feeds.RSS_SOURCES)
+        assert feeds == {"full": n, "conditional": 0}
+        brazil = intel_feeds.articles_for("brazil")
+        assert len(brazil) == n
+        assert brazil[0]["trail"] == "Ancelotti picks Endrick."
+
+        await intel_feeds.refresh()
+        assert feeds == {"full": n, "conditional": n}
+        # 304s keep the same index
+        assert intel_feeds.articles_for("Brazil") is brazil
+        assert intel_feeds.articles_for("World Cup 2026")[0]["title"] == "France friendly report"
+
+        # Warm index: requests don't touch the feeds
+        await intel_feeds.ensure_fresh()
+        assert feeds["full"] + feeds["conditional"] == 2 * n
+
+    asyncio.run(scenario())
+
+
+def test_team_news_served_from_index(client, feeds):
+    resp = client.get("/intel/news/Brazil")
+    assert resp.status_code == 200
+    articles = resp.json()["articles"]
+    # Same headline from every source is deduplicated
+    assert [a["title"] for a in articles] == ["Brazil name World Cup squad"]
+
+    resp = client.get("/intel/more-news/Brazil")
+    assert [a["title"] for a in resp.json()["articles"]] == [
+        "France friendly report", "Brazil name World Cup squad",
+    ]
+    resp = client.get("/intel/more-news/Brazil", params={"page": 2, "page_size": 1})
+    body = resp.json()
+    assert [a["title"] for a in body["articles"]] == ["Brazil name World Cup squad"]
+    assert body["total"] == 2 and body["has_more"] is False
+    assert feeds["full"] == len(intel_feeds.RSS_SOURCES)
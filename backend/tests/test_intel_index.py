@@ -0,0 +1,43 @@
+"""
+Intel inverted index tests — nation aliases, whole-word matching and ranking.
+"""
+from app.services.intel_index import ArticleIndex, resolve_nation
+
+
+def _a(title, trail="", n=0):
+    return {"title": title, "trail": trail, "published": f"2026-06-{10 - n:02d}T00:00:00+00:00"}
+
+
+def test_aliases_resolve_to_one_nation():
+    assert resolve_nation("USA") == resolve_nation("United States") == resolve_nation("usmnt") == "USA"
+    assert resolve_nation("Turkey") == resolve_nation("turkiye") == "Türkiye"
+    assert resolve_nation("south-korea") == resolve_nation("Korea Republic") == "South Korea"
+    assert resolve_nation("Ivory Coast") == resolve_nation("Côte d'Ivoire")
+    assert resolve_nation("World Cup 2026") is None
+
+
+def test_search_matches_aliases_whole_words_and_ranks_title_hits_first():
+    index = ArticleIndex([
+        _a("Pochettino's United States name camp roster", n=0),
+        _a("Romania prepare for Oman friendly", n=1),
+        _a("Group B preview", "Türkiye and the USA meet in Dallas.", n=2),
+        _a("Turkey coach Montella on the USA test", n=3),
+        _a("USMNT injury news", "USA defender out", n=4),
+    ])
+    titles = [a["title"] for a in index.search("usa")]
+    # Title hits (weighted) before body-only hits; ties broken by recency
+    assert titles == [
+        "USMNT injury news",
+        "Pochettino's United States name camp roster",
+        "Turkey coach Montella on the USA test",
+        "Group B preview",
+    ]
+    assert [a["title"] for a in index.search("Türkiye")] == [
+        "Turkey coach Montella on the USA test", "Group B preview",
+    ]
+    # "Oman" is not found inside "Romania"; plain phrases work too
+    assert [a["title"] for a in index.search("Romania")] == ["Romania prepare for Oman friendly"]
+    assert [a["title"] for a in index.search("camp roster")] == [
+        "Pochettino's United States name camp roster",
+    ]
+    assert index.search("Brazil") == []
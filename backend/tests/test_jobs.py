@@ -0,0 +1,71 @@
+"""
+Tests for cluster-singleton job leases (app.core.jobs).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session
+
+from app.core import jobs
+from app.core.jobs import record_finish, record_skip, try_acquire
+from app.models import JobLease
+
+
+def test_only_one_worker_wins_a_tick(session: Session):
+    assert try_acquire(session, "pietro_match_nudge", "host:1", 240) is True
+    assert try_acquire(session, "pietro_match_nudge", "host:2", 240) is False
+    assert try_acquire(session, "pietro_match_nudge", "host:3", 240) is False
+
+    record_skip(session, "pietro_match_nudge")
+    record_finish(session, "pietro_match_nudge", 12.5)
+
+    row = session.get(JobLease, "pietro_match_nudge")
+    session.refresh(row)
+    assert row.holder == "host:1"
+    assert row.run_count == 1
+    assert row.skipped_count == 1
+
+
+def test_expired_lease_hands_over(session: Session):
+    assert try_acquire(session, "vision_squad_audit", "host:1", 240) is True
+
+    row = session.get(JobLease, "vision_squad_audit")
+    row.lease_until = datetime.utcnow() - timedelta(seconds=1)
+    session.add(row)
+    session.commit()
+
+    assert try_acquire(session, "vision_squad_audit", "host:2", 240) is True
+    session.refresh(row)
+    assert row.holder == "host:2"
+
+
+@pytest.mark.parametrize("offset", [0.5, 0.9])
+def test_out_of_phase_workers_run_each_tick_once(session: Session, monkeypatch, offset):
+    interval = 300.0
+    clock = {"now": datetime(2026, 6, 11, 12, 0, 10)}
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock["now"]
+
+    monkeypatch.setattr(jobs, "datetime", FakeDatetime)
+    monkeypatch.setattr(jobs, "engine", session.get_bind())
+    runs = []
+    job = jobs.coordinated("hermes_send_reminders", lambda: runs.append(jobs.WORKER_ID), interval)
+
+    # Two workers whose schedulers started `offset` of an interval apart
+    start = clock["now"]
+    fires = sorted(
+        (start + timedelta(seconds=(n + phase) * interval), worker)
+        for n in range(4)
+        for phase, worker in ((0.0, "host:1"), (offset, "host:2"))
+    )
+    ticks = set()
+    for when, worker in fires:
+        clock["now"] = when
+        monkeypatch.setattr(jobs, "WORKER_ID", worker)
+        job()
+        ticks.add(int((when - datetime(1970, 1, 1)).total_seconds() // interval))
+
+    assert len(runs) == len(ticks)
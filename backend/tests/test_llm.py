@@ -0,0 +1,115 @@
+"""
+Shared async LLM client tests — concurrency limiting, shedding, timeouts
+and streaming.  A fake client stands in for Groq; no network.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import llm
+
+
+class _FakeStream:
+    def __init__(self, pieces, delay=0.0):
+        self._pieces = list(pieces)
+        self._delay = delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._pieces:
+            raise StopAsyncIteration
+        await asyncio.sleep(self._delay)
+        text = self._pieces.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeGroq:
+    def __init__(self, delay=0.0, pieces=("a", None, "b")):
+        self.delay = delay
+        self.pieces = pieces
+        self.active = 0
+        self.peak = 0
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, stream=False, **kwargs):
+        if stream:
+            s = _FakeStream(self.pieces, self.delay)
+            self.streams.append(s)
+            return s
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))])
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    client = _FakeGroq()
+    monkeypatch.setattr(llm, "_client", lambda: client)
+    monkeypatch.setattr(llm.settings, "groq_max_concurrency", 2)
+    llm._limits.clear()
+    yield client
+    llm._limits.clear()
+
+
+def test_concurrency_is_bounded_and_excess_is_shed(fake, monkeypatch):
+    fake.delay = 0.05
+    msgs = [{"role": "user", "content": "hi"}]
+
+    async def scenario():
+        results = await asyncio.gather(*(llm.complete(msgs, max_tokens=5) for _ in range(5)))
+        assert results == ["ok"] * 5
+        assert fake.peak == 2
+
+        monkeypatch.setattr(llm, "QUEUE_TIMEOUT", 0.01)
+        fake.delay = 0.2
+        shed_before = llm._stats["shed"]
+        outcomes = await asyncio.gather(
+            *(llm.complete(msgs, max_tokens=5) for _ in range(3)), return_exceptions=True,
+        )
+        assert sum(isinstance(o, llm.LLMBusy) for o in outcomes) == 1
+        assert llm._stats["shed"] == shed_before + 1
+        assert llm._stats["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_timeout_frees_the_slot(fake):
+    fake.delay = 1.0
+
+    async def scenario():
+        timeouts_before = llm._stats["timeouts"]
+        with pytest.raises(asyncio.TimeoutError):
+            await llm.complete([], max_tokens=5, timeout=0.01)
+        assert llm._stats["timeouts"] == timeouts_before + 1
+        assert llm._stats["in_flight"] == 0
+        assert not llm._limit().locked()
+
+    asyncio.run(scenario())
+
+
+def test_stream_yields_text_and_closes_response(fake):
+    async def scenario():
+        pieces = [p async for p in llm.stream([], max_tokens=5)]
+        assert pieces == ["a", "b"]
+        assert fake.streams[-1].closed
+
+        # A consumer that stops early still releases the slot
+        gen = llm.stream([], max_tokens=5)
+        assert await gen.__anext__() == "a"
+        await gen.aclose()
+        assert fake.streams[-1].closed
+        assert llm._stats["in_flight"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+"""
+AI response cache tests — exact and near-duplicate matching, per-mode
+scoping and the streaming replay of cached answers.
+"""
+import json
+
+from app.core.llm_cache import (
+    NEAR_DUPLICATE_THRESHOLD, ResponseCache, entity_tokens, minhash, normalize, similarity,
+)
+
+
+def _conv(text, *earlier):
+    return [*earlier, {"role": "user", "content": text}]
+
+
+def test_exact_match_ignores_case_punctuation_and_spacing():
+    cache = ResponseCache()
+    cache.store("scout_report", _conv("Scout report for Brazil"), "Brazil report", 4.0)
+
+    assert cache.lookup("scout_report", _conv("  scout REPORT for brazil!! ")) == "Brazil report"
+    assert cache.lookup("critique", _conv("Scout report for Brazil")) is None
+    assert cache.lookup("scout_report", _conv("Scout report for France")) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["groq_calls_saved"] == 1 and stats["seconds_saved"] == 4.0
+
+
+def test_near_duplicates_hit_only_within_same_context():
+    cache = ResponseCache(near_duplicate_modes={"critique"})
+    xi = (
+        "critique my 4-3-3 for France: Maignan; Kounde, Saliba, Upamecano, Theo Hernandez; "
+        "Tchouameni, Camavinga, Griezmann; Dembele, Mbappe, Thuram. Is the midfield balanced "
+        "enough against a high press and who should take set pieces?"
+    )
+    cache.store("critique", _conv(xi), "Solid XI", 6.0)
+
+    reworded = "Hey, " + xi + " Thanks"
+    assert similarity(minhash(xi.lower()), minhash(reworded.lower())) >= 0.9
+    assert cache.lookup("critique", _conv(reworded)) == "Solid XI"
+    assert cache.stats()["near_hits"] == 1
+
+    # Swapping one player changes several shingles — a different XI, not a hit
+    assert cache.lookup("critique", _conv(xi.replace("Thuram", "Kolo Muani"))) is None
+
+    # Same last message after a different earlier turn is not a hit
+    earlier = {"role": "assistant", "content": "Which nation?"}
+    assert cache.lookup("critique", _conv(reworded, earlier)) is None
+    # A genuinely different question is not a hit
+    assert cache.lookup("critique", _conv("critique my 3-5-2 for England")) is None
+
+
+LONG_XI = (
+    "Can you critique my France XI for the opener against Denmark? I'm going 4-3-3 with "
+    "Maignan in goal, Kounde at right back, Saliba and Upamecano in the middle and Theo "
+    "Hernandez at left back. Tchouameni sits, Camavinga and Griezmann get forward, with "
+    "Dembele on the right, Mbappe cutting in from the left and Thuram leading the line. "
+    "Pressing intensity 80, defensive line high, width narrow, tempo fast. My worry is "
+    "the space behind Theo when we lose the ball and whether Griezmann has the legs to "
+    "press for ninety minutes. Would you change anyone, and who should take corners and "
+    "free kicks around the box?"
+)
+
+
+def test_near_duplicates_are_opt_in_per_mode():
+    cache = ResponseCache(near_duplicate_modes={"scout_report"})
+    cache.store("critique", _conv(LONG_XI), "Solid XI", 6.0)
+    cache.store("scout_report", _conv(LONG_XI), "Report", 6.0)
+
+    reworded = "Hi! " + LONG_XI + " Thanks!"
+    assert cache.lookup("critique", _conv(reworded)) is None
+    assert cache.lookup("scout_report", _conv(reworded)) == "Report"
+
+
+def test_near_duplicate_never_serves_a_different_lineup():
+    cache = ResponseCache(near_duplicate_modes={"critique", "formation"})
+    cache.store("critique", _conv(LONG_XI), "Solid XI", 6.0)
+
+    variants = [
+        LONG_XI.replace("Maignan", "Areola"),
+        LONG_XI.replace("Thuram", "Giroud"),
+        LONG_XI.replace("Pressing intensity 80", "Pressing intensity 30"),
+    ]
+    for variant in variants:
+        # Similar enough on wording alone to clear the MinHash threshold
+        assert similarity(minhash(normalize(LONG_XI)), minhash(normalize(variant))) >= NEAR_DUPLICATE_THRESHOLD
+        assert entity_tokens(variant) != entity_tokens(LONG_XI)
+        assert cache.lookup("critique", _conv(variant)) is None
+    # Only wording changed: still a near hit
+    assert cache.lookup("critique", _conv("Hi! " + LONG_XI + " Thanks!")) == "Solid XI"
+
+
+def test_stream_replays_cached_answer(client, monkeypatch):
+    from app.api import ai
+
+    monkeypatch.setattr(ai.settings, "groq_api_key", "test")
+    body = {"mode": "formation", "messages": [{"role": "user", "content": "Best shape vs Spain?"}]}
+    answer = "Go with a compact 4-4-2 block and spring Vinicius on the break."
+    ai.response_cache.store("formation", body["messages"], answer, 3.0)
+    try:
+        resp = client.post("/ai/chat/stream", json=body)
+        assert resp.status_code == 200
+        assert resp.headers["x-cache"] == "HIT"
+        events = [line[6:] for line in resp.text.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        assert "".join(json.loads(e)["text"] for e in events[:-1]) == answer
+
+        resp = client.post("/ai/chat", json=body)
+        assert resp.json()["cached"] is True
+        assert resp.json()["response"] == answer
+    finally:
+        ai.response_cache.clear()
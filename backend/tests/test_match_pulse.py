@@ -0,0 +1,103 @@
+"""
+Match pulse tests — the counters prediction_ingest maintains match a full
+recount of the predictions, through inserts, changed picks and duplicates.
+"""
+import asyncio
+from collections import Counter
+
+from sqlmodel import select
+
+from app.models import MatchPrediction, MatchPulseCount, User
+from app.services import match_pulse, prediction_ingest
+
+MATCH_ID = 5001
+
+
+def _write(user_id, result, formation, captain):
+    return prediction_ingest.build_write(
+        user_id, MATCH_ID, "Brazil",
+        match_result=result,
+        tactics_data={"mentality": 50, "formation": formation} if formation else {"mentality": 50},
+        player_predictions={"first_goalscorer": captain} if captain else None,
+    )
+
+
+def _recount(session):
+    deltas = Counter()
+    for p in session.exec(select(MatchPrediction).where(MatchPrediction.match_id == MATCH_ID)).all():
+        session.refresh(p)
+        match_pulse.track_insert(
+            deltas, MATCH_ID, match_pulse.pulse_values(p.match_result, p.tactics_data, p.player_predictions),
+        )
+    return {k: v for k, v in deltas.items() if v}
+
+
+def _counters(session):
+    rows = session.exec(select(MatchPulseCount).where(MatchPulseCount.match_id == MATCH_ID)).all()
+    for r in rows:
+        session.refresh(r)
+    return {(r.match_id, r.dimension, r.value): r.count for r in rows if r.count}
+
+
+def test_counters_follow_inserts_and_changes(client, session):
+    users = [User(username=f"pulse{i}", email=f"pulse{i}@fanxi-test.com",
+                  hashed_password="x", country_allegiance="Brazil") for i in range(6)]
+    session.add_all(users)
+    session.commit()
+    ids = [u.id for u in users]
+
+    async def submit_all(writes):
+        return await asyncio.gather(*(prediction_ingest.submit(w) for w in writes))
+
+    asyncio.run(submit_all([
+        _write(ids[0], "home", "4-3-3", "Vinicius Jr"),
+        _write(ids[1], "home", "4-3-3", "Vinicius Jr"),
+        _write(ids[2], "draw", "3-5-2", "Rodrygo"),
+        _write(ids[3], "away", None, None),
+        _write(ids[4], "home", "4-2-3-1", "Vinicius Jr"),
+    ]))
+    # Changed picks, a repeat of an unchanged one, and a newcomer in one batch
+    asyncio.run(submit_all([
+        _write(ids[0], "away", "3-5-2", "Rodrygo"),
+        _write(ids[1], "home", "4-3-3", "Vinicius Jr"),
+        _write(ids[3], "draw", "4-3-3", "Raphinha"),
+        _write(ids[5], "home", "4-3-3", "Rodrygo"),
+    ]))
+
+    assert _counters(session) == _recount(session)
+
+    res = client.get(f"/matches/{MATCH_ID}/pulse")
+    assert res.status_code == 200
+    pulse = res.json()
+    assert pulse["total_scouts"] == 6
+    assert pulse["result_split"] == {"home": 50, "draw": 33, "away": 17}
+    assert pulse["top_formation"] == "4-3-3"
+    assert [f["count"] for f in pulse["formations"]] == [3, 2, 1]
+    assert pulse["top_captain"] == "Rodrygo"
+    assert pulse["top_captain_pct"] == 50
+    assert [c["player"] for c in pulse["top_captains"]] == ["Rodrygo", "Vinicius Jr", "Raphinha"]
+
+
+def test_empty_match_pulse(client):
+    pulse = client.get("/matches/999999/pulse").json()
+    assert pulse["total_scouts"] == 0
+    assert pulse["result_split"] == {"home": 0, "draw": 0, "away": 0}
+    assert pulse["top_formation"] is None and pulse["top_captain"] is None
+
+
+def test_null_and_empty_team_are_one_write(client, session):
+    user = User(username="noteam", email="noteam@fanxi-test.com",
+                hashed_password="x", country_allegiance="Brazil")
+    session.add(user)
+    session.commit()
+
+    writes = [
+        prediction_ingest.build_write(user.id, MATCH_ID, team, match_result=result)
+        for team, result in ((None, "home"), ("", "away"))
+    ]
+    ids = prediction_ingest.write_batch(writes)
+
+    assert {ids[w.key] for w in writes} == set(ids.values())
+    assert len(session.exec(select(MatchPrediction).where(MatchPrediction.match_id == MATCH_ID)).all()) == 1
+    assert _counters(session) == _recount(session)
+    assert _counters(session)[(MATCH_ID, "total", "")] == 1
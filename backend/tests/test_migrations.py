@@ -0,0 +1,102 @@
+"""
+Tests for versioned schema migrations (app.migrations).
+"""
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app import migrations
+from app.core import jobs
+from app.models import JobLease, MatchPrediction, MatchPulseCount, SchemaMigration
+
+
+@pytest.fixture
+def fresh_engine(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(migrations, "engine", engine)
+    return engine
+
+
+def _statements(engine) -> list:
+    seen = []
+    event.listen(engine, "before_cursor_execute", lambda *args: seen.append(args[2]))
+    return seen
+
+
+def test_fresh_database_migrates_to_head_then_startup_is_one_query(fresh_engine):
+    assert migrations.migrate(apply=True) == migrations.HEAD
+
+    with Session(fresh_engine) as session:
+        versions = session.exec(select(SchemaMigration.version).order_by(SchemaMigration.version)).all()
+        lease = session.get(JobLease, migrations.LOCK_ID)
+    assert versions == [m.version for m in migrations.MIGRATIONS]
+    assert lease.run_count == 1 and lease.lease_until is None
+
+    seen = _statements(fresh_engine)
+    assert migrations.migrate(apply=True) == migrations.HEAD
+    assert seen == ["SELECT max(version) FROM schemamigration"]
+
+
+def test_existing_database_is_deduplicated_and_indexed(session, monkeypatch):
+    monkeypatch.setattr(migrations, "engine", session.get_bind())
+    session.exec(text(f"DROP INDEX {migrations.PREDICTION_UNIQUE_INDEX}"))
+    session.exec(text("DROP INDEX ix_agentrun_agent_created"))
+    rows = [
+        MatchPrediction(user_id=1, match_id=4003, team_name="Spain", status="SCORED"),
+        MatchPrediction(user_id=1, match_id=4003, team_name="Spain"),
+        MatchPrediction(user_id=2, match_id=4003),
+        MatchPrediction(user_id=2, match_id=4003),
+    ]
+    session.add_all(rows)
+    session.commit()
+    scored_id, newest_null_id = rows[0].id, rows[3].id
+
+    migrations.migrate(apply=True)
+
+    left = session.exec(select(MatchPrediction.id).where(MatchPrediction.match_id == 4003)).all()
+    assert sorted(left) == sorted([scored_id, newest_null_id])
+    # Pulse counters are backfilled from the deduplicated rows
+    assert session.get(MatchPulseCount, (4003, "total", "")).count == 2
+    indexes = set(session.exec(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert {migrations.PREDICTION_UNIQUE_INDEX, "ix_agentrun_agent_created"} <= indexes
+    session.add(MatchPrediction(user_id=2, match_id=4003))
+    with pytest.raises(IntegrityError):
+        session.commit()
+
+
+def test_waits_for_the_worker_holding_the_lock(fresh_engine, monkeypatch):
+    SQLModel.metadata.create_all(fresh_engine)
+    with Session(fresh_engine) as session:
+        assert jobs.try_acquire(session, migrations.LOCK_ID, "other-host:1", 60)
+
+    def other_worker_finishes(_seconds):
+        migrations._apply_pending(0)
+
+    monkeypatch.setattr(migrations.time, "sleep", other_worker_finishes)
+    monkeypatch.setitem(migrations._state, "applied", [])
+    assert migrations.migrate(apply=True) == migrations.HEAD
+    assert migrations.stats()["applied_by_this_worker"] == []
+
+    with Session(fresh_engine) as session:
+        lease = session.get(JobLease, migrations.LOCK_ID)
+        assert lease.holder == "other-host:1" and lease.run_count == 0
+
+
+def test_check_only_startup_refuses_an_old_schema(fresh_engine):
+    with pytest.raises(migrations.SchemaBehind):
+        migrations.migrate(apply=False)
+
+
+def test_a_failed_version_read_is_not_an_empty_schema(fresh_engine):
+    assert migrations.current_version() == 0
+    migrations.migrate(apply=True)
+
+    def connection_drops(conn, cursor, statement, *args):
+        if "schemamigration" in statement and statement.startswith("SELECT max"):
+            raise OperationalError(statement, {}, Exception("server closed the connection unexpectedly"))
+
+    event.listen(fresh_engine, "before_cursor_execute", connection_drops)
+    with pytest.raises(OperationalError):
+        migrations.current_version()
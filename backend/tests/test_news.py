@@ -0,0 +1,77 @@
+"""
+/news/wc2026 enrichment tests — batched angles, per-URL persistence and
+single-flight refresh.  NewsAPI and Groq are replaced with fakes.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.api import news
+
+
+def _article(n):
+    return {
+        "title": f"Headline {n}", "description": f"Story {n}",
+        "url": f"https://example.com/{n}", "source": {"name": "Wire"},
+        "publishedAt": "2026-06-01T00:00:00Z",
+    }
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(news, "engine", engine)
+    monkeypatch.setattr(news.settings, "groq_api_key", "test")
+    monkeypatch.setattr(news.settings, "news_api_key", "test")
+    monkeypatch.setattr(news, "_refresh_task", None)
+    monkeypatch.setitem(news._cache, "data", None)
+    monkeypatch.setitem(news._cache, "expires_at", datetime.min.replace(tzinfo=timezone.utc))
+
+    state = {"articles": [_article(1), _article(2), _article(3)], "fetches": 0, "prompts": []}
+
+    async def fake_fetch():
+        state["fetches"] += 1
+        await asyncio.sleep(0.01)
+        return list(state["articles"])
+
+    async def fake_complete(messages, **kwargs):
+        prompt = messages[0]["content"]
+        state["prompts"].append(prompt)
+        titles = [line.split(". ")[1] for line in prompt.splitlines() if line[:1].isdigit()]
+        return "Sure: " + json.dumps([f"Angle for {t}" for t in titles])
+
+    monkeypatch.setattr(news, "_fetch_articles", fake_fetch)
+    monkeypatch.setattr(news.llm, "complete", fake_complete)
+    return state
+
+
+def test_one_batched_prompt_and_angles_persist_per_url(feed):
+    async def scenario():
+        articles = await news._build_feed()
+        assert [a["tacticalAngle"] for a in articles] == [
+            "Angle for Headline 1", "Angle for Headline 2", "Angle for Headline 3",
+        ]
+        assert len(feed["prompts"]) == 1
+
+        # Next refresh: one new article, two unchanged — only the new one is enriched
+        feed["articles"] = [_article(4), _article(1), _article(2)]
+        articles = await news._build_feed()
+        assert len(feed["prompts"]) == 2
+        assert "Headline 4" in feed["prompts"][1] and "Headline 1" not in feed["prompts"][1]
+        assert articles[1]["tacticalAngle"] == "Angle for Headline 1"
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_refresh(feed):
+    async def scenario():
+        results = await asyncio.gather(*(news.get_wc2026_news.__wrapped__(None) for _ in range(5)))
+        assert feed["fetches"] == 1
+        assert all(r is results[0] for r in results)
+
+    asyncio.run(scenario())
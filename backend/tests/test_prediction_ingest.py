@@ -0,0 +1,89 @@
+"""
+Prediction ingest tests — concurrent submissions share one transaction,
+duplicates collapse, and every caller gets its committed prediction id.
+The (user, match, team) unique index backs this up in the database.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from app.models import MatchPrediction, User
+from app.services import prediction_ingest
+
+
+@pytest.fixture
+def users(session, monkeypatch):
+    monkeypatch.setattr(prediction_ingest, "engine", session.get_bind())
+    rows = [User(username=f"ingest{i}", email=f"ingest{i}@fanxi-test.com",
+                 hashed_password="x", country_allegiance="Spain") for i in range(20)]
+    session.add_all(rows)
+    session.commit()
+    return [u.id for u in rows]
+
+
+def _write(user_id, result="home", team="Spain"):
+    return prediction_ingest.build_write(
+        user_id, 4001, team, match_result=result, tactics_data={"formation": "4-3-3"},
+    )
+
+
+def test_burst_is_written_in_one_batch(session, users):
+    existing = MatchPrediction(user_id=users[0], match_id=4001, team_name="Spain", match_result="away")
+    session.add(existing)
+    session.commit()
+    before = prediction_ingest.stats()
+
+    async def burst():
+        writes = [_write(u) for u in users] + [_write(users[1], result="draw")]
+        return await asyncio.gather(*(prediction_ingest.submit(w) for w in writes))
+
+    ids = asyncio.run(burst())
+    after = prediction_ingest.stats()
+    assert after["batches"] - before["batches"] == 1
+    assert after["rows_written"] - before["rows_written"] == 20
+    assert after["coalesced"] - before["coalesced"] == 1
+    assert after["flush_latency_ms"]["p95"] is not None
+
+    # Existing row updated in place; the duplicate shares its id; last write wins
+    assert ids[0] == existing.id
+    assert ids[1] == ids[-1]
+    rows = session.exec(select(MatchPrediction).where(MatchPrediction.match_id == 4001)).all()
+    assert len(rows) == 20
+    by_user = {r.user_id: r for r in rows}
+    session.refresh(by_user[users[0]])
+    assert by_user[users[0]].match_result == "home"
+    assert by_user[users[1]].match_result == "draw"
+    assert by_user[users[2]].tactics_data == {"formation": "4-3-3"}
+
+
+def test_failed_batch_is_retried_row_by_row(users, monkeypatch):
+    real = prediction_ingest.write_batch
+
+    def flaky(writes):
+        if any(w.user_id == users[3] for w in writes):
+            raise RuntimeError("bad row")
+        return real(writes)
+
+    monkeypatch.setattr(prediction_ingest, "write_batch", flaky)
+
+    async def burst():
+        return await asyncio.gather(
+            *(prediction_ingest.submit(_write(u)) for u in users[2:5]), return_exceptions=True,
+        )
+
+    ok, bad, ok2 = asyncio.run(burst())
+    assert isinstance(ok, int) and isinstance(ok2, int)
+    assert isinstance(bad, RuntimeError)
+
+
+def test_unique_index_rejects_duplicates_including_null_team(session, users):
+    for team in ("Spain", None):
+        session.add(MatchPrediction(user_id=users[0], match_id=4002, team_name=team))
+        session.commit()
+        session.add(MatchPrediction(user_id=users[0], match_id=4002, team_name=team))
+        with pytest.raises(IntegrityError):
+            session.commit()
+        session.rollback()
+
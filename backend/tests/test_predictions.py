@@ -95,3 +95,78 @@ def test_leaderboard_shape(client: TestClient, registered_user):
     assert "username" in entry
     assert "football_iq_points" in entry
     assert "rank_title" in entry
+
+
+def test_leaderboard_etag_not_modified(client: TestClient, registered_user):
+    res = client.get("/predictions/leaderboard")
+    etag = res.headers["etag"]
+    res2 = client.get("/predictions/leaderboard", headers={"If-None-Match": etag})
+    assert res2.status_code == 304
+
+
+def test_leaderboard_cursor_pagination(client: TestClient, session, registered_user):
+    from app.models import User
+    from app.services import leaderboard
+
+    for i, pts in enumerate([300, 50, 50]):
+        session.add(User(
+            username=f"ranked{i}", email=f"ranked{i}@fanxi-test.com",
+            hashed_password="x", country_allegiance="Spain", football_iq_points=pts,
+        ))
+    session.commit()
+    leaderboard.refresh(session)
+
+    first = client.get("/predictions/leaderboard?limit=2")
+    assert [e["username"] for e in first.json()] == ["ranked0", "ranked1"]
+    cursor = first.headers["x-next-cursor"]
+
+    second = client.get(f"/predictions/leaderboard?limit=2&cursor={cursor}")
+    assert [e["rank"] for e in second.json()] == [2, 4]  # ranked2 ties ranked1
+
+
+def test_leaderboard_title_comes_from_the_snapshot(client: TestClient, session, registered_user):
+    from app.models import User
+    from app.services import leaderboard
+
+    user = User(
+        username="climber", email="climber@fanxi-test.com", hashed_password="x",
+        country_allegiance="Spain", football_iq_points=150, rank_title="Analyst",
+    )
+    session.add(user)
+    session.commit()
+    leaderboard.refresh(session)
+    # Points move on the live row; the snapshot has not been rebuilt yet
+    user.football_iq_points, user.rank_title = 350, "Tactician"
+    session.add(user)
+    session.commit()
+
+    entry = next(e for e in client.get("/predictions/leaderboard").json() if e["username"] == "climber")
+    assert (entry["football_iq_points"], entry["rank_title"]) == (150, "Analyst")
+
+
+def test_leaderboard_append_survives_a_position_race(session):
+    from sqlalchemy import event, insert
+    from sqlmodel import select
+    from app.models import LeaderboardRank, User
+    from app.services import leaderboard
+
+    rival, newcomer = (
+        User(username=name, email=f"{name}@fanxi-test.com", hashed_password="x", country_allegiance="Spain")
+        for name in ("rival", "newcomer")
+    )
+    session.add_all([rival, newcomer])
+    session.commit()
+
+    @event.listens_for(session, "before_flush", once=True)
+    def other_worker_appends_first(sess, *_):
+        # Another worker's signup claims the position add_user just computed
+        claimed = next(o.position for o in sess.new if isinstance(o, LeaderboardRank))
+        sess.connection().execute(insert(LeaderboardRank).values(
+            user_id=rival.id, points=0, rank=claimed, position=claimed,
+        ))
+
+    leaderboard.add_user(session, newcomer)
+
+    ranked = session.exec(select(LeaderboardRank.user_id)).all()
+    assert {rival.id, newcomer.id} <= set(ranked)
+    assert len(ranked) == len(set(session.exec(select(LeaderboardRank.position)).all()))
@@ -0,0 +1,136 @@
+"""
+Query-plan regression tests for the hot predicate paths.
+
+Each query below mirrors one the API or an agent runs on every request or
+scheduler tick.  They are EXPLAINed against a seeded, ANALYZEd database
+whose indexes came from the migrations, and the test fails if any of them
+falls back to a full table scan — or, where the index is meant to supply
+the order, to a temporary sort.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.dialects import sqlite
+from sqlmodel import func, select
+
+from app import migrations
+from app.models import AgentRun, InAppNotification, MatchPrediction, MatchPulseCount, NudgeLog
+
+COMPOSITE_INDEXES = (
+    "ix_matchprediction_match_user", "ix_matchprediction_match_status",
+    "ix_matchprediction_user_created", "ix_nudgelog_user_match",
+    "ix_inappnotification_user_read_created", "ix_agentrun_agent_created",
+)
+
+# name -> (statement, index must provide the ORDER BY)
+HOT_QUERIES = {
+    "prediction_for_user_and_match": (
+        select(MatchPrediction).where(MatchPrediction.match_id == 7, MatchPrediction.user_id == 3),
+        False,
+    ),
+    "scoring_chunk": (
+        select(MatchPrediction.id, MatchPrediction.user_id)
+        .where(MatchPrediction.match_id == 7, MatchPrediction.status == "LOCKED", MatchPrediction.id > 0)
+        .order_by(MatchPrediction.id)
+        .limit(500),
+        True,
+    ),
+    "prediction_history": (
+        select(MatchPrediction)
+        .where(MatchPrediction.user_id == 3)
+        .order_by(MatchPrediction.created_at.desc()),
+        True,
+    ),
+    "user_prediction_count": (
+        select(func.count(MatchPrediction.id)).where(MatchPrediction.user_id == 3),
+        False,
+    ),
+    "nudge_dedup": (
+        select(NudgeLog).where(NudgeLog.user_id == 3, NudgeLog.match_id == 7),
+        False,
+    ),
+    "notification_feed": (
+        select(InAppNotification)
+        .where(InAppNotification.user_id == 3)
+        .order_by(InAppNotification.created_at.desc())
+        .limit(20),
+        False,
+    ),
+    "unread_notifications": (
+        select(InAppNotification).where(
+            InAppNotification.user_id == 3,
+            InAppNotification.is_read == False,  # noqa: E712
+        ),
+        False,
+    ),
+    "match_pulse_captains": (
+        select(MatchPulseCount.value, MatchPulseCount.count)
+        .where(MatchPulseCount.match_id == 7, MatchPulseCount.dimension == "captain")
+        .order_by(MatchPulseCount.count.desc())
+        .limit(5),
+        False,
+    ),
+    "agent_runs": (
+        select(AgentRun)
+        .where(AgentRun.agent == "PIETRO")
+        .order_by(AgentRun.created_at.desc())
+        .limit(10),
+        True,
+    ),
+}
+
+
+@pytest.fixture
+def seeded(session, monkeypatch):
+    """The test DB as an existing deployment sees it: data first, then migrations."""
+    conn = session.connection()
+    for name in COMPOSITE_INDEXES:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+    now = datetime(2026, 6, 1)
+    conn.execute(insert(MatchPrediction), [
+        {"user_id": u, "match_id": m, "team_name": "Spain", "match_result": "home",
+         "status": "SCORED" if m < 20 else "LOCKED", "created_at": now + timedelta(minutes=u * 40 + m)}
+        for u in range(60) for m in range(40)
+    ])
+    conn.execute(insert(NudgeLog), [
+        {"user_id": u, "match_id": m, "sent_at": now} for u in range(60) for m in range(0, 40, 4)
+    ])
+    conn.execute(insert(InAppNotification), [
+        {"user_id": u, "title": "t", "message": "m", "notification_type": "score_reveal",
+         "is_read": i % 3 == 0, "created_at": now + timedelta(hours=i)}
+        for u in range(60) for i in range(20)
+    ])
+    conn.execute(insert(AgentRun), [
+        {"agent": agent, "run_type": "tick", "findings": [], "actions_taken": [],
+         "created_at": now + timedelta(minutes=i)}
+        for agent in ("PIETRO", "NATASHA", "WANDA", "HERMES", "VISION", "RHODEY")
+        for i in range(200)
+    ])
+    session.commit()
+
+    monkeypatch.setattr(migrations, "engine", session.get_bind())
+    migrations.migrate(apply=True)
+    session.exec(text("ANALYZE"))
+    return session
+
+
+def _plan(session, stmt) -> list:
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in session.exec(text(f"EXPLAIN QUERY PLAN {sql}")).all()]
+
+
+def test_migrations_create_composite_indexes(seeded):
+    names = set(seeded.exec(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert set(COMPOSITE_INDEXES) <= names
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(seeded, name):
+    stmt, ordered_by_index = HOT_QUERIES[name]
+    plan = _plan(seeded, stmt)
+    scans = [step for step in plan if step.startswith("SCAN ")]
+    assert not scans, f"{name} scans a whole table: {plan}"
+    if ordered_by_index:
+        assert not any("TEMP B-TREE" in step for step in plan), f"{name} sorts outside the index: {plan}"
@@ -0,0 +1,44 @@
+"""
+Tests for the upstream rate governor — token buckets with priorities.
+
+Uses the in-process bucket store; nothing sleeps for long.
+"""
+import asyncio
+
+import pytest
+
+from app.core import rate_governor as rg
+
+
+def _governor(capacity=10, per_minute=0.6):
+    spec = rg.BucketSpec(capacity=capacity, per_second=per_minute / 60)
+    return rg.Governor(rg._LocalStore(), {"football_data": spec})
+
+
+def test_priorities_leave_headroom_for_live_polls():
+    gov = _governor(capacity=10)
+
+    # Agents stop at half the bucket, users at the live reserve
+    for _ in range(5):
+        gov.acquire_sync("football_data", rg.AGENT)
+    with pytest.raises(rg.RateLimited):
+        gov.acquire_sync("football_data", rg.AGENT)
+
+    for _ in range(3):
+        gov.acquire_sync("football_data", rg.USER)
+    # Priority comes from the context when not passed explicitly
+    saved, rg._MAX_WAIT[rg.USER] = rg._MAX_WAIT[rg.USER], 0.0
+    try:
+        with rg.upstream_priority(rg.USER), pytest.raises(rg.RateLimited):
+            asyncio.run(gov.acquire("football_data"))
+    finally:
+        rg._MAX_WAIT[rg.USER] = saved
+
+    # The live poller can still take the reserved tokens
+    gov.acquire_sync("football_data", rg.LIVE)
+    gov.acquire_sync("football_data", rg.LIVE)
+
+    stats = gov.stats()["buckets"]["football_data"]
+    assert stats["granted"] == 10
+    assert stats["shed"] == 2
+    assert stats["remaining"] < 1
@@ -1,9 +1,13 @@
 """
 Critical-path tests: scoring engine correctness and idempotency.
 
-Tests the pure scoring functions directly (no HTTP, no DB).
+Tests the pure scoring functions directly (no HTTP, no DB), plus the bulk
+scoring engine against the in-memory SQLite session.
 """
-from app.api.predictions import (
+from app.models import MatchPrediction, User
+from app.schemas import MatchResultInput
+from app.services.scoring_engine import ActualResult, ChunkScorer, score_match_bulk
+from app.services.scoring import (
     score_match_result,
     score_correct_score,
     score_btts,
@@ -14,6 +18,7 @@ from app.api.predictions import (
     score_player_assist,
     score_player_carded,
     score_man_of_the_match,
+    score_shots_on_target,
     rank_title_for,
 )
 
@@ -139,3 +144,89 @@ def test_rank_commander():
 
 def test_rank_legend():
     assert rank_title_for(1000) == "Legend"
+
+
+# ---------------------------------------------------------------------------
+# Bulk scoring engine (chunked, idempotent)
+# ---------------------------------------------------------------------------
+
+
+def _seed_predictions(session, n_users=5, match_id=2001):
+    users = []
+    for i in range(n_users):
+        u = User(
+            username=f"bulk{i}", email=f"bulk{i}@fanxi-test.com",
+            hashed_password="x", country_allegiance="Brazil",
+            football_iq_points=95,
+        )
+        session.add(u)
+        users.append(u)
+    session.commit()
+    for u in users:
+        session.refresh(u)
+        session.add(MatchPrediction(
+            user_id=u.id, match_id=match_id, team_name="Brazil",
+            match_result="home", btts_prediction=True,
+            correct_score={"home": 2, "away": 1},
+            player_predictions={"first_goalscorer": "Vinicius"},
+        ))
+    session.commit()
+    return users
+
+
+_RESULT = MatchResultInput(
+    home_goals=2, away_goals=1, ht_home_goals=1, ht_away_goals=0,
+    first_goalscorer="vinicius",
+)
+
+
+def test_bulk_scoring_awards_points_and_titles(session):
+    users = _seed_predictions(session)
+    progress = score_match_bulk(session, 2001, _RESULT, chunk_size=2)
+
+    assert progress.predictions_scored == 5
+    assert progress.chunks_done == 3
+    # Everyone crossed 100 points: Scout -> Analyst
+    assert progress.ranks_changed == 5
+    # 3 (result) + 10 (score) + 5 (btts) + 10 (first scorer) = 28
+    for u in users:
+        session.refresh(u)
+        assert u.football_iq_points == 95 + 28
+        assert u.rank_title == "Analyst"
+
+
+def test_bulk_scoring_is_idempotent(session):
+    users = _seed_predictions(session)
+    score_match_bulk(session, 2001, _RESULT)
+    second = score_match_bulk(session, 2001, _RESULT)
+
+    assert second.predictions_scored == 0
+    session.refresh(users[0])
+    assert users[0].football_iq_points == 95 + 28
+
+
+def test_chunk_scorer_player_markets_match_the_helpers():
+    actual = MatchResultInput(
+        home_goals=2, away_goals=1, ht_home_goals=1, ht_away_goals=0,
+        first_goalscorer="Vinicius", scorers=["Vinicius", "Rodrygo"],
+        assisters=["Raphinha"], carded=["Casemiro"],
+        player_shots={"rodrygo": 3}, man_of_the_match="Vinicius",
+    )
+    scorer = ChunkScorer(ActualResult.from_input(actual))
+    for picks in (
+        {"first_goalscorer": "VINICIUS", "anytime_goalscorer": "rodrygo", "player_assist": "Raphinha",
+         "player_carded": "Casemiro", "shots_on_target": {"player": "Rodrygo", "threshold": 2},
+         "man_of_the_match": "vinicius"},
+        {"first_goalscorer": "Rodrygo", "anytime_goalscorer": "Neymar", "player_assist": "Vinicius",
+         "player_carded": "Raphinha", "shots_on_target": {"player": "Rodrygo", "threshold": 4},
+         "man_of_the_match": "Casemiro"},
+    ):
+        expected = (
+            score_first_goalscorer(picks["first_goalscorer"], actual.first_goalscorer)
+            + score_anytime_goalscorer(picks["anytime_goalscorer"], actual.scorers)
+            + score_player_assist(picks["player_assist"], actual.assisters)
+            + score_player_carded(picks["player_carded"], actual.carded)
+            + score_shots_on_target(picks["shots_on_target"], actual.player_shots)
+            + score_man_of_the_match(picks["man_of_the_match"], actual.man_of_the_match)
+        )
+        assert scorer.score_row(None, None, None, None, None, picks) == expected
@@ -0,0 +1,334 @@
+"""
+WebSocket hub tests — backplane leases, cross-subscriber fan-out,
+per-client send queues and the delta/resume protocol.
+
+Uses the in-process backplane; no sockets or upstream calls.
+"""
+import asyncio
+import json
+
+from app.websocket import backplane as bp
+
+
+def test_lease_is_exclusive_until_released():
+    async def scenario():
+        plane = bp.InProcessBackplane()
+        assert await plane.acquire_lease("poll:1", 60)
+        # Renewal by the holder succeeds
+        assert await plane.acquire_lease("poll:1", 60)
+        # A different worker is refused while the lease is live
+        plane._leases["poll:1"] = ("other-host:1", plane._leases["poll:1"][1])
+        assert not await plane.acquire_lease("poll:1", 60)
+        # Expired leases can be taken over
+        plane._leases["poll:1"] = ("other-host:1", 0)
+        assert await plane.acquire_lease("poll:1", 60)
+
+    asyncio.run(scenario())
+
+
+def test_publish_reaches_every_subscriber():
+    async def scenario():
+        plane = bp.InProcessBackplane()
+        received = {"a": [], "b": []}
+
+        async def listen(name):
+            async for msg in plane.subscribe("match:7"):
+                received[name].append(msg)
+                return
+
+        tasks = [asyncio.create_task(listen("a")), asyncio.create_task(listen("b"))]
+        await asyncio.sleep(0)
+        await plane.publish("match:7", '{"type": "goal"}')
+        await asyncio.gather(*tasks)
+        assert received == {"a": ['{"type": "goal"}'], "b": ['{"type": "goal"}']}
+
+    asyncio.run(scenario())
+
+
+class _FakeSocket:
+    """Stands in for a WebSocket; `gate` blocks sends to simulate a slow reader."""
+
+    def __init__(self, gate=None):
+        self.sent = []
+        self.closed = False
+        self.gate = gate
+
+    async def send_text(self, text):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+
+
+def test_frame_encoded_once_and_slow_client_does_not_block_others():
+    from app.websocket import match_ws
+
+    async def scenario():
+        fast, slow = _FakeSocket(), _FakeSocket(gate=asyncio.Event())
+        clients = {ws: match_ws._Client(ws, 99) for ws in (fast, slow)}
+        match_ws._connections[99] = dict(clients)
+        try:
+            encoded_before = match_ws._stats["frames_encoded"]
+            frame = match_ws._encode([
+                {"type": "goal", "data": {"home_goals": 1}},
+                {"type": "state", "data": {"home_goals": 1}},
+            ])
+            assert match_ws._stats["frames_encoded"] == encoded_before + 1
+            assert json.loads(frame)["type"] == "batch"
+
+            match_ws._broadcast_local(99, frame)
+            await asyncio.sleep(0.01)
+            assert fast.sent == [frame]  # not held up by the slow socket
+            assert slow.sent == []
+            # Same string object handed to every socket, not re-encoded
+            assert fast.sent[0] is frame
+
+            # Flood the slow client past its queue and drop limit
+            for i in range(match_ws.SEND_QUEUE_SIZE * (match_ws.SLOW_CLIENT_MAX_DROPS + 2)):
+                match_ws._broadcast_local(99, json.dumps({"type": "delta", "seq": i, "data": {"minute": i}}))
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.01)
+            assert slow not in match_ws._connections[99]
+            assert slow.closed
+            assert fast in match_ws._connections[99]
+        finally:
+            for c in clients.values():
+                c.writer.cancel()
+            match_ws._connections.pop(99, None)
+
+    asyncio.run(scenario())
+
+
+def test_client_that_catches_up_is_not_disconnected_for_old_lags():
+    from app.websocket import match_ws
+
+    mid = 97
+
+    async def scenario():
+        gate = asyncio.Event()
+        ws = _FakeSocket(gate=gate)
+        client = match_ws._Client(ws, mid)
+        match_ws._connections[mid] = {ws: client}
+        try:
+            # Lag, recover, repeat — more times than the drop limit
+            for _ in range(match_ws.SLOW_CLIENT_MAX_DROPS + 2):
+                gate.clear()
+                for i in range(match_ws.SEND_QUEUE_SIZE + 2):
+                    match_ws._broadcast_local(mid, json.dumps({"type": "delta", "seq": i, "data": {}}))
+                    await asyncio.sleep(0)
+                assert client.dropped == 1
+                gate.set()
+                await asyncio.sleep(0.01)
+                assert client.queue.empty()
+            assert client.dropped == 0
+            assert not ws.closed
+            assert ws in match_ws._connections[mid]
+        finally:
+            client.writer.cancel()
+            match_ws._connections.pop(mid, None)
+
+    match_ws._match_state[mid] = {"minute": 30}
+    match_ws._match_seq[mid] = 3
+    try:
+        asyncio.run(scenario())
+    finally:
+        match_ws._match_state.pop(mid, None)
+        match_ws._match_seq.pop(mid, None)
+        match_ws._state_frames.pop(mid, None)
+
+
+def test_deltas_track_state_and_resume_from_seq():
+    from app.websocket import match_ws
+
+    mid = 98
+    try:
+        match_ws._match_state[mid] = {"minute": 10, "home_goals": 0, "away_goals": 0}
+        match_ws._match_seq[mid] = 4
+
+        assert match_ws._diff({"minute": 10, "venue": "X"}, {"minute": 11}) == {
+            "minute": 11, "venue": None,
+        }
+
+        match_ws._remember_state(mid, json.dumps(
+            {"type": "delta", "seq": 5, "data": {"minute": 11}}
+        ))
+        match_ws._remember_state(mid, json.dumps({"type": "batch", "data": [
+            {"type": "goal", "data": {"home_goals": 1}},
+            {"type": "delta", "seq": 6, "data": {"minute": 12, "home_goals": 1}},
+        ]}))
+        assert match_ws._match_seq[mid] == 6
+        assert match_ws._match_state[mid] == {"minute": 12, "home_goals": 1, "away_goals": 0}
+
+        # Resume: current -> nothing, covered gap -> merged delta, too old -> full state
+        assert match_ws._catch_up(mid, 6) == {}
+        assert match_ws._catch_up(mid, 4) == {"minute": 12, "home_goals": 1}
+        assert match_ws._catch_up(mid, 2) is None
+        assert match_ws._catch_up(mid, 40) is None
+
+        # The full-state frame is encoded once per seq and shared
+        assert match_ws._state_frame(mid) is match_ws._state_frame(mid)
+        assert json.loads(match_ws._state_frame(mid))["seq"] == 6
+
+        # A gap in the relayed sequence drops the local copy
+        match_ws._remember_state(mid, json.dumps(
+            {"type": "delta", "seq": 9, "data": {"minute": 15}}
+        ))
+        assert mid not in match_ws._match_state
+    finally:
+        for local in (match_ws._match_state, match_ws._match_seq,
+                      match_ws._history, match_ws._state_frames):
+            local.pop(mid, None)
+
+
+def test_consecutive_live_polls_broadcast_the_newest_payload(monkeypatch):
+    from app.services import football_data as fd
+    from app.websocket import match_ws
+
+    mid = 97
+    minutes = iter(range(1, 10))
+    broadcasts = []
+
+    async def fake_fetch(key, path, params):
+        raw = {"id": mid, "status": "IN_PLAY", "minute": next(minutes),
+               "homeTeam": {"name": "Spain"}, "awayTeam": {"name": "Japan"}}
+        # Expired on arrival: the next poll (60s later) is past the 30s live TTL
+        fd._cache.set(key, raw, ttl=0)
+        return raw
+
+    async def fake_broadcast(match_id, *messages):
+        broadcasts.extend(m["data"]["minute"] for m in messages if m["type"] == "delta")
+
+    plane = bp.InProcessBackplane()
+    monkeypatch.setattr(fd, "_fetch", fake_fetch)
+    monkeypatch.setattr(match_ws, "get_backplane", lambda: plane)
+    monkeypatch.setattr(match_ws, "_broadcast", fake_broadcast)
+
+    async def three_polls():
+        for _ in range(3):
+            await match_ws._poll_match(mid)
+
+    try:
+        asyncio.run(three_polls())
+        assert broadcasts == [1, 2, 3]
+    finally:
+        fd._cache.invalidate(f"/matches/{mid}:None")
+        fd._snapshots.pop(mid, None)
+
+
+def test_relay_resubscribes_after_a_backplane_error(monkeypatch):
+    from app.websocket import match_ws
+
+    mid = 96
+
+    class FlakyBackplane(bp.InProcessBackplane):
+        failures = 1
+
+        async def subscribe(self, channel):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("Connection reset by peer")
+            async for msg in super().subscribe(channel):
+                yield msg
+
+    plane = FlakyBackplane()
+    monkeypatch.setattr(match_ws, "get_backplane", lambda: plane)
+    monkeypatch.setattr(match_ws, "RELAY_RETRY_INITIAL", 0)
+
+    async def scenario():
+        await plane.set_state(match_ws._state_key(mid), json.dumps(
+            {"seq": 3, "data": {"minute": 30}}), 60)
+        ws = _FakeSocket()
+        client = match_ws._Client(ws, mid)
+        match_ws._connections[mid] = {ws: client}
+        relay = asyncio.create_task(match_ws._relay(mid))
+        try:
+            for _ in range(5):
+                await asyncio.sleep(0)
+            delta = json.dumps({"type": "delta", "seq": 4, "data": {"minute": 31}})
+            await plane.publish(match_ws._channel(mid), delta)
+            await asyncio.sleep(0.01)
+
+            assert not relay.done()
+            resync, relayed = (json.loads(f) for f in ws.sent)
+            assert (resync["type"], resync["seq"]) == ("state", 3)
+            assert relayed["seq"] == 4
+            assert match_ws._match_state[mid] == {"minute": 31}
+        finally:
+            relay.cancel()
+            client.writer.cancel()
+            match_ws._connections.pop(mid, None)
+            for local in (match_ws._match_state, match_ws._match_seq,
+                          match_ws._history, match_ws._state_frames):
+                local.pop(mid, None)
+
+    asyncio.run(scenario())
+
+
+def test_seq_never_goes_backwards_when_the_shared_state_is_lost(monkeypatch):
+    from app.websocket import match_ws
+
+    mid = 95
+    plane = bp.InProcessBackplane()
+
+    async def build(match_id):
+        return {"minute": 70}
+
+    monkeypatch.setattr(match_ws, "get_backplane", lambda: plane)
+    monkeypatch.setattr(match_ws, "_build_full_state", build)
+
+    async def scenario():
+        # Clients already hold seq 41; the shared copy then expired and the
+        # relay dropped the local state after a gap
+        match_ws._match_seq[mid] = 41
+        assert await match_ws._current_state(mid) == {"minute": 70}
+        first = match_ws._match_seq[mid]
+        assert first >= 41
+
+        # Lost again: the next seed is still ahead of everything handed out
+        await plane.set_state(match_ws._state_key(mid), "", 1)
+        match_ws._match_state.pop(mid)
+        match_ws._match_seq.pop(mid)
+        await match_ws._current_state(mid)
+        assert match_ws._match_seq[mid] >= first
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        for local in (match_ws._match_state, match_ws._match_seq,
+                      match_ws._history, match_ws._state_frames):
+            local.pop(mid, None)
+
+
+def test_resync_after_a_missed_tick_reads_the_backplane_copy(monkeypatch):
+    from app.websocket import match_ws
+
+    mid = 94
+    plane = bp.InProcessBackplane()
+    monkeypatch.setattr(match_ws, "get_backplane", lambda: plane)
+
+    async def scenario():
+        await plane.set_state(match_ws._state_key(mid), json.dumps(
+            {"seq": 12, "data": {"minute": 60, "home_goals": 1}}), 60)
+        # The relay missed a tick, so there is no local copy to resync from
+        match_ws._remember_state(mid, json.dumps({"type": "delta", "seq": 12, "data": {"home_goals": 1}}))
+        assert mid not in match_ws._match_state
+
+        ws = _FakeSocket()
+        client = match_ws._Client(ws, mid)
+        try:
+            client.queue.put_nowait(match_ws._RESYNC)
+            await asyncio.sleep(0.01)
+            assert [json.loads(f) for f in ws.sent] == [
+                {"type": "state", "seq": 12, "data": {"minute": 60, "home_goals": 1}},
+            ]
+        finally:
+            client.writer.cancel()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        for local in (match_ws._match_state, match_ws._match_seq,
+                      match_ws._history, match_ws._state_frames):
+            local.pop(mid, None)
@@ -603,6 +603,7 @@ export default function LiveMatchPage() {
 
   const wsRef     = useRef<WebSocket | null>(null);
   const prevGoals = useRef<{ home?: number; away?: number }>({});
+  const lastSeq   = useRef<number | null>(null);
 
   const fetchRest = useCallback(async () => {
     try {
@@ -628,7 +629,9 @@ export default function LiveMatchPage() {
     if (!matchId) return;
     fetchRest();
     const connect = () => {
-      const ws = new WebSocket(`${WS_URL}/ws/match/${matchId}`);
+      // Resume from the last state version we hold so the hub only sends what we missed
+      const since = lastSeq.current !== null ? `?since=${lastSeq.current}` : '';
+      const ws = new WebSocket(`${WS_URL}/ws/match/${matchId}${since}`);
       wsRef.current = ws;
       ws.onopen  = () => setConnected(true);
       ws.onclose = () => { setConnected(false); setTimeout(connect, 5000); };
@@ -641,13 +644,31 @@ export default function LiveMatchPage() {
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [matchId]);
 
-  function handleMessage(msg: { type: string; data: unknown }) {
+  function handleMessage(msg: { type: string; seq?: number; data: unknown }) {
     switch (msg.type) {
-      case 'state':
-      case 'stats_update': {
+      case 'batch': {
+        (msg.data as { type: string; seq?: number; data: unknown }[]).forEach(handleMessage);
+        break;
+      }
+      case 'state': {
+        lastSeq.current = msg.seq ?? null;
         setMatchState(prev => ({ ...prev, ...(msg.data as MatchState) }));
         break;
       }
+      case 'delta': {
+        // Deltas apply on top of the previous version; skip ones we already have
+        if (msg.seq !== undefined && lastSeq.current !== null && msg.seq <= lastSeq.current) break;
+        if (msg.seq !== undefined && lastSeq.current !== null && msg.seq !== lastSeq.current + 1) {
+          // Missed a version: the fields it changed would stay stale, so drop
+          // the socket and reconnect without ?since= to get the full state
+          lastSeq.current = null;
+          wsRef.current?.close();
+          break;
+        }
+        lastSeq.current = msg.seq ?? lastSeq.current;
+        setMatchState(prev => ({ ...prev, ...(msg.data as Partial<MatchState>) } as MatchState));
+        break;
+      }
       case 'score_update':
       case 'goal': {
         const d = msg.data as { home_goals?: number; away_goals?: number };